@@ -0,0 +1,12 @@
+"""
+Scripts de get_data/ executados diretamente (python get_data/usar_agente.py)
+só têm get_data/ no sys.path. Importar este módulo acrescenta a raiz do
+repositório, para que importem os módulos como get_data.X, igual ao main.py.
+"""
+
+import sys
+from os import path as os_path
+
+RAIZ = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
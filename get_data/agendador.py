@@ -0,0 +1,38 @@
+from time import monotonic, sleep as time_sleep
+
+
+class AgendadorFixo:
+    """
+    Agenda ciclos em horários fixos (início + n * intervalo).
+
+    O atraso de um ciclo não se acumula nos seguintes; se um ciclo passar do
+    próprio horário, os horários perdidos são pulados em vez de executados em
+    sequência. O relógio e a função de espera podem ser substituídos (ex: por
+    um relógio virtual em replays).
+    """
+
+    def __init__(self, intervalo: float, relogio=monotonic, dormir=time_sleep):
+        self.intervalo = intervalo
+        self.relogio = relogio
+        self.dormir = dormir
+        self.proximo = relogio() + intervalo
+        self.pulados = 0
+        self.atraso = 0.0  # atraso do último ciclo em relação ao horário agendado
+
+    def restante(self) -> float:
+        """Segundos até o próximo ciclo (0 se já passou do horário)."""
+        return max(self.proximo - self.relogio(), 0.0)
+
+    def aguardar(self) -> None:
+        """Espera até o próximo horário e agenda o seguinte."""
+        agora = self.relogio()
+        if agora > self.proximo:
+            # Ciclo mais lento que o intervalo: pula os horários perdidos
+            self.atraso = agora - self.proximo
+            perdidos = int((agora - self.proximo) // self.intervalo)
+            self.pulados += perdidos
+            self.proximo += perdidos * self.intervalo
+        else:
+            self.dormir(self.proximo - agora)
+            self.atraso = max(self.relogio() - self.proximo, 0.0)
+        self.proximo += self.intervalo
@@ -0,0 +1,192 @@
+from collections import deque
+from os import getenv
+from queue import Empty, Queue
+from threading import Lock, Thread
+from time import monotonic, sleep as time_sleep
+from requests import RequestException, Session
+
+from get_data.metricas import metricas
+
+TELEGRAM_URL = "https://api.telegram.org"
+
+_FIM = object()
+
+
+class AlertDispatcher:
+    """
+    Envio de alertas do Telegram em segundo plano.
+
+    `enviar` apenas enfileira a mensagem. Uma thread com sessão HTTP
+    persistente faz o envio respeitando o limite do chat (intervalo mínimo
+    entre mensagens e máximo por minuto) e repete com backoff em erros de rede,
+    5xx e 429 (usando o retry_after informado pelo Telegram).
+
+    Alertas com a mesma `chave` (ex: símbolo e nível de preço) dentro de
+    `janela` segundos são agrupados: o primeiro é enviado na hora e os
+    repetidos viram uma única mensagem ao fim da janela, com a contagem.
+    """
+
+    def __init__(
+        self,
+        token: str = None,
+        chat_id: str = None,
+        base_url: str = TELEGRAM_URL,
+        janela: float = 60.0,
+        intervalo_chat: float = 1.0,
+        max_por_minuto: int = 20,
+        tentativas: int = 4,
+        backoff: float = 1.0,
+        timeout: float = 5.0,
+        session: Session = None,
+    ):
+        self.token = token or getenv("TELEGRAM_TOKEN")
+        self.chat_id = chat_id or getenv("TELEGRAM_CHAT_ID")
+        self.api_url = f"{base_url}/bot{self.token}/sendMessage"
+        self.janela = janela
+        self.intervalo_chat = intervalo_chat
+        self.max_por_minuto = max_por_minuto
+        self.tentativas = tentativas
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = session or Session()
+
+        self.enviados = 0
+        self.agrupados = 0
+        self.falhas = 0
+
+        self.fila = Queue()
+        self._janelas = {}  # {chave: [fim, repetidos, última mensagem]}
+        self._envios = deque()  # horários dos envios do último minuto
+        self._thread = Thread(target=self._executar, daemon=True)
+        self._thread.start()
+
+    @property
+    def configurado(self) -> bool:
+        return bool(self.token and self.chat_id)
+
+    def enviar(self, mensagem: str, chave=None) -> None:
+        """Enfileira o alerta; nunca espera pela rede."""
+        if not self.configurado:
+            print("Token ou chat_id do Telegram não configurados.")
+            return
+        self.fila.put((mensagem, chave))
+
+    def fechar(self, timeout: float = None) -> None:
+        """Envia o que está na fila (incluindo os agrupados) e encerra a thread."""
+        if self._thread.is_alive():
+            self.fila.put(_FIM)
+            self._thread.join(timeout)
+
+    def _executar(self):
+        while True:
+            espera = None
+            if self._janelas:
+                fim = min(j[0] for j in self._janelas.values())
+                espera = max(fim - monotonic(), 0)
+            try:
+                item = self.fila.get(timeout=espera)
+            except Empty:
+                item = None
+
+            if item is _FIM:
+                self._encerrar_janelas(todas=True)
+                return
+            # Janelas vencidas são encerradas antes de receber o novo item, que
+            # senão abriria uma janela nova sobre os repetidos ainda não enviados
+            self._encerrar_janelas()
+            if item is not None:
+                self._receber(*item)
+
+    def _receber(self, mensagem, chave):
+        if chave is not None:
+            janela = self._janelas.get(chave)
+            if janela and monotonic() < janela[0]:
+                janela[1] += 1
+                janela[2] = mensagem
+                self.agrupados += 1
+                metricas.contador("alertas_total", resultado="agrupado").incrementar()
+                return
+            self._janelas[chave] = [monotonic() + self.janela, 0, mensagem]
+        self._postar(mensagem)
+
+    def _encerrar_janelas(self, todas=False):
+        agora = monotonic()
+        for chave, (fim, repetidos, mensagem) in list(self._janelas.items()):
+            if todas or agora >= fim:
+                del self._janelas[chave]
+                if repetidos:
+                    self._postar(
+                        f"{mensagem}\n\n_(+{repetidos} alertas repetidos "
+                        f"em {self.janela:.0f}s)_"
+                    )
+
+    def _aguardar_limite(self):
+        """Respeita o intervalo mínimo e o máximo de mensagens por minuto do chat."""
+        agora = monotonic()
+        while self._envios and agora - self._envios[0] >= 60:
+            self._envios.popleft()
+        espera = 0.0
+        if self._envios:
+            espera = self._envios[-1] + self.intervalo_chat - agora
+        if len(self._envios) >= self.max_por_minuto:
+            espera = max(espera, self._envios[0] + 60 - agora)
+        if espera > 0:
+            time_sleep(espera)
+        self._envios.append(monotonic())
+
+    def _postar(self, mensagem):
+        with metricas.cronometrar("alertas_envio_segundos"):
+            enviado = self._tentar_envio(mensagem)
+        resultado = "enviado" if enviado else "falha"
+        metricas.contador("alertas_total", resultado=resultado).incrementar()
+        return enviado
+
+    def _tentar_envio(self, mensagem):
+        data = {
+            "chat_id": self.chat_id,
+            "text": mensagem,
+            "parse_mode": "Markdown",
+        }
+        for tentativa in range(self.tentativas):
+            self._aguardar_limite()
+            espera = self.backoff * 2**tentativa
+            try:
+                response = self.session.post(
+                    self.api_url, data=data, timeout=self.timeout
+                )
+            except RequestException as e:
+                print(f"Erro ao enviar alerta via Telegram: {e}")
+            else:
+                if response.ok:
+                    self.enviados += 1
+                    print("✅ Alerta enviado via Telegram.")
+                    return True
+                if response.status_code == 429:
+                    try:
+                        parametros = response.json().get("parameters", {})
+                        espera = float(parametros.get("retry_after", espera))
+                    except ValueError:
+                        pass
+                elif response.status_code < 500:
+                    print(
+                        f"Erro ao enviar alerta via Telegram: {response.status_code} "
+                        f"{response.text}"
+                    )
+                    break
+            if tentativa < self.tentativas - 1:
+                time_sleep(espera)
+        self.falhas += 1
+        return False
+
+
+_dispatcher = None
+_dispatcher_lock = Lock()
+
+
+def obter_dispatcher() -> AlertDispatcher:
+    """Dispatcher compartilhado pelo processo (criado no primeiro uso)."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = AlertDispatcher()
+        return _dispatcher
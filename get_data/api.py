@@ -1,19 +1,207 @@
-from os import getenv, makedirs, path as os_path
-from requests import get as requests_get, post as requests_post, RequestException
+from os import makedirs, path as os_path
+from random import uniform as random_uniform
+from requests import RequestException, Session
+from requests.exceptions import (
+    ConnectionError as RequestsConnectionError,
+    Timeout as RequestsTimeout,
+)
+from requests.adapters import HTTPAdapter
 from datetime import datetime
-from time import sleep as time_sleep
-from csv import reader as csv_reader, writer as csv_writer
+from threading import Lock
+from time import perf_counter, sleep as time_sleep, time as time_time
 
 from dotenv import load_dotenv
 
+from get_data.backfill import INTERVALO_MS, KlineBackfill
+from get_data.candle_store import CandleStore, ColumnarCandleStore, converter_csv
+from get_data.quantis import QuantisVolume
+from get_data.alertas import obter_dispatcher
+from get_data.snapshot import MarketSnapshot, SnapshotFetcher
+from get_data.metricas import metricas
+
 # Força o carregamento do .env que está uma pasta acima
 dotenv_path = os_path.join(os_path.dirname(__file__), "..", "alerta_vol_bot.env")
 load_dotenv(dotenv_path)
 
 
+def peso_depth(limit: int) -> int:
+    """Peso de requisição do endpoint /depth conforme o limite de níveis."""
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
+PESO_TICKER_24H = 2
+PESO_KLINES = 2
+PESO_AGG_TRADES = 2
+
+# Timeouts (conexão, leitura) em segundos por endpoint; nenhuma chamada fica sem
+TIMEOUTS = {
+    "depth": (3.05, 5),
+    "ticker/24hr": (3.05, 5),
+    "klines": (3.05, 15),
+    "aggTrades": (3.05, 5),
+}
+TIMEOUT_PADRAO = (3.05, 10)
+
+# Respostas que valem nova tentativa: limite de taxa (429), banimento
+# temporário de IP (418) e erros do servidor
+STATUS_RETENTATIVA = {418, 429, 500, 502, 503, 504}
+
+
+class LimitadorPeso:
+    """
+    Controla o orçamento de peso de requisições da Binance (janela de 1 minuto).
+
+    Compartilhado por todas as chamadas de um BinancePublicAPI, e portanto por
+    todos os símbolos monitorados com ele. Quando o orçamento do minuto acaba,
+    adquirir() bloqueia até a virada da janela. O valor informado pela Binance
+    no cabeçalho X-MBX-USED-WEIGHT-1M corrige a contagem local.
+    """
+
+    def __init__(self, limite_por_minuto: int = 5000):
+        self.limite_por_minuto = limite_por_minuto
+        self.usado = 0
+        self._janela = int(time_time() // 60)
+        self._lock = Lock()
+
+    def _renovar(self, agora: float) -> None:
+        janela = int(agora // 60)
+        if janela != self._janela:
+            self._janela = janela
+            self.usado = 0
+
+    def adquirir(self, peso: int) -> None:
+        while True:
+            with self._lock:
+                agora = time_time()
+                self._renovar(agora)
+                if self.usado + peso <= self.limite_por_minuto:
+                    self.usado += peso
+                    return
+                espera = (self._janela + 1) * 60 - agora
+            print(f"Orçamento de peso esgotado. Aguardando {espera:.1f} segundos...")
+            time_sleep(espera)
+
+    def atualizar(self, usado_servidor: int) -> None:
+        with self._lock:
+            self._renovar(time_time())
+            self.usado = max(self.usado, usado_servidor)
+
+
+def registrar_requisicao(
+    endpoint: str, latencia: float, erro: bool, retentativa: bool
+) -> None:
+    """Latência, requisições, erros e novas tentativas por endpoint (em `metricas`)."""
+    metricas.histograma("binance_http_latencia_segundos", endpoint=endpoint).observar(
+        latencia
+    )
+    metricas.contador("binance_requisicoes_total", endpoint=endpoint).incrementar()
+    if erro:
+        metricas.contador("binance_erros_total", endpoint=endpoint).incrementar()
+    if retentativa:
+        metricas.contador("binance_retentativas_total", endpoint=endpoint).incrementar()
+
+
+def criar_sessao(pool_maxsize: int = 10) -> Session:
+    """Cria uma sessão HTTP com pool de conexões reutilizáveis (keep-alive)."""
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 class BinancePublicAPI:
     base_url = "https://api.binance.com/api/v3"
 
+    def __init__(
+        self,
+        session: Session = None,
+        limitador: LimitadorPeso = None,
+        base_url: str = None,
+        pool_maxsize: int = 10,
+        timeouts: dict = None,
+        tentativas: int = 3,
+        backoff: float = 0.5,
+    ):
+        """
+        Parâmetros:
+            session (requests.Session): Sessão HTTP compartilhada (pool de conexões).
+            limitador (LimitadorPeso): Orçamento de peso compartilhado entre chamadas.
+            base_url (str): URL alternativa da API (ex: um servidor local de testes).
+            pool_maxsize (int): Conexões mantidas no pool quando a sessão é criada aqui.
+            timeouts (dict): Timeouts por endpoint, sobrepondo os de TIMEOUTS.
+            tentativas (int): Novas tentativas em 429/418/5xx e falhas de conexão.
+            backoff (float): Base em segundos do backoff exponencial com jitter.
+        """
+        self.session = session or criar_sessao(pool_maxsize)
+        self.limitador = limitador or LimitadorPeso()
+        if base_url:
+            self.base_url = base_url
+        self.timeouts = {**TIMEOUTS, **(timeouts or {})}
+        self.tentativas = tentativas
+        self.backoff = backoff
+        self._snapshots = None
+        self._lock_snapshot = Lock()
+
+    def _espera(self, tentativa: int, response=None) -> float:
+        """Retry-After da resposta, se houver; senão backoff exponencial com jitter."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is not None:
+                try:
+                    return float(retry_after)
+                except ValueError:
+                    pass
+        return random_uniform(0, self.backoff * 2**tentativa)
+
+    def _get(self, endpoint: str, params: dict, peso: int):
+        """
+        GET em `{base_url}/{endpoint}` com o timeout do endpoint, controle de
+        peso e novas tentativas em 429/418/5xx e falhas de conexão.
+        """
+        url = f"{self.base_url}/{endpoint}"
+        timeout = self.timeouts.get(endpoint, TIMEOUT_PADRAO)
+        for tentativa in range(self.tentativas + 1):
+            ultima = tentativa == self.tentativas
+            self.limitador.adquirir(peso)
+            metricas.contador("binance_peso_consumido_total").incrementar(peso)
+            inicio = perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+            except (RequestsConnectionError, RequestsTimeout):
+                registrar_requisicao(
+                    endpoint, perf_counter() - inicio, True, tentativa > 0
+                )
+                if ultima:
+                    raise
+                time_sleep(self._espera(tentativa))
+                continue
+
+            falhou = response.status_code in STATUS_RETENTATIVA
+            registrar_requisicao(
+                endpoint, perf_counter() - inicio, falhou, tentativa > 0
+            )
+            usado = response.headers.get("X-MBX-USED-WEIGHT-1M")
+            if usado is not None:
+                self.limitador.atualizar(int(usado))
+                metricas.medidor("binance_peso_usado_1m").definir(int(usado))
+            if falhou and not ultima:
+                espera = self._espera(tentativa, response)
+                print(
+                    f"Resposta {response.status_code} em {endpoint}. "
+                    f"Nova tentativa em {espera:.1f} segundos..."
+                )
+                time_sleep(espera)
+                continue
+            response.raise_for_status()
+            return response
+
     def get_order_book(self, symbol: str = "BTCUSDT", limit: int = 10) -> dict:
         """
         Obtém o livro de ordens (order book) para o ativo informado.
@@ -39,13 +227,12 @@ class BinancePublicAPI:
         if limit not in valid_limits:
             raise ValueError(f"Limite inválido: {limit}. Aceitos: {valid_limits}.")
 
-        endpoint = f"{self.base_url}/depth"
         params = {"symbol": symbol, "limit": limit}
 
         try:
-            response = requests_get(endpoint, params=params)
-            response.raise_for_status()
-            return response.json()
+            response = self._get("depth", params, peso_depth(limit))
+            with metricas.cronometrar("parse_segundos", etapa="json_depth"):
+                return response.json()
         except RequestException:
             print(f"Erro ao acessar API: {RequestException}")
             return None
@@ -72,18 +259,100 @@ class BinancePublicAPI:
             "quoteVolume": "158000000.00"
         }
         """
-        endpoint = f"{self.base_url}/ticker/24hr"
         params = {"symbol": symbol}
 
         try:
-            response = requests_get(endpoint, params=params, timeout=5)
-            response.raise_for_status()
-            return response.json()
+            response = self._get("ticker/24hr", params, PESO_TICKER_24H)
+            with metricas.cronometrar("parse_segundos", etapa="json_ticker"):
+                return response.json()
         except RequestException:
             print(f"Erro ao obter dados de ticker 24h: {RequestException}")
             return None
 
-    def fetch_volume(self, symbol, start_date, end_date, interval):
+    def get_agg_trades(
+        self, symbol: str, from_id: int = None, limit: int = 1000
+    ) -> list:
+        """
+        Negócios agregados (aggTrades) a partir do id `from_id`, ou os mais
+        recentes se não informado.
+
+        Cada item tem as chaves: a (id), p (preço), q (quantidade), f/l (primeiro
+        e último trade id), T (horário em ms) e m (comprador é o maker).
+        """
+        params = {"symbol": symbol, "limit": limit}
+        if from_id is not None:
+            params["fromId"] = from_id
+
+        try:
+            response = self._get("aggTrades", params, PESO_AGG_TRADES)
+            return response.json()
+        except RequestException as e:
+            print(f"Erro ao obter aggTrades: {e}")
+            return None
+
+    def get_market_snapshot(self, symbol: str, limit: int = 10) -> MarketSnapshot:
+        """
+        Busca order book e ticker 24h ao mesmo tempo e os retorna juntos, com um
+        único horário de referência (ver MarketSnapshot).
+        """
+        with self._lock_snapshot:
+            if self._snapshots is None:
+                self._snapshots = SnapshotFetcher(self)
+        return self._snapshots.buscar(symbol, limit)
+
+    def get_klines(
+        self,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int,
+        limit: int = 1000,
+    ) -> list:
+        """
+        Retorna até `limit` candles do período [start_ms, end_ms].
+
+        Cada candle é a lista bruta da API: [abertura_ms, open, high, low, close,
+        volume, fechamento_ms, quote_volume, trades, ...].
+        """
+        params = {
+            "symbol": symbol,
+            "interval": interval,
+            "startTime": start_ms,
+            "endTime": end_ms,
+            "limit": limit,
+        }
+
+        try:
+            response = self._get("klines", params, PESO_KLINES)
+            return response.json()
+        except RequestException as e:
+            print(f"\nErro na requisição de klines: {e}")
+            return None
+
+    def fetch_volumes(self, symbols, start_date, end_date, intervals, workers=4):
+        """
+        Executa fetch_volume para vários símbolos e intervalos. As faixas que
+        faltam em todos os arquivos são buscadas juntas em um único pool de threads.
+
+        Retorna:
+            dict: {(symbol, interval): caminho do CSV salvo ou None}.
+        """
+        return self._fetch(
+            [(symbol, interval) for symbol in symbols for interval in intervals],
+            start_date,
+            end_date,
+            workers,
+        )
+
+    def fetch_volume(
+        self,
+        symbol,
+        start_date,
+        end_date,
+        interval,
+        workers=4,
+        preencher_lacunas=True,
+    ):
         """
         Consulta dados históricos de volume de negociação para um par de ativos na Binance,
         compara com os dados já existentes no arquivo CSV local (se houver), adiciona somente
@@ -94,128 +363,151 @@ class BinancePublicAPI:
             start_date (datetime): Data inicial do período a ser consultado.
             end_date (datetime): Data final do período a ser consultado.
             interval (str): Intervalo do candle (ex: "1m", "5m", "1h", "1d").
+            workers (int): Quantidade de janelas buscadas em paralelo.
+            preencher_lacunas (bool): Também consulta as lacunas entre candles já
+                armazenados dentro do período.
 
         Retorna:
             str | None: Caminho do arquivo CSV salvo, ou None em caso de falha.
 
         Observações:
             - Os dados são gravados em 'get_data/data/{symbol}_{interval}.csv'.
-            - Entradas duplicadas (por data) são ignoradas com base no conteúdo já presente.
-            - Em caso de erro de conexão (RequestException), retorna None.
+            - Só o período fora do já armazenado e as lacunas internas são
+              consultados. Duplicatas são identificadas pelo horário de abertura do
+              candle (epoch ms) por busca binária no índice colunar.
+            - Os mesmos candles, com OHLC e trades, são gravados no formato colunar
+              em 'get_data/data/{symbol}_{interval}.cols/' (ver ColumnarCandleStore).
+            - Em caso de falha, as janelas já baixadas ficam em checkpoint e são
+              reaproveitadas na próxima execução; retorna None.
         """
+        return self._fetch(
+            [(symbol, interval)], start_date, end_date, workers, preencher_lacunas
+        )[(symbol, interval)]
+
+    def _abrir_stores(self, path_file, symbol, interval):
+        store = CandleStore(path_file, symbol, interval)
+        colunar = ColumnarCandleStore(path_file, symbol, interval)
+        if store.rows != colunar.rows:
+            # O índice colunar precisa espelhar o CSV linha a linha
+            if store.rows:
+                colunar = converter_csv(path_file, symbol, interval, recriar=True)
+            else:
+                colunar.remover()
+        return store, colunar
+
+    def _fetch(self, pares, start_date, end_date, workers, preencher_lacunas=True):
         path_file = "get_data/data"
         makedirs(path_file, exist_ok=True)
 
-        filename = f"{path_file}/{symbol}_{interval}.csv"
-        existing_data = []
-        existing_dates = set()
-
-        if os_path.exists(filename):
-            print(f"\nArquivo existente encontrado: {filename}")
-            with open(filename, "r") as f:
-                reader = csv_reader(f)
-                next(reader)  # pula o cabeçalho
-                for row in reader:
-                    existing_data.append(row)
-                    try:
-                        dt = datetime.strptime(row[1], "%Y-%m-%d %H:%M:%S")
-                        existing_dates.add(dt.date())
-                    except Exception:
-                        continue
-
-        print(f"\nConsultando volume de {symbol}")
-        print(f"Período: {start_date} a {end_date}")
-        print(f"Intervalo: {interval}")
-
         start_ms = int(start_date.timestamp() * 1000)
         end_ms = int(end_date.timestamp() * 1000)
-        limit = 1000
-        all_data = []
-
-        while start_ms < end_ms:
-            params = {
-                "symbol": symbol,
-                "interval": interval,
-                "startTime": start_ms,
-                "endTime": end_ms,
-                "limit": limit,
-            }
-
+        abertos = {}
+        pedidos = []
+
+        for symbol, interval in pares:
+            store, colunar = self._abrir_stores(path_file, symbol, interval)
+            if store.rows:
+                print(f"\nArquivo existente encontrado: {store.filename}")
+                print(
+                    f"{store.rows} registros de "
+                    f"{datetime.fromtimestamp(store.first_ts / 1000)} a "
+                    f"{datetime.fromtimestamp(store.last_ts / 1000)}"
+                )
+
+            print(f"\nConsultando volume de {symbol}")
+            print(f"Período: {start_date} a {end_date}")
+            print(f"Intervalo: {interval}")
+
+            # Só consulta o que está fora do intervalo já armazenado
+            faixas = []
+            if store.first_ts is None:
+                faixas.append((start_ms, end_ms))
+            else:
+                if start_ms < store.first_ts:
+                    faixas.append((start_ms, min(end_ms, store.first_ts)))
+                if end_ms > store.last_ts + 1:
+                    faixas.append((max(start_ms, store.last_ts + 1), end_ms))
+
+            lacunas = []
+            if preencher_lacunas and colunar.rows:
+                lacunas = colunar.lacunas(INTERVALO_MS[interval], start_ms, end_ms)
+                if lacunas:
+                    print(f"{len(lacunas)} lacunas encontradas no período armazenado.")
+
+            # Estado incremental dos quantis (stat_vol), alimentado só com os novos
+            quantis = QuantisVolume(path_file, symbol, interval)
+            quantis.sincronizar(colunar.coluna("volume"), colunar.coluna("open_time"))
+
+            abertos[(symbol, interval)] = (store, colunar, quantis, set(lacunas))
+            pedidos.extend((symbol, interval, a, b) for a, b in faixas + lacunas)
+
+        backfill = KlineBackfill(self, workers=workers)
+        resultados = backfill.executar_faixas(pedidos)
+
+        salvos = {}
+        novos = {par: 0 for par in pares}
+        recebidos = {par: [] for par in pares}
+        for (symbol, interval, inicio, fim), data in resultados.items():
+            if data is None:
+                salvos[(symbol, interval)] = None
+            else:
+                recebidos[(symbol, interval)].append((inicio, fim, data))
+
+        for (symbol, interval), faixas in recebidos.items():
+            if not faixas:
+                continue
+            store, colunar, quantis, lacunas = abertos[(symbol, interval)]
+            # Um único merge por par: com lacunas, as colunas e o CSV são
+            # regravados uma vez por execução, e não uma vez por lacuna
+            candles = [c for _, _, data in faixas for c in data]
             try:
-                response = requests_get(f"{self.base_url}/klines", params=params)
-                response.raise_for_status()
-                data = response.json()
-
-                if not data:
-                    break
-
-                for entry in data:
-                    candle_time = datetime.fromtimestamp(entry[0] / 1000)
-                    if candle_time.date() not in existing_dates:
-                        all_data.append(
-                            [
-                                symbol,
-                                candle_time.strftime("%Y-%m-%d %H:%M:%S"),
-                                interval,
-                                float(entry[4]),
-                                float(entry[5]),
-                            ]
-                        )
-
-                last_timestamp = data[-1][0]
-                start_ms = last_timestamp + 1
-                time_sleep(0.3)
-
-            except RequestException:
-                print(f"\nErro na requisição: {RequestException}")
-                return None
-
-        if not all_data:
-            print("\nNenhum novo dado a adicionar.")
-        else:
-            print(f"\n{len(all_data)} novos registros serão adicionados.")
-
-        try:
-            with open(filename, "w", newline="") as f:
-                writer = csv_writer(f)
-                writer.writerow(["Ativo", "Data", "Intervalo", "Preço", "Volume"])
-                combined = existing_data + all_data
-                combined.sort(key=lambda x: x[1])
-                for row in combined:
-                    writer.writerow(row)
-            print(f"\nDados salvos em: {filename}")
-            return filename
-        except IOError:
-            print(f"Erro ao salvar arquivo: {IOError}")
-            return None
+                inseridos, posicoes = colunar.merge(candles)
+                novos[(symbol, interval)] += store.inserir(inseridos, posicoes)
+                quantis.adicionar(
+                    [float(c[5]) for c in inseridos], [c[0] for c in inseridos]
+                )
+            except IOError:
+                print(f"Erro ao salvar arquivo: {IOError}")
+                salvos[(symbol, interval)] = None
+                continue
+            for inicio, fim, _ in faixas:
+                if (inicio, fim) in lacunas:
+                    # O que a Binance não devolveu dentro da lacuna (toda ela ou
+                    # só partes) não existe lá; não é consultado de novo
+                    for faixa in colunar.lacunas(
+                        INTERVALO_MS[interval], inicio, fim + 1
+                    ):
+                        colunar.marcar_lacuna_vazia(faixa)
+                backfill.limpar(symbol, interval, inicio, fim)
+
+        for par in pares:
+            if par in salvos:
+                continue
+            store, colunar, quantis, _ = abertos[par]
+            if quantis.rows == colunar.rows:
+                quantis.salvar()
+            if not novos[par]:
+                print(f"\n{par[0]} {par[1]}: nenhum novo dado a adicionar.")
+            else:
+                print(f"\n{par[0]} {par[1]}: {novos[par]} novos registros adicionados.")
+            print(f"Dados salvos em: {store.filename}")
+            salvos[par] = store.filename
+        return salvos
 
 
 class TelegramAlerta:
     """
     Classe responsável por enviar mensagens de alerta via Telegram
     usando as variáveis de ambiente TELEGRAM_TOKEN e TELEGRAM_CHAT_ID.
+
+    O envio é feito pelo AlertDispatcher compartilhado do processo, em segundo
+    plano: `enviar` só enfileira a mensagem.
     """
 
     def __init__(self):
-        self.token = getenv("TELEGRAM_TOKEN")
-        self.chat_id = getenv("TELEGRAM_CHAT_ID")
-        self.api_url = f"https://api.telegram.org/bot{self.token}/sendMessage"
+        self.dispatcher = obter_dispatcher()
+        self.token = self.dispatcher.token
+        self.chat_id = self.dispatcher.chat_id
 
-    def enviar(self, mensagem: str) -> None:
-
-        if not self.token or not self.chat_id:
-            print("Token ou chat_id do Telegram não configurados.")
-            return
-
-        data = {
-            "chat_id": self.chat_id,
-            "text": mensagem,
-            "parse_mode": "Markdown",
-        }
-
-        try:
-            response = requests_post(self.api_url, data=data, timeout=5)
-            response.raise_for_status()
-            print("✅ Alerta enviado via Telegram.")
-        except RequestException:
-            print(f"Erro ao enviar alerta via Telegram: {RequestException}")
+    def enviar(self, mensagem: str, chave=None) -> None:
+        self.dispatcher.enviar(mensagem, chave)
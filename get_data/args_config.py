@@ -44,6 +44,24 @@ class ArgumentBuilder:
             default=default_end,
             help="Data final (YYYY-MM-DD)",
         )
+        parser.add_argument(
+            "--symbols",
+            type=str.upper,
+            nargs="+",
+            help="Vários ativos em uma única execução (ex: BTCUSDT ETHUSDT)",
+        )
+        parser.add_argument(
+            "--intervals",
+            type=str.lower,
+            nargs="+",
+            help="Vários intervalos em uma única execução (ex: 1m 5m 1h)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Padrão: 4. Requisições de klines executadas em paralelo",
+        )
 
         return parser
 
@@ -73,6 +91,73 @@ class ArgumentBuilder:
             help="Coluna estatística (ex: D9, D10)",
         )
 
+        parser.add_argument(
+            "--symbols",
+            type=str.upper,
+            nargs="+",
+            help="Lista de ativos monitorados ao mesmo tempo (ex: BTCUSDT ETHUSDT)",
+        )
+
+        parser.add_argument(
+            "--symbols_file",
+            type=str,
+            help="Arquivo com um ativo por linha para monitoramento simultâneo",
+        )
+
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Mantém o order book local via WebSocket (depth@100ms) em vez de consultar a API REST a cada ciclo",
+        )
+
+        parser.add_argument(
+            "--trades",
+            action="store_true",
+            help="Compara o volume agregado do stream aggTrade (janelas 1s/1m/5m) em vez do lastQty do ticker",
+        )
+
+        parser.add_argument(
+            "--dashboard",
+            action="store_true",
+            help="Painel de terminal que redesenha só o que mudou, com vários símbolos",
+        )
+
+        parser.add_argument(
+            "--refresh",
+            type=float,
+            default=0.5,
+            help="Padrão: 0.5. Intervalo em segundos entre redesenhos do painel",
+        )
+
+        parser.add_argument(
+            "--gravar",
+            nargs="?",
+            const="get_data/data/gravacoes",
+            help="Grava snapshots, diffs, ticker e negócios em arquivos comprimidos (pasta opcional) para replay",
+        )
+
+        parser.add_argument(
+            "--replay",
+            type=str,
+            help="Reproduz uma gravação (pasta do --gravar) com relógio virtual, na velocidade máxima e sem acessar a Binance",
+        )
+
+        parser.add_argument(
+            "--metricas",
+            type=int,
+            metavar="PORTA",
+            help="Expõe as métricas de latência e contadores em http://127.0.0.1:PORTA/metrics (formato Prometheus)",
+        )
+        return parser
+
+    @staticmethod
+    def with_window():
+        parser = ArgumentBuilder.base_parser()
+        parser.add_argument(
+            "--janela_dias",
+            type=float,
+            help="Calcula as estatísticas apenas sobre os últimos N dias armazenados",
+        )
         return parser
 
     @staticmethod
@@ -84,4 +169,65 @@ class ArgumentBuilder:
             default=50,
             help="Número de episódios de treinamento",
         )
+        parser.add_argument(
+            "--envs",
+            type=int,
+            default=1,
+            help="Ambientes executados em lockstep (fatias do histórico) por worker",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processos de treinamento em paralelo",
+        )
+        parser.add_argument(
+            "--sincronizar_cada",
+            type=int,
+            default=5,
+            help="Episódios entre cada sincronização da Q-table entre workers",
+        )
+        parser.add_argument(
+            "--livros",
+            help="Pasta de gravação: o microprice e o imbalance dos livros gravados entram no estado",
+        )
+        return parser
+
+    @staticmethod
+    def with_benchmark():
+        parser = args_parser(formatter_class=args_default_help_formatter)
+        parser.add_argument(
+            "--grupos",
+            type=str.lower,
+            nargs="+",
+            choices=["order_book", "candles", "agente"],
+            help="Grupos de benchmarks executados (padrão: todos)",
+        )
+        parser.add_argument(
+            "--completo",
+            action="store_true",
+            help="Inclui 10M candles e Q-table com 10M valores (lento, usa vários GB em disco)",
+        )
+        parser.add_argument(
+            "--saida",
+            type=str,
+            help="Arquivo JSON dos resultados (padrão: get_data/data/benchmarks/bench_<data>.json)",
+        )
+        parser.add_argument(
+            "--comparar",
+            type=str,
+            help="JSON de uma execução anterior; sai com código 1 se houver regressão",
+        )
+        parser.add_argument(
+            "--tolerancia",
+            type=float,
+            default=0.25,
+            help="Padrão: 0.25. Piora relativa do p50 ou do pico de memória considerada regressão",
+        )
+        parser.add_argument(
+            "--semente",
+            type=int,
+            default=0,
+            help="Padrão: 0. Semente dos dados sintéticos",
+        )
         return parser
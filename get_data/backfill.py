@@ -0,0 +1,175 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from json import dump as json_dump, load as json_load
+from os import makedirs, path as os_path, replace as os_replace
+from shutil import rmtree
+from threading import Lock
+from time import sleep as time_sleep
+
+INTERVALO_MS = {
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "2h": 7_200_000,
+    "4h": 14_400_000,
+    "6h": 21_600_000,
+    "8h": 28_800_000,
+    "12h": 43_200_000,
+    "1d": 86_400_000,
+    "3d": 259_200_000,
+    "1w": 604_800_000,
+}
+
+
+def gravar_json_atomico(path, dados):
+    """Grava em um arquivo temporário e renomeia, evitando arquivos truncados."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json_dump(dados, f)
+    os_replace(tmp, path)
+
+
+class KlineBackfill:
+    """
+    Busca de candles (/klines) em paralelo e com retomada.
+
+    O período é dividido em janelas de `limit` candles (uma requisição cada),
+    buscadas por um pool de threads. O ritmo é controlado pelo LimitadorPeso do
+    BinancePublicAPI, que lê o cabeçalho de peso usado da Binance. Cada janela
+    concluída é gravada em disco junto com um checkpoint; uma execução
+    interrompida retoma apenas as janelas que faltam.
+    """
+
+    def __init__(
+        self,
+        api,
+        checkpoint_dir="get_data/data/.backfill",
+        workers=4,
+        limit=1000,
+        tentativas=3,
+    ):
+        self.api = api
+        self.checkpoint_dir = checkpoint_dir
+        self.workers = workers
+        self.limit = limit
+        self.tentativas = tentativas
+        self._lock = Lock()
+
+    def janelas(self, interval, start_ms, end_ms):
+        """Divide [start_ms, end_ms) em janelas de até `limit` candles."""
+        if interval not in INTERVALO_MS:
+            raise ValueError(f"Intervalo inválido: {interval}.")
+        passo = INTERVALO_MS[interval] * self.limit
+        return [
+            (inicio, min(inicio + passo, end_ms) - 1)
+            for inicio in range(start_ms, end_ms, passo)
+        ]
+
+    def _dir(self, symbol, interval, start_ms, end_ms):
+        return f"{self.checkpoint_dir}/{symbol}_{interval}_{start_ms}_{end_ms}"
+
+    def _carregar_checkpoint(self, pasta):
+        path = f"{pasta}/checkpoint.json"
+        if not os_path.exists(path):
+            return set()
+        with open(path, "r") as f:
+            return set(json_load(f)["concluidas"])
+
+    def _buscar_janela(self, symbol, interval, janela, pasta, concluidas):
+        inicio, fim = janela
+        for tentativa in range(1, self.tentativas + 1):
+            data = self.api.get_klines(symbol, interval, inicio, fim, self.limit)
+            if data is not None:
+                gravar_json_atomico(f"{pasta}/{inicio}.json", data)
+                with self._lock:
+                    concluidas.add(inicio)
+                    gravar_json_atomico(
+                        f"{pasta}/checkpoint.json", {"concluidas": sorted(concluidas)}
+                    )
+                return True
+            time_sleep(tentativa)
+        return False
+
+    def executar(self, symbol, interval, start_ms, end_ms):
+        """
+        Busca todos os candles do período, retomando de um checkpoint se houver.
+
+        Retorna:
+            list | None: Candles brutos da API em ordem de abertura, ou None se
+            alguma janela falhou (as concluídas ficam salvas para a próxima execução).
+        """
+        return self.executar_varios([symbol], [interval], start_ms, end_ms)[
+            (symbol, interval)
+        ]
+
+    def executar_varios(self, symbols, intervals, start_ms, end_ms):
+        """
+        Executa o backfill de cada combinação de símbolo e intervalo, com as
+        janelas de todas as combinações compartilhando o mesmo pool de threads.
+
+        Retorna:
+            dict: {(symbol, interval): candles ou None}.
+        """
+        resultado = self.executar_faixas(
+            [
+                (symbol, interval, start_ms, end_ms)
+                for symbol in symbols
+                for interval in intervals
+            ]
+        )
+        return {chave[:2]: candles for chave, candles in resultado.items()}
+
+    def executar_faixas(self, faixas):
+        """
+        Busca várias faixas (symbol, interval, start_ms, end_ms) de uma vez; as
+        janelas de todas elas compartilham o mesmo pool de threads.
+
+        Retorna:
+            dict: {(symbol, interval, start_ms, end_ms): candles ou None}.
+        """
+        trabalhos = {}
+        tarefas = []
+        for chave in faixas:
+            symbol, interval, start_ms, end_ms = chave
+            pasta = self._dir(symbol, interval, start_ms, end_ms)
+            makedirs(pasta, exist_ok=True)
+            janelas = self.janelas(interval, start_ms, end_ms)
+            concluidas = self._carregar_checkpoint(pasta)
+            pendentes = [j for j in janelas if j[0] not in concluidas]
+            if concluidas:
+                print(
+                    f"Retomando {symbol} {interval}: {len(janelas) - len(pendentes)}"
+                    f"/{len(janelas)} janelas já concluídas."
+                )
+            trabalhos[chave] = (pasta, janelas)
+            tarefas.extend(
+                (chave, (symbol, interval, j, pasta, concluidas)) for j in pendentes
+            )
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futuros = {
+                pool.submit(self._buscar_janela, *t): chave for chave, t in tarefas
+            }
+            falhas = {futuros[f] for f in as_completed(futuros) if not f.result()}
+
+        resultado = {}
+        for chave, (pasta, janelas) in trabalhos.items():
+            if chave in falhas:
+                print(
+                    f"\nBackfill incompleto para {chave[0]} {chave[1]}. "
+                    f"Checkpoint em {pasta}"
+                )
+                resultado[chave] = None
+                continue
+            candles = []
+            for inicio, _ in janelas:
+                with open(f"{pasta}/{inicio}.json", "r") as f:
+                    candles.extend(json_load(f))
+            resultado[chave] = candles
+        return resultado
+
+    def limpar(self, symbol, interval, start_ms, end_ms):
+        """Remove o checkpoint após os dados serem consolidados no arquivo final."""
+        rmtree(self._dir(symbol, interval, start_ms, end_ms), ignore_errors=True)
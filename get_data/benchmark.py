@@ -0,0 +1,408 @@
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+from itertools import cycle
+from json import dump as json_dump, load as json_load
+from os import chdir, getcwd, makedirs, path as os_path
+from platform import python_version
+from sys import exit as sys_exit
+from tempfile import TemporaryDirectory
+from time import perf_counter_ns
+from tracemalloc import (
+    get_traced_memory,
+    reset_peak,
+    start as tracemalloc_start,
+    stop as tracemalloc_stop,
+)
+import numpy as np
+from pandas import DataFrame
+
+if not __package__:
+    import _raiz  # noqa: F401  (executado como script: raiz no sys.path)
+
+from get_data.args_config import ArgumentBuilder
+from get_data.candle_store import CandleStore, ColumnarCandleStore
+from get_data.cross_data import analisar_order_book, limite_cache
+from get_data.discretizador import Discretizador
+from get_data.microestrutura import MotorFeatures
+from get_data.order_book import OrderBook
+from get_data.volume_agent import VolumeAgent
+from get_data.volume_env import BinanceVolumeEnv
+
+SIMBOLO = "BENCH"
+INTERVALO = "1m"
+INTERVALO_MS = 60_000
+
+LIMITES_BOOK = (5, 100, 1000, 5000)
+TAMANHOS_CANDLES = (1_000, 100_000, 1_000_000)
+TAMANHOS_Q_TABLE = (1_000, 100_000, 1_000_000)
+# Incluídos com --completo (geram centenas de MB em disco temporário)
+TAMANHOS_CANDLES_COMPLETO = TAMANHOS_CANDLES + (10_000_000,)
+TAMANHOS_Q_TABLE_COMPLETO = TAMANHOS_Q_TABLE + (10_000_000,)
+
+# Variações menores que isto no pico de memória não contam como regressão
+MEMORIA_MINIMA_KB = 64
+
+
+def gerar_order_book(limit: int, rng) -> dict:
+    """Resposta sintética de /depth com `limit` níveis por lado."""
+    mid = 30_000 + rng.random()
+    passos = np.arange(1, limit + 1) * 0.01
+    bids = np.column_stack((mid - passos, rng.exponential(2.0, limit)))
+    asks = np.column_stack((mid + passos, rng.exponential(2.0, limit)))
+    return {
+        "lastUpdateId": 1,
+        "bids": [[f"{p:.2f}", f"{q:.5f}"] for p, q in bids],
+        "asks": [[f"{p:.2f}", f"{q:.5f}"] for p, q in asks],
+    }
+
+
+def gerar_candles(n: int, rng, inicio_ms: int = 1_600_000_000_000, passo: int = 1):
+    """
+    Candles sintéticos (passeio aleatório no preço, volume log-normal) como
+    arrays por coluna do ColumnarCandleStore. `passo` é a distância entre
+    candles em intervalos (2 deixa uma lacuna entre cada par).
+    """
+    close = 30_000 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    return {
+        "open_time": inicio_ms + np.arange(n, dtype=np.int64) * INTERVALO_MS * passo,
+        "open": close,
+        "high": close * 1.001,
+        "low": close * 0.999,
+        "close": close,
+        "volume": rng.lognormal(3, 1, n),
+        "trades": rng.integers(1, 1000, n),
+    }
+
+
+def candles_api(arrays: dict, inicio: int, fim: int) -> list:
+    """Fatia dos arrays no formato bruto do /klines (listas com strings)."""
+    return [
+        [
+            int(arrays["open_time"][i]),
+            f"{arrays['open'][i]:.2f}",
+            f"{arrays['high'][i]:.2f}",
+            f"{arrays['low'][i]:.2f}",
+            f"{arrays['close'][i]:.2f}",
+            f"{arrays['volume'][i]:.5f}",
+            int(arrays["open_time"][i]) + INTERVALO_MS - 1,
+            "0",
+            int(arrays["trades"][i]),
+        ]
+        for i in range(inicio, fim)
+    ]
+
+
+def gravar_historico(pasta: str, arrays: dict) -> None:
+    """Grava os candles no CSV e no formato colunar, como o fetch_volume."""
+    datas = np.char.replace(
+        np.datetime_as_string(arrays["open_time"].astype("datetime64[ms]"), "s"),
+        "T",
+        " ",
+    )
+    DataFrame(
+        {
+            "Ativo": SIMBOLO,
+            "Data": datas,
+            "Intervalo": INTERVALO,
+            "Preço": arrays["close"],
+            "Volume": arrays["volume"],
+        }
+    ).to_csv(f"{pasta}/{SIMBOLO}_{INTERVALO}.csv", index=False)
+    ColumnarCandleStore(pasta, SIMBOLO, INTERVALO).append_arrays(arrays)
+    with redirect_stdout(StringIO()):
+        CandleStore(pasta, SIMBOLO, INTERVALO)  # cria o índice do CSV
+
+
+def discretizador_para(entradas: int, volumes, precos) -> Discretizador:
+    """Discretizador com bins (b, b, 2, b, 5) cuja Q-table tem ~`entradas` valores."""
+    b = max(2, round((entradas / 30) ** (1 / 3)))
+    return Discretizador((b, b, 2, b, 5)).ajustar(volumes, precos, 10_000.0)
+
+
+def medir(nome: str, tamanho: int, funcao, repeticoes: int) -> dict:
+    """
+    Executa `funcao` uma vez para aquecer, `repeticoes` vezes medindo a
+    duração de cada chamada e mais uma vez com tracemalloc para o pico de
+    memória alocada.
+    """
+    funcao()
+    tempos = np.empty(repeticoes, dtype=np.int64)
+    for i in range(repeticoes):
+        inicio = perf_counter_ns()
+        funcao()
+        tempos[i] = perf_counter_ns() - inicio
+
+    tracemalloc_start()
+    reset_peak()
+    funcao()
+    _, pico = get_traced_memory()
+    tracemalloc_stop()
+
+    resultado = {
+        "bench": nome,
+        "tamanho": tamanho,
+        "repeticoes": repeticoes,
+        "ops_s": float(repeticoes / (tempos.sum() / 1e9)),
+        "p50_us": float(np.percentile(tempos, 50) / 1e3),
+        "p99_us": float(np.percentile(tempos, 99) / 1e3),
+        "pico_mem_kb": pico / 1024,
+    }
+    print(
+        f"{nome:<22} {tamanho:>11} {resultado['ops_s']:>12.1f} "
+        f"{resultado['p50_us']:>12.1f} {resultado['p99_us']:>12.1f} "
+        f"{resultado['pico_mem_kb']:>12.1f}"
+    )
+    return resultado
+
+
+def bench_order_book(limites, rng) -> list:
+    """
+    OrderBook.from_snapshot + analisar_order_book com alerta (sem envio) e
+    features de microestrutura do livro.
+    """
+    with open(f"{SIMBOLO}_5m_stat.csv", "w") as f:
+        # Limite de 5 por segundo: ~8% dos níveis viram grandes ordens
+        f.write(f"D10\n{5.0 * 300}\n")
+    ticker = {"lastPrice": "30000", "lastQty": "1000"}
+
+    resultados = []
+    for limit in limites:
+        dados = gerar_order_book(limit, rng)
+
+        def analisar():
+            order_book = OrderBook.from_snapshot(dados, SIMBOLO)
+            analisar_order_book(
+                order_book,
+                ticker,
+                SIMBOLO,
+                limit,
+                "D10",
+                "5m",
+                verbose=False,
+                alertar=lambda mensagem, chave=None: None,
+            )
+
+        resultados.append(
+            medir("analisar_order_book", limit, analisar, max(20, 20_000 // limit))
+        )
+
+        order_book = OrderBook.from_snapshot(dados, SIMBOLO)
+        motor = MotorFeatures(niveis=min(limit, 20))
+        resultados.append(
+            medir(
+                "features_livro",
+                limit,
+                lambda: motor.calcular_livro(order_book),
+                max(20, 20_000 // limit),
+            )
+        )
+    return resultados
+
+
+def bench_candles(tamanhos, rng) -> list:
+    """Merge do fetch_volume (colunar + CSV), carga e step do ambiente."""
+    resultados = []
+    lote = 1000
+    for n in tamanhos:
+        pasta = f"candles_{n}"
+        makedirs(pasta)
+
+        # Novos candles após o último: append nos dois formatos
+        arrays = gerar_candles(n + lote * 30, rng)
+        gravar_historico(pasta, {k: v[:n] for k, v in arrays.items()})
+        colunar = ColumnarCandleStore(pasta, SIMBOLO, INTERVALO)
+        store = CandleStore(pasta, SIMBOLO, INTERVALO)
+        lotes = iter(
+            [candles_api(arrays, n + i * lote, n + (i + 1) * lote) for i in range(30)]
+        )
+
+        def merge_append():
+            inseridos, posicoes = colunar.merge(next(lotes))
+            store.inserir(inseridos, posicoes)
+
+        resultados.append(medir("merge_append", n, merge_append, 10))
+
+        # Preenchimento de lacunas: regrava as colunas e o CSV
+        pasta_lacunas = f"{pasta}_lacunas"
+        makedirs(pasta_lacunas)
+        pares = gerar_candles(n, rng, passo=2)
+        gravar_historico(pasta_lacunas, pares)
+        impares = {k: v.copy() for k, v in pares.items()}
+        impares["open_time"] = pares["open_time"] + INTERVALO_MS
+        colunar = ColumnarCandleStore(pasta_lacunas, SIMBOLO, INTERVALO)
+        store = CandleStore(pasta_lacunas, SIMBOLO, INTERVALO)
+        passo = n // 8
+        lotes = iter(
+            [candles_api(impares, i, i + min(lote, passo)) for i in range(0, n, passo)]
+        )
+
+        def merge_lacunas():
+            inseridos, posicoes = colunar.merge(next(lotes))
+            store.inserir(inseridos, posicoes)
+
+        resultados.append(medir("merge_lacunas", n, merge_lacunas, 5))
+
+        cols = f"{pasta}/{SIMBOLO}_{INTERVALO}.cols"
+        resultados.append(
+            medir("env_carregar", n, lambda: BinanceVolumeEnv(cols, SIMBOLO), 3)
+        )
+
+        env = BinanceVolumeEnv(cols, SIMBOLO)
+        passos = min(env.n_steps - 3, 50_000)
+        acoes = iter(rng.integers(0, 3, passos + 2).tolist())
+        env.reset()
+        resultados.append(medir("env_step", n, lambda: env.step(next(acoes)), passos))
+    return resultados
+
+
+def bench_agente(tamanhos, rng) -> list:
+    """VolumeAgent.learn, learn_batch e _load_q_table por tamanho de Q-table."""
+    candles = gerar_candles(10_000, rng)
+    volumes, precos = candles["volume"], candles["close"]
+    estados = np.column_stack(
+        (
+            volumes,
+            precos,
+            rng.choice([0.0, 0.5], len(volumes)),
+            rng.uniform(0, 20_000, len(volumes)),
+            rng.uniform(-1, 1, len(volumes)),
+        )
+    ).astype(np.float32)
+    acoes = rng.integers(0, 3, len(estados))
+    rewards = rng.normal(0, 10, len(estados))
+
+    resultados = []
+    for entradas in tamanhos:
+        discretizador = discretizador_para(entradas, volumes, precos)
+        with redirect_stdout(StringIO()):
+            agent = VolumeAgent(
+                5, 3, symbol=SIMBOLO, carregar=False, discretizador=discretizador
+            )
+        agent.q_table = rng.normal(0, 1, agent.q_table.shape)
+        tamanho = agent.q_table.size
+        indices = cycle(range(len(estados) - 1))
+
+        def learn():
+            i = next(indices)
+            agent.learn(estados[i], acoes[i], rewards[i], estados[i + 1], False)
+
+        resultados.append(medir("learn", tamanho, learn, 20_000))
+
+        finais = np.zeros(len(estados) - 1, dtype=bool)
+
+        def learn_batch():
+            agent.learn_batch(
+                estados[:-1], acoes[:-1], rewards[:-1], estados[1:], finais
+            )
+
+        resultados.append(medir("learn_batch_10k", tamanho, learn_batch, 20))
+
+        agent.save_q_table()
+
+        def carregar():
+            with redirect_stdout(StringIO()):
+                agent._load_q_table()
+
+        resultados.append(medir("_load_q_table", tamanho, carregar, 10))
+    return resultados
+
+
+BENCHES = {
+    "order_book": bench_order_book,
+    "candles": bench_candles,
+    "agente": bench_agente,
+}
+
+
+def comparar(resultados: list, anterior: list, tolerancia: float) -> list:
+    """
+    Compara com uma execução anterior (mesmo bench e tamanho). É regressão
+    quando o p50 ou o pico de memória crescem mais que `tolerancia`.
+    """
+    anteriores = {(r["bench"], r["tamanho"]): r for r in anterior}
+    regressoes = []
+    print(f"\n{'bench':<22} {'tamanho':>11} {'p50':>10} {'memória':>10}")
+    for r in resultados:
+        a = anteriores.get((r["bench"], r["tamanho"]))
+        if a is None:
+            continue
+        razao_p50 = r["p50_us"] / a["p50_us"] if a["p50_us"] else 1.0
+        razao_mem = (
+            r["pico_mem_kb"] / a["pico_mem_kb"]
+            if a["pico_mem_kb"] and r["pico_mem_kb"] > MEMORIA_MINIMA_KB
+            else 1.0
+        )
+        marca = ""
+        if razao_p50 > 1 + tolerancia or razao_mem > 1 + tolerancia:
+            regressoes.append(r)
+            marca = "  ⚠️ REGRESSÃO"
+        print(
+            f"{r['bench']:<22} {r['tamanho']:>11} {razao_p50:>9.2f}x "
+            f"{razao_mem:>9.2f}x{marca}"
+        )
+    return regressoes
+
+
+def executar(grupos=None, completo=False, semente=0) -> list:
+    """
+    Executa os benchmarks em uma pasta temporária (logs e arquivos gerados
+    não tocam o projeto) e retorna os resultados.
+    """
+    rng = np.random.default_rng(semente)
+    tamanhos = {
+        "order_book": LIMITES_BOOK,
+        "candles": TAMANHOS_CANDLES_COMPLETO if completo else TAMANHOS_CANDLES,
+        "agente": TAMANHOS_Q_TABLE_COMPLETO if completo else TAMANHOS_Q_TABLE,
+    }
+    print(
+        f"{'bench':<22} {'tamanho':>11} {'ops/s':>12} {'p50 (µs)':>12} "
+        f"{'p99 (µs)':>12} {'pico (KB)':>12}"
+    )
+    origem = getcwd()
+    base_limites = limite_cache.base_path
+    resultados = []
+    with TemporaryDirectory(prefix="bench_") as pasta:
+        chdir(pasta)
+        limite_cache.base_path = "."
+        try:
+            for nome in grupos or BENCHES:
+                resultados += BENCHES[nome](tamanhos[nome], rng)
+        finally:
+            limite_cache.base_path = base_limites
+            chdir(origem)
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = ArgumentBuilder.with_benchmark()
+    args = parser.parse_args()
+
+    resultados = executar(args.grupos, args.completo, args.semente)
+
+    saida = args.saida or (
+        f"get_data/data/benchmarks/bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    makedirs(os_path.dirname(saida) or ".", exist_ok=True)
+    with open(saida, "w") as f:
+        json_dump(
+            {
+                "data": datetime.now().isoformat(timespec="seconds"),
+                "python": python_version(),
+                "numpy": np.__version__,
+                "completo": args.completo,
+                "resultados": resultados,
+            },
+            f,
+            indent=2,
+        )
+    print(f"\nResultados salvos em: {saida}")
+
+    if args.comparar:
+        with open(args.comparar, "r") as f:
+            anterior = json_load(f)["resultados"]
+        regressoes = comparar(resultados, anterior, args.tolerancia)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressões acima de {args.tolerancia:.0%}.")
+            sys_exit(1)
+        print("\nNenhuma regressão encontrada.")
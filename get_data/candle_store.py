@@ -0,0 +1,546 @@
+from csv import reader as csv_reader, writer as csv_writer
+from datetime import datetime, timezone
+from json import dump as json_dump, load as json_load
+from os import makedirs, path as os_path, remove as os_remove, replace as os_replace
+from shutil import rmtree
+import numpy as np
+
+COLUNAS = ["Ativo", "Data", "Intervalo", "Preço", "Volume"]
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+
+# Layout colunar: um arquivo binário de largura fixa por coluna
+COLUNAS_BINARIAS = {
+    "open_time": np.dtype("<i8"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<f8"),
+    "trades": np.dtype("<i8"),
+}
+VERSAO_COLUNAR = 1
+
+
+def data_para_ms(data: str) -> int:
+    """Converte a coluna Data (horário local) para epoch em milissegundos."""
+    return int(datetime.strptime(data, FORMATO_DATA).timestamp() * 1000)
+
+
+def datas_para_ms(datas) -> np.ndarray:
+    """
+    Versão vetorizada de data_para_ms. O deslocamento do fuso local é
+    calculado uma vez por hora distinta, o que respeita o horário de verão.
+    """
+    # Horário local lido como se fosse UTC
+    ingenuo = np.asarray(datas, dtype="datetime64[ms]").astype(np.int64)
+    horas, inverso = np.unique(ingenuo // 3_600_000, return_inverse=True)
+    deslocamentos = np.array(
+        [
+            int(
+                datetime.fromtimestamp(int(h) * 3600, timezone.utc)
+                .replace(tzinfo=None)
+                .timestamp()
+            )
+            * 1000
+            - int(h) * 3_600_000
+            for h in horas
+        ],
+        dtype=np.int64,
+    )
+    return ingenuo + deslocamentos[inverso]
+
+
+class CandleStore:
+    """
+    Armazenamento incremental (append-only) dos candles em CSV.
+
+    Um arquivo auxiliar `<csv>.idx.json` guarda o cabeçalho, a quantidade de
+    linhas, o primeiro e o último candle (epoch ms) e o tamanho do CSV. Assim a
+    abertura não percorre o arquivo; o índice só é reconstruído (uma única
+    leitura) quando não existe ou quando o tamanho do CSV não confere.
+    """
+
+    def __init__(self, path_file: str, symbol: str, interval: str):
+        self.symbol = symbol
+        self.interval = interval
+        self.filename = f"{path_file}/{symbol}_{interval}.csv"
+        self.index_file = f"{self.filename}.idx.json"
+        self.header = list(COLUNAS)
+        self.rows = 0
+        self.first_ts = None
+        self.last_ts = None
+        self._abrir()
+
+    def _abrir(self) -> None:
+        if not os_path.exists(self.filename):
+            return
+
+        if os_path.exists(self.index_file):
+            with open(self.index_file, "r") as f:
+                indice = json_load(f)
+            if indice.get("bytes") == os_path.getsize(self.filename):
+                self.header = indice["header"]
+                self.rows = indice["rows"]
+                self.first_ts = indice["first_ts"]
+                self.last_ts = indice["last_ts"]
+                return
+
+        self._reconstruir_indice()
+
+    def _reconstruir_indice(self) -> None:
+        print(f"Reconstruindo índice de {self.filename}...")
+        primeira = ultima = None
+        rows = 0
+        with open(self.filename, "r", newline="") as f:
+            reader = csv_reader(f)
+            self.header = next(reader)
+            coluna = self.header.index("Data")
+            for row in reader:
+                if primeira is None:
+                    primeira = row[coluna]
+                ultima = row[coluna]
+                rows += 1
+
+        self.rows = rows
+        self.first_ts = data_para_ms(primeira) if primeira else None
+        self.last_ts = data_para_ms(ultima) if ultima else None
+        self._salvar_indice()
+
+    def _salvar_indice(self) -> None:
+        indice = {
+            "header": self.header,
+            "rows": self.rows,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "bytes": os_path.getsize(self.filename),
+        }
+        tmp = f"{self.index_file}.tmp"
+        with open(tmp, "w") as f:
+            json_dump(indice, f)
+        os_replace(tmp, self.index_file)
+
+    def _linha(self, entry: list) -> list:
+        valores = {
+            "Ativo": self.symbol,
+            "Data": datetime.fromtimestamp(entry[0] / 1000).strftime(FORMATO_DATA),
+            "Intervalo": self.interval,
+            "Preço": float(entry[4]),
+            "Volume": float(entry[5]),
+        }
+        return [valores.get(coluna, "") for coluna in self.header]
+
+    def append(self, candles: list) -> int:
+        """
+        Acrescenta ao final do arquivo os candles (brutos da API, em ordem)
+        posteriores ao último armazenado.
+
+        Retorna:
+            int: Quantidade de linhas gravadas.
+        """
+        novos = [c for c in candles if self.last_ts is None or c[0] > self.last_ts]
+        if not novos:
+            return 0
+
+        criar = not os_path.exists(self.filename)
+        with open(self.filename, "a", newline="") as f:
+            writer = csv_writer(f, lineterminator="\n")
+            if criar:
+                writer.writerow(self.header)
+            writer.writerows(self._linha(c) for c in novos)
+
+        if self.first_ts is None:
+            self.first_ts = novos[0][0]
+        self.last_ts = novos[-1][0]
+        self.rows += len(novos)
+        self._salvar_indice()
+        return len(novos)
+
+    def inserir(self, candles: list, posicoes) -> int:
+        """
+        Insere candles em qualquer ponto do arquivo, sem reordenar nem
+        interpretar as linhas existentes. Candles só no final viram um append;
+        no meio, o arquivo inteiro é regravado (O(n) de E/S).
+
+        Parâmetros:
+            candles (list): Candles brutos da API, em ordem de abertura, ainda não
+                armazenados.
+            posicoes: Para cada candle, o índice da linha de dados (sem contar o
+                cabeçalho) antes da qual ele entra, como retornado por
+                ColumnarCandleStore.merge.
+
+        Retorna:
+            int: Quantidade de linhas gravadas.
+        """
+        if not candles:
+            return 0
+        if not self.rows or all(p >= self.rows for p in posicoes):
+            return self.append(candles)
+
+        tmp = f"{self.filename}.tmp"
+        k = 0
+        with open(tmp, "w", newline="") as destino, open(
+            self.filename, "r", newline=""
+        ) as origem:
+            writer = csv_writer(destino, lineterminator="\n")
+            destino.write(origem.readline())  # cabeçalho
+            for j, linha in enumerate(origem):
+                while k < len(candles) and posicoes[k] == j:
+                    writer.writerow(self._linha(candles[k]))
+                    k += 1
+                destino.write(linha)
+            writer.writerows(self._linha(c) for c in candles[k:])
+        os_replace(tmp, self.filename)
+
+        self.first_ts = min(self.first_ts, candles[0][0])
+        self.last_ts = max(self.last_ts, candles[-1][0])
+        self.rows += len(candles)
+        self._salvar_indice()
+        return len(candles)
+
+
+class ColumnarCandleStore:
+    """
+    Armazenamento colunar binário dos candles, lido com numpy.memmap.
+
+    Cada coluna de COLUNAS_BINARIAS fica em `<symbol>_<interval>.cols/<nome>.bin`
+    como valores de largura fixa (int64/float64 little-endian). O arquivo
+    `meta.json` guarda versão, quantidade de linhas e primeiro/último candle;
+    bytes além do registrado no meta (append interrompido) não são lidos.
+
+    Uma intercalação grava todas as colunas em `.tmp` e o novo meta em
+    `intercalacao.json` antes de substituir qualquer coluna. Ao abrir para
+    escrita, uma intercalação interrompida é concluída (ou descartada, se o
+    `intercalacao.json` não chegou a ser gravado) e os bytes excedentes são
+    truncados; com `somente_leitura`, nada é alterado e a intercalação
+    pendente é lida diretamente dos arquivos `.tmp`.
+    """
+
+    def __init__(
+        self, path_file: str, symbol: str, interval: str, somente_leitura=False
+    ):
+        self.symbol = symbol
+        self.interval = interval
+        self.pasta = f"{path_file}/{symbol}_{interval}.cols"
+        self.meta_file = f"{self.pasta}/meta.json"
+        self.intercalacao_file = f"{self.pasta}/intercalacao.json"
+        self.somente_leitura = somente_leitura
+        self.rows = 0
+        self.first_ts = None
+        self.last_ts = None
+        self.lacunas_vazias = []
+        self._leitura = {}  # coluna -> arquivo lido, quando não é o .bin
+        self._abrir()
+
+    @property
+    def exists(self) -> bool:
+        return os_path.exists(self.meta_file)
+
+    def remover(self) -> None:
+        self._verificar_escrita()
+        rmtree(self.pasta, ignore_errors=True)
+        self.rows = 0
+        self.first_ts = None
+        self.last_ts = None
+        self.lacunas_vazias = []
+
+    def _arquivo(self, nome: str) -> str:
+        return f"{self.pasta}/{nome}.bin"
+
+    def _verificar_escrita(self) -> None:
+        if self.somente_leitura:
+            raise PermissionError(f"{self.pasta} foi aberto somente para leitura.")
+
+    def _recuperar(self) -> None:
+        """Conclui ou descarta uma intercalação interrompida."""
+        pendente = os_path.exists(self.intercalacao_file)
+        for nome in COLUNAS_BINARIAS:
+            tmp = f"{self._arquivo(nome)}.tmp"
+            if os_path.exists(tmp):
+                if pendente:
+                    os_replace(tmp, self._arquivo(nome))
+                else:
+                    os_remove(tmp)
+        if pendente:
+            os_replace(self.intercalacao_file, self.meta_file)
+        for tmp in (f"{self.intercalacao_file}.tmp", f"{self.meta_file}.tmp"):
+            if os_path.exists(tmp):
+                os_remove(tmp)
+
+    def _abrir(self) -> None:
+        if not self.somente_leitura and os_path.isdir(self.pasta):
+            self._recuperar()
+
+        meta_file = self.meta_file
+        if self.somente_leitura and os_path.exists(self.intercalacao_file):
+            # Intercalação pendente: colunas ainda não substituídas estão no .tmp
+            meta_file = self.intercalacao_file
+            for nome in COLUNAS_BINARIAS:
+                tmp = f"{self._arquivo(nome)}.tmp"
+                if os_path.exists(tmp):
+                    self._leitura[nome] = tmp
+        elif not self.exists:
+            return
+        with open(meta_file, "r") as f:
+            meta = json_load(f)
+        if meta.get("versao") != VERSAO_COLUNAR:
+            raise ValueError(
+                f"Versão do formato colunar não suportada em {self.pasta}: "
+                f"{meta.get('versao')}"
+            )
+        self.rows = meta["rows"]
+        self.first_ts = meta["first_ts"]
+        self.last_ts = meta["last_ts"]
+        self.lacunas_vazias = [tuple(f) for f in meta.get("lacunas_vazias", [])]
+
+        if self.somente_leitura:
+            return
+        for nome, dtype in COLUNAS_BINARIAS.items():
+            tamanho = self.rows * dtype.itemsize
+            if os_path.getsize(self._arquivo(nome)) > tamanho:
+                with open(self._arquivo(nome), "r+b") as f:
+                    f.truncate(tamanho)
+
+    def _meta(self) -> dict:
+        return {
+            "versao": VERSAO_COLUNAR,
+            "rows": self.rows,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "colunas": {nome: dtype.str for nome, dtype in COLUNAS_BINARIAS.items()},
+            "lacunas_vazias": self.lacunas_vazias,
+        }
+
+    def _salvar_meta(self, destino: str = None) -> None:
+        destino = destino or self.meta_file
+        tmp = f"{destino}.tmp"
+        with open(tmp, "w") as f:
+            json_dump(self._meta(), f)
+        os_replace(tmp, destino)
+
+    def coluna(self, nome: str) -> np.ndarray:
+        """Retorna a coluna como memmap somente leitura (sem copiar para a memória)."""
+        dtype = COLUNAS_BINARIAS[nome]
+        if not self.rows:
+            return np.empty(0, dtype=dtype)
+        arquivo = self._leitura.get(nome) or self._arquivo(nome)
+        return np.memmap(arquivo, dtype=dtype, mode="r", shape=(self.rows,))
+
+    def ler(self, colunas=None) -> dict:
+        return {nome: self.coluna(nome) for nome in colunas or COLUNAS_BINARIAS}
+
+    @staticmethod
+    def _para_arrays(candles: list) -> dict:
+        """Converte candles brutos da API para arrays por coluna."""
+        brutos = np.array([c[:6] for c in candles], dtype=np.float64).reshape(-1, 6)
+        return {
+            "open_time": np.array([c[0] for c in candles], dtype=np.int64),
+            "open": brutos[:, 1],
+            "high": brutos[:, 2],
+            "low": brutos[:, 3],
+            "close": brutos[:, 4],
+            "volume": brutos[:, 5],
+            "trades": np.array([c[8] for c in candles], dtype=np.int64),
+        }
+
+    def append_arrays(self, arrays: dict) -> int:
+        """Acrescenta linhas (em ordem) posteriores ao último candle armazenado."""
+        self._verificar_escrita()
+        tempos = np.asarray(arrays["open_time"], dtype=np.int64)
+        mascara = tempos > self.last_ts if self.last_ts is not None else None
+        if mascara is not None:
+            tempos = tempos[mascara]
+        if not len(tempos):
+            return 0
+
+        makedirs(self.pasta, exist_ok=True)
+        for nome, dtype in COLUNAS_BINARIAS.items():
+            valores = np.asarray(arrays[nome], dtype=dtype)
+            if mascara is not None:
+                valores = valores[mascara]
+            with open(self._arquivo(nome), "ab") as f:
+                f.write(valores.tobytes())
+
+        if self.first_ts is None:
+            self.first_ts = int(tempos[0])
+        self.last_ts = int(tempos[-1])
+        self.rows += len(tempos)
+        self._salvar_meta()
+        return len(tempos)
+
+    def append(self, candles: list) -> int:
+        if not candles:
+            return 0
+        return self.append_arrays(self._para_arrays(candles))
+
+    def posicoes(self, tempos):
+        """
+        Busca binária de `tempos` no índice ordenado de open_time.
+
+        Retorna:
+            tuple: (posição de inserção de cada tempo, máscara dos já existentes).
+        """
+        tempos = np.asarray(tempos, dtype=np.int64)
+        indice = self.coluna("open_time")
+        pos = np.searchsorted(indice, tempos)
+        existe = np.zeros(len(tempos), dtype=bool)
+        dentro = pos < self.rows
+        existe[dentro] = indice[pos[dentro]] == tempos[dentro]
+        return pos, existe
+
+    def merge(self, candles: list):
+        """
+        Insere os candles que ainda não existem (chave: open_time em ms).
+
+        Só o lote novo é ordenado; cada candle é localizado no índice por busca
+        binária, O(novos · log n). Se todos forem posteriores ao último, as
+        colunas recebem apenas um append, O(novos). Caso contrário
+        (preenchimento de lacunas) todas as colunas são lidas e regravadas com
+        os novos valores intercalados: O(n) de E/S por chamada, por isso as
+        lacunas de uma execução devem ser passadas juntas, em um único merge.
+
+        Retorna:
+            tuple: (candles inseridos em ordem, posições de inserção no índice
+            anterior), usados para aplicar a mesma inserção no CSV.
+        """
+        self._verificar_escrita()
+        if not candles:
+            return [], np.empty(0, dtype=np.int64)
+
+        arrays = self._para_arrays(candles)
+        tempos, primeiros = np.unique(arrays["open_time"], return_index=True)
+        pos, existe = self.posicoes(tempos)
+        novos = primeiros[~existe]
+        pos = pos[~existe]
+        if not len(novos):
+            return [], pos
+
+        arrays = {nome: valores[novos] for nome, valores in arrays.items()}
+        if (pos == self.rows).all():
+            self.append_arrays(arrays)
+        else:
+            self._intercalar(arrays, pos)
+        return [candles[i] for i in novos], pos
+
+    def _intercalar(self, arrays: dict, pos) -> None:
+        makedirs(self.pasta, exist_ok=True)
+        # Todas as colunas novas e o meta correspondente são gravados antes de
+        # substituir qualquer arquivo (ver _recuperar)
+        for nome, dtype in COLUNAS_BINARIAS.items():
+            atual = np.array(self.coluna(nome))
+            combinado = np.insert(atual, pos, np.asarray(arrays[nome], dtype=dtype))
+            with open(f"{self._arquivo(nome)}.tmp", "wb") as f:
+                f.write(combinado.tobytes())
+
+        tempos = arrays["open_time"]
+        self.rows += len(pos)
+        self.first_ts = min(self.first_ts, int(tempos[0]))
+        self.last_ts = max(self.last_ts, int(tempos[-1]))
+        self._salvar_meta(self.intercalacao_file)
+        self._recuperar()
+
+    def lacunas(self, intervalo_ms: int, start_ms: int = None, end_ms: int = None):
+        """
+        Faixas [início, fim) sem candles entre candles armazenados, opcionalmente
+        restritas a [start_ms, end_ms). Faixas já confirmadas como vazias na
+        Binance (ex: manutenção da exchange) são ignoradas.
+        """
+        tempos = self.coluna("open_time")
+        inicio = 0 if start_ms is None else int(np.searchsorted(tempos, start_ms))
+        fim = self.rows if end_ms is None else int(np.searchsorted(tempos, end_ms))
+        tempos = tempos[max(inicio - 1, 0) : fim]
+
+        saltos = np.flatnonzero(np.diff(tempos) > intervalo_ms)
+        vazias = set(self.lacunas_vazias)
+        return [
+            faixa
+            for faixa in (
+                (int(tempos[i]) + intervalo_ms, int(tempos[i + 1])) for i in saltos
+            )
+            if faixa not in vazias
+        ]
+
+    def marcar_lacuna_vazia(self, faixa) -> None:
+        """Registra uma faixa sem candles na Binance para não consultá-la de novo."""
+        self._verificar_escrita()
+        self.lacunas_vazias.append(tuple(faixa))
+        self._salvar_meta()
+
+
+def converter_csv(
+    path_file: str, symbol: str, interval: str, recriar: bool = False
+) -> ColumnarCandleStore:
+    """
+    Converte `{symbol}_{interval}.csv` para o formato colunar. Colunas ausentes
+    no CSV (open, high, low e, nos arquivos antigos, o preço) ficam como NaN e
+    trades como -1. Com `recriar`, a pasta colunar existente é descartada.
+    """
+    from pandas import read_csv as pd_read_csv
+
+    df = pd_read_csv(f"{path_file}/{symbol}_{interval}.csv")
+    n = len(df)
+    close = (
+        df["Preço"].to_numpy(dtype=np.float64)
+        if "Preço" in df.columns
+        else np.full(n, np.nan)
+    )
+    arrays = {
+        "open_time": datas_para_ms(df["Data"].to_numpy(dtype=str)),
+        "open": np.full(n, np.nan),
+        "high": np.full(n, np.nan),
+        "low": np.full(n, np.nan),
+        "close": close,
+        "volume": df["Volume"].to_numpy(dtype=np.float64),
+        "trades": np.full(n, -1, dtype=np.int64),
+    }
+
+    store = ColumnarCandleStore(path_file, symbol, interval)
+    if recriar:
+        store.remover()
+    elif store.exists:
+        print(f"Formato colunar já existe em {store.pasta}; acrescentando o que falta.")
+    gravados = store.append_arrays(arrays)
+    print(f"{gravados} candles convertidos para {store.pasta}")
+    return store
+
+
+def ler_candles(path: str) -> dict:
+    """
+    Lê os candles de um CSV ou de uma pasta `.cols` do formato colunar.
+
+    Retorna:
+        dict: {"open_time", "close", "volume"} como arrays (memmap no formato colunar).
+    """
+    if path.rstrip("/").endswith(".cols"):
+        path_file, nome = os_path.split(path.rstrip("/"))
+        symbol, interval = nome[: -len(".cols")].rsplit("_", 1)
+        return ColumnarCandleStore(
+            path_file, symbol, interval, somente_leitura=True
+        ).ler(["open_time", "close", "volume"])
+
+    from pandas import read_csv as pd_read_csv
+
+    df = pd_read_csv(path)
+    return {
+        "open_time": datas_para_ms(df["Data"].to_numpy(dtype=str)),
+        "close": (
+            df["Preço"].to_numpy(dtype=np.float64)
+            if "Preço" in df.columns
+            else np.full(len(df), np.nan)
+        ),
+        "volume": df["Volume"].to_numpy(dtype=np.float64),
+    }
+
+
+def caminho_candles(path_file: str, symbol: str, interval: str) -> str:
+    """Retorna a pasta colunar, se existir, ou o caminho do CSV."""
+    store = ColumnarCandleStore(path_file, symbol, interval, somente_leitura=True)
+    return store.pasta if store.exists else f"{path_file}/{symbol}_{interval}.csv"
+
+
+if __name__ == "__main__":
+    from args_config import ArgumentBuilder
+
+    parser = ArgumentBuilder.base_parser()
+    args = parser.parse_args()
+
+    converter_csv("get_data/data", args.symbol, args.accumulated)
@@ -1,8 +1,21 @@
 from datetime import datetime
-from time import sleep as time_sleep, time as time_time
+from time import perf_counter, sleep as time_sleep
+from get_data.agendador import AgendadorFixo
+from get_data.alertas import obter_dispatcher
 from get_data.api import BinancePublicAPI
 from get_data.args_config import ArgumentBuilder
-from get_data.cross_data import analisar_order_book
+from get_data.cross_data import analisar_order_book, limite_cache
+from get_data.dashboard import Dashboard
+from get_data.fonte_mercado import (
+    FonteAoVivo,
+    FonteGravada,
+    RelogioSistema,
+    RelogioVirtual,
+)
+from get_data.metricas import metricas
+from get_data.microestrutura import MotorFeatures
+from get_data.recorder import Recorder, arquivos_gravados
+from get_data.monitor import carregar_simbolos, executar_monitoramento
 
 
 def parse_args():
@@ -10,84 +23,215 @@ def parse_args():
     return parser.parse_args()
 
 
-def wait_until_start_time(start_time_str):
+def wait_until_start_time(start_time_str, agora=datetime.now, dormir=time_sleep):
     if not start_time_str:
         return True
 
     start_time = datetime.strptime(start_time_str, "%H:%M").time()
-    now = datetime.now().time()
+    now = agora().time()
 
     if now >= start_time:
         return True
 
     print(f"Aguardando hora de início ({start_time_str})...")
-    while datetime.now().time() < start_time:
-        time_sleep(1)
+    while agora().time() < start_time:
+        dormir(1)
     return True
 
 
-def should_continue(end_time_str):
+def should_continue(end_time_str, agora=datetime.now):
     if not end_time_str:
         return True
 
     end_time = datetime.strptime(end_time_str, "%H:%M").time()
-    return datetime.now().time() < end_time
+    return agora().time() < end_time
 
 
 def execute_cli():
     args = parse_args()
     api = BinancePublicAPI()
 
-    if args.interval < 5:
-        print("Intervalo mínimo de 5 segundos forçado.")
-        args.interval = 5
+    # Com o stream o livro já está em memória; só o ticker é consultado via REST
+    intervalo_minimo = 1 if args.stream else 5
+    if args.interval < intervalo_minimo:
+        print(f"Intervalo mínimo de {intervalo_minimo} segundos forçado.")
+        args.interval = intervalo_minimo
+
+    multiplos = bool(args.symbols or args.symbols_file)
+    if multiplos and args.replay:
+        print("O replay é feito um ativo por vez (use --symbol).")
+        return
+    symbols = (
+        carregar_simbolos(args.symbols, args.symbols_file)
+        if multiplos
+        else [args.symbol]
+    )
+    for symbol in symbols:
+        try:
+            limite_cache.preload(symbol, args.accumulated)
+        except OSError:
+            print(f"Estatísticas de {symbol} ({args.accumulated}) não encontradas.")
+
+    if args.metricas:
+        metricas.servir(args.metricas)
+
+    relogio = RelogioSistema()
+    alertar = None
+    alertas_replay = []
+    if args.replay:
+        # Relógio virtual: a gravação é reproduzida na velocidade máxima e os
+        # alertas são impressos em vez de enviados
+        relogio = RelogioVirtual()
+        fonte = FonteGravada(
+            args.symbol,
+            arquivos_gravados(args.replay, args.symbol),
+            relogio,
+            args.limit,
+            args.trades,
+        )
+        if not fonte.ativa:
+            print(f"Nenhuma gravação de {args.symbol} em {args.replay}.")
+            return
+
+        def alertar(mensagem, chave=None):
+            alertas_replay.append(mensagem)
+            print(f"\n[{relogio.now().strftime('%H:%M:%S')}] {mensagem}")
 
     if args.start_time:
-        wait_until_start_time(args.start_time)
-
+        wait_until_start_time(args.start_time, relogio.now, relogio.sleep)
+
+    if multiplos:
+        try:
+            executar_monitoramento(
+                symbols, args, lambda: should_continue(args.end_time)
+            )
+        except KeyboardInterrupt:
+            print("\nColeta interrompida pelo usuário")
+        finally:
+            obter_dispatcher().fechar(timeout=10)
+            print(limite_cache.resumo())
+            print(metricas.resumo())
+            metricas.parar()
+        return
+
+    recorder = None
+    if not args.replay:
+        recorder = Recorder(args.symbol, args.gravar) if args.gravar else None
+        fonte = FonteAoVivo(
+            api,
+            args.symbol,
+            args.limit,
+            args.stream,
+            args.trades,
+            observador=recorder.gravar if recorder else None,
+        )
+        if args.stream:
+            print("Sincronizando order book via WebSocket...")
+    if not fonte.iniciar(timeout=30):
+        print("Não foi possível obter o snapshot inicial do order book.")
+        fonte.parar()
+        if recorder:
+            recorder.fechar()
+        return
+
+    dashboard = None
+    if args.dashboard:
+        dashboard = Dashboard(refresh=args.refresh)
+        dashboard.start()
+
+    motor = MotorFeatures(niveis=args.limit)
+    agendador = AgendadorFixo(args.interval, relogio.monotonic, relogio.sleep)
+    duracao_ciclo = metricas.histograma("ciclo_segundos", laco="cli")
+    atraso_ciclo = metricas.histograma("ciclo_atraso_segundos", laco="cli")
     try:
-        while should_continue(args.end_time):
-            start_time = time_time()
-
-            order_book = api.get_order_book(args.symbol, args.limit)
-            ticker = api.get_ticker_24h(args.symbol)
+        while fonte.ativa and should_continue(args.end_time, relogio.now):
+            inicio = perf_counter()
+            snapshot = fonte.snapshot()
+            order_book, ticker = snapshot.order_book, snapshot.ticker
+
+            if dashboard:
+                analise = None
+                if order_book:
+                    analise = analisar_order_book(
+                        order_book,
+                        ticker,
+                        args.symbol,
+                        args.limit,
+                        args.coluna,
+                        args.accumulated,
+                        fonte.trades,
+                        verbose=False,
+                        alertar=alertar,
+                    )
+                dashboard.publicar(args.symbol, order_book, snapshot.latencia, analise)
+                duracao_ciclo.observar(perf_counter() - inicio)
+                agendador.aguardar()
+                atraso_ciclo.observar(agendador.atraso)
+                continue
 
             if order_book:
-                # Mesclar dados do ticker ao order_book
-                order_book.update(
-                    {
-                        "lastPrice": ticker.get("lastPrice"),
-                        "lastQty": ticker.get("lastQty"),
-                        "bidPrice": ticker.get("bidPrice"),
-                        "askPrice": ticker.get("askPrice"),
-                    }
-                )
-                print("\033c", end="")
+                if not args.replay:
+                    print("\033c", end="")
 
-                print(f"Hora da coleta: {datetime.now().strftime('%H:%M:%S')}")
+                print(f"Hora da coleta: {relogio.now().strftime('%H:%M:%S')}")
                 print("Top 5 Bids (COMPRA):\n")
-                for bid in order_book["bids"][:5]:
-                    print(f"Preço: {float(bid[0]):.2f} Quantidade: {float(bid[1]):.5f}")
+                for preco, quantidade in zip(*order_book.top("bids", 5)):
+                    print(f"Preço: {preco:.2f} Quantidade: {quantidade:.5f}")
 
                 print("\nTop 5 Asks (VENDAS):\n")
-                for ask in order_book["asks"][:5]:
-                    print(f"Preço: {float(ask[0]):.2f} Quantidade: {float(ask[1]):.5f}")
-
-                if order_book["bids"] and order_book["asks"]:
-                    best_bid = float(order_book["bids"][0][0])
-                    best_ask = float(order_book["asks"][0][0])
-                    spread = best_ask - best_bid
-                    print(f"\nSpread: {spread:.4f} ({spread / best_bid * 100:.2f}%)\n")
+                for preco, quantidade in zip(*order_book.top("asks", 5)):
+                    print(f"Preço: {preco:.2f} Quantidade: {quantidade:.5f}")
+
+                spread = order_book.spread
+                if spread is not None:
+                    best_bid = order_book.best_bid
+                    print(f"\nSpread: {spread:.4f} ({spread / best_bid * 100:.2f}%)")
+
+                with metricas.cronometrar("features_segundos"):
+                    features = motor.como_dict(motor.calcular_livro(order_book))
+                print(
+                    f"Imbalance (1/5/10): {features['imbalance_1']:+.2f} / "
+                    f"{features['imbalance_5']:+.2f} / {features['imbalance_10']:+.2f} | "
+                    f"Microprice: {features['microprice']:.2f} | "
+                    f"Slippage {motor.notional:,.0f}: compra "
+                    f"{features['slippage_compra_bps']:.2f} bps, venda "
+                    f"{features['slippage_venda_bps']:.2f} bps\n"
+                )
 
                 analisar_order_book(
-                    order_book, args.symbol, args.limit, args.coluna, args.accumulated
+                    order_book,
+                    ticker,
+                    args.symbol,
+                    args.limit,
+                    args.coluna,
+                    args.accumulated,
+                    fonte.trades,
+                    alertar=alertar,
                 )
 
-            elapsed = time_time() - start_time
-            sleep_time = max(5, args.interval - elapsed)
-
-            print(f"\nPróxima atualização em {sleep_time:.1f} segundos...")
-            time_sleep(sleep_time)
+            duracao_ciclo.observar(perf_counter() - inicio)
+            print(f"\nPróxima atualização em {agendador.restante():.1f} segundos...")
+            agendador.aguardar()
+            atraso_ciclo.observar(agendador.atraso)
 
     except KeyboardInterrupt:
         print("\nColeta interrompida pelo usuário")
+    finally:
+        if dashboard:
+            dashboard.stop()
+        fonte.parar()
+        if recorder:
+            recorder.fechar()
+            print(
+                f"{recorder.registros} registros gravados em {args.gravar} "
+                f"({recorder.descartados} descartados)"
+            )
+        obter_dispatcher().fechar(timeout=10)
+        print(limite_cache.resumo())
+        if args.replay:
+            print(
+                f"Replay: {fonte.aplicados} registros aplicados, "
+                f"{len(alertas_replay)} alertas"
+            )
+        print(metricas.resumo())
+        metricas.parar()
@@ -0,0 +1,28 @@
+from os import path as os_path
+
+if not __package__:
+    import _raiz  # noqa: F401  (executado como script: raiz no sys.path)
+
+from get_data.args_config import ArgumentBuilder
+from get_data.candle_store import caminho_candles
+from get_data.volume_agent import VolumeAgent
+from get_data.volume_env import BinanceVolumeEnv
+
+if __name__ == "__main__":
+    # Conversão única das Q-tables JSON existentes para o formato binário (.npz);
+    # as faixas do formato antigo são ajustadas ao histórico de candles
+    parser = ArgumentBuilder.base_parser()
+    args = parser.parse_args()
+
+    json_path = f"logs/{args.symbol}_q_table.json"
+    csv_path = caminho_candles("get_data/data", args.symbol, args.accumulated)
+    if not os_path.exists(json_path):
+        print(f"Arquivo não encontrado: {json_path}")
+    elif not os_path.exists(csv_path):
+        print(f"Arquivo CSV não encontrado: {csv_path}")
+    else:
+        env = BinanceVolumeEnv(csv_path=csv_path, symbol=args.symbol)
+        agent = VolumeAgent(
+            state_size=5, action_size=3, symbol=args.symbol, carregar=False
+        )
+        agent.converter_json(json_path, env=env)
@@ -1,62 +1,261 @@
-from pandas import read_csv as pd_read_csv
+from csv import reader as csv_reader
+from os import stat as os_stat
+from threading import Lock
 from dotenv import load_dotenv
-from get_data.api import TelegramAlerta
+import numpy as np
+from get_data.alertas import obter_dispatcher
+from get_data.metricas import metricas
 
 # Carrega variáveis de ambiente do arquivo seguro
 load_dotenv("alerta_vol_bot.env")
 
+GRANDE_ORDEM_DTYPE = np.dtype(
+    [
+        ("lado", "U6"),
+        ("preco", "f8"),
+        ("quantidade", "f8"),
+        ("distancia_bps", "f8"),
+        ("profundidade_acumulada", "f8"),
+    ]
+)
 
-def carregar_limite(symbol, accumulated, coluna):
-    path = f"get_data/data/{symbol}_{accumulated}_stat.csv"
-    try:
-        df = pd_read_csv(path)
-        if coluna not in df.columns:
-            raise ValueError(f"Coluna '{coluna}' não encontrada em {path}")
-        limite = float(df[coluna].iloc[0])
+AJUSTE_SEGUNDOS = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "1d": 86400}
+
+
+class LimiteCache:
+    """
+    Cache dos limites de volume por (symbol, accumulated, coluna).
+
+    O arquivo `{symbol}_{accumulated}_stat.csv` só é lido novamente quando seu
+    mtime muda; nas demais consultas o custo é um único stat() no arquivo.
+    """
+
+    def __init__(self, base_path="get_data/data"):
+        self.base_path = base_path
+        self._mtimes = {}  # (symbol, accumulated) -> mtime_ns
+        self._limites = {}  # (symbol, accumulated, coluna) -> limite por segundo
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def _path(self, symbol, accumulated):
+        return f"{self.base_path}/{symbol}_{accumulated}_stat.csv"
+
+    def _carregar(self, symbol, accumulated, mtime):
+        with open(self._path(symbol, accumulated), "r", newline="") as f:
+            reader = csv_reader(f)
+            colunas = next(reader)
+            valores = next(reader)
+
+        ajuste = AJUSTE_SEGUNDOS.get(accumulated, 1)
+        for chave in [k for k in self._limites if k[:2] == (symbol, accumulated)]:
+            del self._limites[chave]
+        for coluna, valor in zip(colunas, valores):
+            self._limites[(symbol, accumulated, coluna)] = float(valor) / ajuste
+        self._mtimes[(symbol, accumulated)] = mtime
 
-        ajuste = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "1d": 86400}.get(
-            accumulated, 1
+    def _atualizar(self, symbol, accumulated):
+        mtime = os_stat(self._path(symbol, accumulated)).st_mtime_ns
+        if self._mtimes.get((symbol, accumulated)) == mtime:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._carregar(symbol, accumulated, mtime)
+
+    def preload(self, symbol, accumulated):
+        """Carrega todas as colunas do arquivo e retorna {coluna: limite}."""
+        with self._lock:
+            self._atualizar(symbol, accumulated)
+            return {
+                chave[2]: limite
+                for chave, limite in self._limites.items()
+                if chave[:2] == (symbol, accumulated)
+            }
+
+    def get(self, symbol, accumulated, coluna):
+        with self._lock:
+            self._atualizar(symbol, accumulated)
+            chave = (symbol, accumulated, coluna)
+            if chave not in self._limites:
+                raise ValueError(
+                    f"Coluna '{coluna}' não encontrada em {self._path(symbol, accumulated)}"
+                )
+            return self._limites[chave]
+
+    def resumo(self):
+        total = self.hits + self.misses
+        taxa = self.hits / total * 100 if total else 0.0
+        return (
+            f"Cache de limites: {self.hits} acertos, {self.misses} recargas "
+            f"({taxa:.1f}% de acerto)"
         )
-        return limite / ajuste if ajuste > 1 else limite
+
+
+limite_cache = LimiteCache()
+
+
+def carregar_limites(symbol, accumulated, colunas):
+    """
+    Retorna {coluna: limite} já ajustado para volume por segundo, usando o
+    cache de estatísticas.
+    """
+    try:
+        return {
+            coluna: limite_cache.get(symbol, accumulated, coluna) for coluna in colunas
+        }
     except Exception:
         print(f"Erro ao carregar estatísticas: {Exception}")
         return None
 
 
-def analisar_order_book(order_book, symbol, limit, coluna, accumulated):
-    print(
-        f"\nAnalisando order book para {symbol} com base em {coluna} ({accumulated})..."
-    )
+def carregar_limite(symbol, accumulated, coluna):
+    limites = carregar_limites(symbol, accumulated, [coluna])
+    return limites[coluna] if limites else None
+
+
+def detectar_grandes_ordens(order_book, limites, limit=None):
+    """
+    Detecta, de forma vetorizada, os níveis do livro com quantidade acima de
+    cada limite informado.
+
+    Parâmetros:
+        order_book (OrderBook): Livro de ordens.
+        limites (dict): {nome: limite}, ex: {"D9": 0.81, "D10": 18.2}.
+        limit (int): Quantidade máxima de níveis avaliados por lado.
+
+    Retorna:
+        dict: {nome: array estruturado (GRANDE_ORDEM_DTYPE)} com lado, preço,
+        quantidade, distância do mid em bps e profundidade acumulada até o nível.
+    """
+    lados, precos, quantidades, acumuladas = [], [], [], []
+    for side, nome in (("bids", "COMPRA"), ("asks", "VENDA")):
+        p, q = order_book.top(side, limit)
+        lados.append(np.full(len(p), nome))
+        precos.append(p)
+        quantidades.append(q)
+        acumuladas.append(np.cumsum(q))
+
+    lados = np.concatenate(lados)
+    precos = np.concatenate(precos)
+    quantidades = np.concatenate(quantidades)
+    acumuladas = np.concatenate(acumuladas)
+
+    mid = order_book.mid_price
+    if mid:
+        distancias = np.abs(precos - mid) / mid * 10_000
+    else:
+        distancias = np.full(len(precos), np.nan)
+
+    nomes = list(limites)
+    valores = np.array([limites[n] for n in nomes], dtype=np.float64)
+    mascara = quantidades[None, :] > valores[:, None]  # (limites, níveis)
+
+    resultado = {}
+    for nome, linha in zip(nomes, mascara):
+        idx = np.flatnonzero(linha)
+        ordens = np.empty(len(idx), dtype=GRANDE_ORDEM_DTYPE)
+        ordens["lado"] = lados[idx]
+        ordens["preco"] = precos[idx]
+        ordens["quantidade"] = quantidades[idx]
+        ordens["distancia_bps"] = distancias[idx]
+        ordens["profundidade_acumulada"] = acumuladas[idx]
+        resultado[nome] = ordens
+    return resultado
+
+
+def volume_comparavel(trades, accumulated, limite):
+    """
+    Escolhe o volume atual e o limite na mesma escala a partir das janelas do
+    TradeAggregator: com uma janela do tamanho do candle (ex: 1m, 5m), compara
+    o volume negociado nela com o limite do candle; senão compara o volume do
+    último segundo com o limite por segundo.
+
+    Retorna:
+        tuple: (volume atual, limite, nome da janela).
+    """
+    if accumulated in trades.janelas:
+        return (
+            trades.volume(accumulated),
+            limite * AJUSTE_SEGUNDOS.get(accumulated, 1),
+            accumulated,
+        )
+    return trades.volume("1s"), limite, "1s"
+
+
+@metricas.cronometrado("analise_segundos")
+def analisar_order_book(
+    order_book,
+    ticker,
+    symbol,
+    limit,
+    coluna,
+    accumulated,
+    trades=None,
+    verbose=True,
+    alertar=None,
+):
+    """
+    Compara o volume atual com o limite da coluna estatística e, se passar,
+    envia um alerta com as grandes ordens do livro (por `alertar(mensagem,
+    chave)`; por padrão, o dispatcher do Telegram).
+
+    Retorna:
+        dict | None: {"volume", "limite", "alertas"} usados na análise, ou None
+        se as estatísticas não estão disponíveis.
+    """
+    if verbose:
+        print(
+            f"\nAnalisando order book para {symbol} com base em {coluna} ({accumulated})..."
+        )
     limite = carregar_limite(symbol, accumulated, coluna)
     if limite is None:
         return
 
-    last_vol_float = float(order_book.get("lastQty", 0))
-    last_price_float = float(order_book.get("lastPrice", 0))
+    ticker = ticker or {}  # consulta do ticker falhou
+    last_price_float = float(ticker.get("lastPrice", 0))
+    if trades is not None:
+        # Volume agregado do stream aggTrade, na mesma escala do limite
+        last_vol_float, limite, janela = volume_comparavel(trades, accumulated, limite)
+        last_price_float = trades.ultimo_preco or last_price_float
+        rotulo_volume = f"Volume negociado ({janela})"
+    else:
+        last_vol_float = float(ticker.get("lastQty", 0))
+        rotulo_volume = "Última Quantidade"
 
-    print(f"\nVol alerta: {limite:.5f}")
-    print(f"Vol atual: {last_vol_float:.5f}")
-    print(f"Diferença: {(last_vol_float - limite):.5f}")
+    if verbose:
+        print(f"\nVol alerta: {limite:.5f}")
+        print(f"Vol atual: {last_vol_float:.5f}")
+        print(f"Diferença: {(last_vol_float - limite):.5f}")
 
-    alertas = []
-    for side, nome in [("bids", "COMPRA"), ("asks", "VENDA")]:
-        for preco, quantidade in order_book.get(side, [])[:limit]:
-            volume = float(quantidade)
-            if last_vol_float > limite:
-                if volume > limite:
-                    alertas.append((nome, preco, volume))
+    resultado = {
+        "volume": last_vol_float,
+        "limite": limite,
+        "alertas": np.empty(0, dtype=GRANDE_ORDEM_DTYPE),
+    }
+    if last_vol_float <= limite:
+        return resultado
 
-    if alertas:
+    alertas = detectar_grandes_ordens(order_book, {coluna: limite}, limit)[coluna]
+    resultado["alertas"] = alertas
+
+    if len(alertas):
         mensagem = [
             f"🚨 *ALERTA DE VOLUME*",
             f"\nSímbolo: `{symbol}`",
             f"\nÚltimo Preço: {last_price_float:.2f}",
-            f"Última Quantidade: {last_vol_float:.5f}",
+            f"{rotulo_volume}: {last_vol_float:.5f}",
             f"Alerta a partir de: {limite:.5f}",
             f"Negociado - Alerta: {(last_vol_float - limite):.5f}\n",
             f"\n*Excessos detectados:*\n",
         ]
-        for tipo, preco, vol in alertas:
-            mensagem.append(f"[{tipo}] Preço: {float(preco):.2f} Vol: {vol:.5f}")
-        telegram = TelegramAlerta()
-        telegram.enviar("\n".join(mensagem))
+        for tipo, preco, vol, dist, _ in alertas:
+            mensagem.append(
+                f"[{tipo}] Preço: {preco:.2f} Vol: {vol:.5f} ({dist:.1f} bps do mid)"
+            )
+        # Repetições do mesmo nível (maior ordem) dentro da janela são agrupadas
+        maior = alertas[np.argmax(alertas["quantidade"])]
+        metricas.contador("alertas_gerados_total", symbol=symbol).incrementar()
+        (alertar or obter_dispatcher().enviar)(
+            "\n".join(mensagem), chave=(symbol, float(maior["preco"]))
+        )
+    return resultado
@@ -0,0 +1,208 @@
+from collections import deque
+from contextlib import redirect_stdout
+from datetime import datetime
+from queue import Full, Queue
+from sys import stdout
+from threading import Event, Lock, Thread
+from unicodedata import category, east_asian_width
+
+# Posição (coluna) e largura de cada célula de uma linha de níveis
+CELULAS_NIVEL = ((0, 14), (15, 14), (32, 14), (47, 14))
+LARGURA_PAINEL = 61
+
+
+def _largura_char(c: str) -> int:
+    """Colunas ocupadas no terminal: emoji e CJK ocupam 2, combinantes 0."""
+    if c == "\ufe0f":
+        return 1  # seletor de emoji: o caractere anterior passa a ocupar 2
+    if category(c) in ("Mn", "Me", "Cf"):
+        return 0
+    return 2 if east_asian_width(c) in ("W", "F") else 1
+
+
+def largura_exibida(texto: str) -> int:
+    """Largura de `texto` no terminal, em colunas."""
+    return sum(_largura_char(c) for c in texto)
+
+
+def ajustar(texto: str, largura: int) -> str:
+    """Corta e completa `texto` com espaços para ocupar exatamente `largura` colunas."""
+    saida = []
+    ocupadas = 0
+    for c in texto:
+        w = _largura_char(c)
+        if ocupadas + w > largura:
+            break
+        saida.append(c)
+        ocupadas += w
+    return "".join(saida) + " " * (largura - ocupadas)
+
+
+class _SaidaPainel:
+    """
+    Substitui o stdout enquanto o painel está ativo: cada linha impressa (por
+    qualquer thread, ex: "Alerta enviado" do dispatcher) vira uma mensagem do
+    painel em vez de ser escrita sobre ele.
+    """
+
+    def __init__(self, dashboard):
+        self.dashboard = dashboard
+        self._parcial = ""
+        self._lock = Lock()
+
+    def write(self, texto: str) -> int:
+        with self._lock:
+            linhas = (self._parcial + texto).split("\n")
+            self._parcial = linhas.pop()
+        for linha in linhas:
+            if linha.strip():
+                self.dashboard.mensagem(linha)
+        return len(texto)
+
+    def flush(self) -> None:
+        pass
+
+
+class Dashboard:
+    """
+    Painel de terminal com vários símbolos, redesenhando só as células que
+    mudaram.
+
+    A coleta chama `publicar`, que apenas copia os níveis do topo para uma fila
+    em memória (descartando se o painel estiver atrasado); uma thread própria
+    esvazia a fila e redesenha a cada `refresh` segundos, independente do
+    intervalo de consulta. Cada célula tem largura fixa e é escrita na sua
+    posição com sequências ANSI, sem limpar a tela.
+
+    Enquanto o painel está ativo, o que for impresso no stdout aparece nas
+    últimas `mensagens` linhas do painel.
+    """
+
+    def __init__(
+        self, niveis: int = 5, refresh: float = 0.5, saida=None, mensagens: int = 5
+    ):
+        self.niveis = niveis
+        self.refresh = refresh
+        self.saida = saida or stdout
+        self.mensagens = deque(maxlen=mensagens)
+        self._redirecionamento = redirect_stdout(_SaidaPainel(self))
+        self.fila = Queue(maxsize=1000)
+        self.descartados = 0
+        self._paineis = {}  # symbol -> último dado publicado
+        self._tela = {}  # (linha, coluna) -> texto já desenhado
+        self._stop = Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self.saida.write("\033[2J\033[?25l")
+        self._redirecionamento.__enter__()
+        self._thread = Thread(target=self._executar, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+            self._redirecionamento.__exit__(None, None, None)
+            self.desenhar()  # mensagens impressas desde o último redesenho
+        linhas = max((l for l, _ in self._tela), default=0) + 2
+        self.saida.write(f"\033[{linhas};1H\033[?25h")
+        self.saida.flush()
+
+    def publicar(self, symbol, order_book, latencia=None, analise=None) -> None:
+        """Enfileira o estado atual do símbolo; nunca espera pelo desenho."""
+        dados = {
+            "symbol": symbol,
+            "hora": datetime.now(),
+            "latencia": latencia,
+            "bids": order_book.top("bids", self.niveis) if order_book else None,
+            "asks": order_book.top("asks", self.niveis) if order_book else None,
+            "best_bid": order_book.best_bid if order_book else None,
+            "best_ask": order_book.best_ask if order_book else None,
+            "spread": order_book.spread if order_book else None,
+            "analise": analise,
+        }
+        try:
+            self.fila.put_nowait(dados)
+        except Full:
+            self.descartados += 1
+
+    def mensagem(self, texto: str) -> None:
+        """Mostra `texto` na área de mensagens do painel."""
+        self.mensagens.append(f"{datetime.now().strftime('%H:%M:%S')} {texto}")
+
+    def _executar(self) -> None:
+        while not self._stop.is_set():
+            while not self.fila.empty():
+                dados = self.fila.get_nowait()
+                self._paineis[dados["symbol"]] = dados
+            self.desenhar()
+            self._stop.wait(self.refresh)
+
+    def _celulas(self) -> dict:
+        """Monta a tela como {(linha, coluna): texto com largura fixa}."""
+        celulas = {
+            (0, 0): f"{'Atualizado: ' + datetime.now().strftime('%H:%M:%S'):<40}"
+        }
+        linha = 2
+        for dados in self._paineis.values():
+            latencia = dados["latencia"]
+            latencia = f"{latencia * 1000:.0f} ms" if latencia is not None else "-"
+            celulas[(linha, 0)] = f"{dados['symbol']:<14}"
+            celulas[(linha, 15)] = f"{dados['hora'].strftime('%H:%M:%S'):<14}"
+            celulas[(linha, 32)] = f"{'Latência: ' + latencia:<29}"
+
+            for coluna, largura, rotulo, nome, formato in (
+                (0, 14, "Bid", "best_bid", ".2f"),
+                (15, 16, "Ask", "best_ask", ".2f"),
+                (32, 29, "Spread", "spread", ".4f"),
+            ):
+                valor = dados[nome]
+                texto = format(valor, formato) if valor is not None else "-"
+                celulas[(linha + 1, coluna)] = f"{rotulo + ' ' + texto:<{largura}}"
+            celulas[(linha + 2, 0)] = f"{'Preço (C)':>14}"
+            celulas[(linha + 2, 15)] = f"{'Qtd (C)':>14}"
+            celulas[(linha + 2, 32)] = f"{'Preço (V)':>14}"
+            celulas[(linha + 2, 47)] = f"{'Qtd (V)':>14}"
+
+            for i in range(self.niveis):
+                valores = []
+                for lado in ("bids", "asks"):
+                    precos, quantidades = dados[lado] or ((), ())
+                    valores += (
+                        [f"{precos[i]:.2f}", f"{quantidades[i]:.5f}"]
+                        if i < len(precos)
+                        else ["", ""]
+                    )
+                for (coluna, largura), valor in zip(CELULAS_NIVEL, valores):
+                    celulas[(linha + 3 + i, coluna)] = f"{valor:>{largura}}"
+
+            analise = dados["analise"]
+            if analise is None:
+                alerta = "Sem estatísticas"
+            else:
+                alerta = f"Vol {analise['volume']:.5f} / limite {analise['limite']:.5f}"
+                if len(analise["alertas"]):
+                    alerta += f" | 🚨 {len(analise['alertas'])} grandes ordens"
+            celulas[(linha + 3 + self.niveis, 0)] = ajustar(alerta, LARGURA_PAINEL)
+            linha += 5 + self.niveis
+
+        for i, texto in enumerate(list(self.mensagens)):
+            celulas[(linha + i, 0)] = ajustar(texto, LARGURA_PAINEL)
+        return celulas
+
+    def desenhar(self) -> None:
+        celulas = self._celulas()
+        saida = []
+        for (linha, coluna), texto in celulas.items():
+            if self._tela.get((linha, coluna)) != texto:
+                saida.append(f"\033[{linha + 1};{coluna + 1}H{texto}")
+        for posicao in self._tela.keys() - celulas.keys():
+            linha, coluna = posicao
+            largura = largura_exibida(self._tela[posicao])
+            saida.append(f"\033[{linha + 1};{coluna + 1}H{' ' * largura}")
+        self._tela = celulas
+        if saida:
+            self.saida.write("".join(saida))
+            self.saida.flush()
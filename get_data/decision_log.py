@@ -0,0 +1,173 @@
+from csv import writer as csv_writer
+from datetime import datetime
+from os import makedirs, path as os_path, rename as os_rename
+from time import time
+import numpy as np
+
+from get_data.escritor_fundo import EscritorFundo
+
+ACOES = ["HOLD", "BUY", "SELL"]
+
+COLUNAS_DECISAO = [
+    "Timestamp",
+    "Symbol",
+    "Action",
+    "Price",
+    "Volume",
+    "BestBid",
+    "BestAsk",
+    "Spread",
+    "Position",
+    "Balance",
+    "Reward",
+]
+
+# Registro de tamanho fixo do formato binário (.bin), lido com ler_decisoes
+DECISAO_DTYPE = np.dtype(
+    [
+        ("timestamp", "f8"),
+        ("action", "i1"),
+        ("price", "f8"),
+        ("volume", "f8"),
+        ("best_bid", "f8"),
+        ("best_ask", "f8"),
+        ("spread", "f8"),
+        ("position", "f8"),
+        ("balance", "f8"),
+        ("reward", "f8"),
+    ]
+)
+
+
+def ler_decisoes(path: str) -> np.ndarray:
+    """Lê um arquivo de decisões no formato binário como array estruturado."""
+    return np.fromfile(path, dtype=DECISAO_DTYPE)
+
+
+class DecisionLogWriter:
+    """
+    Log de decisões do agente gravado em segundo plano.
+
+    `registrar` apenas coloca o registro em uma fila (EscritorFundo, com até
+    `max_fila` registros); uma thread grava os registros em lotes, quando
+    acumula `lote` registros ou a cada `intervalo` segundos. O arquivo ativo é
+    `{pasta}/{symbol}_decisions_log.{csv|bin}` e é rotacionado (renomeado com
+    data e hora) ao passar de `max_bytes` ou quando o dia muda. `fechar` grava
+    tudo o que ainda está na fila. Registros descartados (fila cheia ou falha
+    ao gravar) são contados em `descartados`.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        pasta: str = "logs",
+        formato: str = "csv",
+        lote: int = 100,
+        intervalo: float = 1.0,
+        max_bytes: int = 50_000_000,
+        rotacao_diaria: bool = True,
+        max_fila: int = 100_000,
+    ):
+        if formato not in ("csv", "bin"):
+            raise ValueError(f"Formato inválido: {formato}.")
+        self.symbol = symbol
+        self.formato = formato
+        self.lote = lote
+        self.intervalo = intervalo
+        self.max_bytes = max_bytes
+        self.rotacao_diaria = rotacao_diaria
+        self.arquivo = f"{pasta}/{symbol}_decisions_log.{formato}"
+        makedirs(pasta, exist_ok=True)
+
+        self._dia = self._dia_arquivo()
+        self._escritor = EscritorFundo(
+            self._gravar,
+            f"Log de decisões de {symbol}: registros descartados",
+            lote=lote,
+            intervalo=intervalo,
+            max_fila=max_fila,
+        )
+
+    @property
+    def descartados(self) -> int:
+        return self._escritor.descartados
+
+    def registrar(
+        self,
+        action,
+        preco,
+        volume,
+        bid_price,
+        ask_price,
+        spread,
+        posicao,
+        saldo,
+        reward,
+        timestamp=None,
+    ) -> None:
+        """Enfileira uma decisão; nunca espera pelo disco."""
+        registro = (
+            timestamp or time(),
+            int(action),
+            float(preco),
+            float(volume),
+            float(bid_price),
+            float(ask_price),
+            float(spread),
+            float(posicao),
+            float(saldo),
+            float(reward),
+        )
+        self._escritor.enfileirar(registro)
+
+    def fechar(self) -> None:
+        """Grava os registros pendentes e encerra a thread de escrita."""
+        self._escritor.fechar()
+
+    def _dia_arquivo(self):
+        if not os_path.exists(self.arquivo):
+            return None
+        return datetime.fromtimestamp(os_path.getmtime(self.arquivo)).date()
+
+    def _rotacionar(self, dia):
+        """Renomeia o arquivo ativo se passou do tamanho máximo ou o dia mudou."""
+        if not os_path.exists(self.arquivo):
+            return
+        excedeu = self.max_bytes and os_path.getsize(self.arquivo) >= self.max_bytes
+        virou_dia = self.rotacao_diaria and self._dia is not None and dia != self._dia
+        if excedeu or virou_dia:
+            sufixo = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            base, extensao = os_path.splitext(self.arquivo)
+            os_rename(self.arquivo, f"{base}_{sufixo}{extensao}")
+
+    def _gravar(self, registros):
+        dia = datetime.now().date()
+        self._rotacionar(dia)
+        self._dia = dia
+
+        if self.formato == "bin":
+            with open(self.arquivo, "ab") as f:
+                np.array(registros, dtype=DECISAO_DTYPE).tofile(f)
+            return
+
+        novo = not os_path.exists(self.arquivo)
+        with open(self.arquivo, "a", newline="") as f:
+            writer = csv_writer(f)
+            if novo:
+                writer.writerow(COLUNAS_DECISAO)
+            writer.writerows(
+                [
+                    datetime.fromtimestamp(r[0]).strftime("%Y-%m-%d %H:%M:%S"),
+                    self.symbol,
+                    ACOES[r[1]],
+                    f"{r[2]:.2f}",
+                    f"{r[3]:.5f}",
+                    f"{r[4]:.2f}",
+                    f"{r[5]:.2f}",
+                    f"{r[6]:.2f}",
+                    f"{r[7]:.5f}",
+                    f"{r[8]:.2f}",
+                    f"{r[9]:.2f}",
+                ]
+                for r in registros
+            )
@@ -0,0 +1,193 @@
+from json import loads as json_loads
+from threading import Thread, Event, Lock
+from time import sleep as time_sleep
+
+from get_data.order_book import OrderBook
+
+
+class WebSocketTransport:
+    """
+    Transporte padrão do stream de profundidade, baseado no pacote websocket-client.
+
+    Qualquer objeto com os métodos connect(url), recv() e close() pode substituir
+    este transporte (ex: um servidor WebSocket local que reproduz frames gravados).
+    """
+
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        self._ws = None
+
+    def connect(self, url: str) -> None:
+        from websocket import create_connection
+
+        self._ws = create_connection(url, timeout=self.timeout)
+
+    def recv(self):
+        return self._ws.recv()
+
+    def close(self) -> None:
+        if self._ws is not None:
+            self._ws.close()
+            self._ws = None
+
+
+class ReplayTransport:
+    """
+    Transporte que devolve uma sequência de frames já gravados, sem rede.
+    Ao final dos frames, recv() retorna None e o stream é encerrado.
+    """
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self._iter = None
+
+    def connect(self, url: str) -> None:
+        self._iter = iter(self.frames)
+
+    def recv(self):
+        return next(self._iter, None)
+
+    def close(self) -> None:
+        self._iter = None
+
+
+class DepthStreamBook:
+    """
+    Livro de ordens local mantido a partir do stream de diferenças `depth@100ms`.
+
+    Segue o procedimento da Binance: abre o stream, obtém um snapshot via REST e
+    aplica somente os eventos posteriores ao `lastUpdateId`. O primeiro evento
+    aplicado deve satisfazer U <= lastUpdateId + 1 <= u e cada evento seguinte deve
+    ter U igual ao u anterior + 1. Ao detectar uma lacuna, um novo snapshot é obtido.
+    """
+
+    stream_url = "wss://stream.binance.com:9443/ws"
+
+    def __init__(
+        self,
+        api,
+        symbol: str = "BTCUSDT",
+        snapshot_limit: int = 1000,
+        transport=None,
+        stream_url: str = None,
+        speed: str = "100ms",
+        observador=None,
+    ):
+        self.api = api
+        self.symbol = symbol.upper()
+        self.snapshot_limit = snapshot_limit
+        self.transport = transport or WebSocketTransport()
+        base = stream_url or self.stream_url
+        self.url = f"{base}/{self.symbol.lower()}@depth@{speed}"
+
+        # Chamado com ("depth", snapshot) e ("depth_diff", evento), ex: Recorder.gravar
+        self.observador = observador
+        self.book = OrderBook(self.symbol)
+        self.resyncs = 0
+        self._synced = False
+        self._lock = Lock()
+        self._ready = Event()
+        self._stop = Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Inicia a manutenção do livro em uma thread de fundo."""
+        self._stop.clear()
+        self._thread = Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.transport.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        """Aguarda o primeiro snapshot ser carregado."""
+        return self._ready.wait(timeout)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def run(self) -> None:
+        """
+        Laço principal: conecta, sincroniza e aplica os eventos recebidos.
+        Em caso de erro de conexão, tenta reconectar até stop() ser chamado.
+        """
+        while not self._stop.is_set():
+            try:
+                self.transport.connect(self.url)
+                self.resync()
+                while not self._stop.is_set():
+                    frame = self.transport.recv()
+                    if frame is None:
+                        return
+                    event = (
+                        json_loads(frame) if isinstance(frame, (str, bytes)) else frame
+                    )
+                    if self.observador and event.get("e") == "depthUpdate":
+                        self.observador("depth_diff", event)
+                    if not self.process_event(event):
+                        print(f"Lacuna no stream de {self.symbol}. Ressincronizando...")
+                        self.resync()
+            except Exception as e:
+                if self._stop.is_set():
+                    return
+                print(f"Erro no stream de profundidade: {e}. Reconectando...")
+                time_sleep(1)
+            finally:
+                self.transport.close()
+
+    def resync(self) -> None:
+        """Carrega um novo snapshot via REST, descartando o estado local."""
+        snapshot = None
+        while snapshot is None and not self._stop.is_set():
+            snapshot = self.api.get_order_book(self.symbol, self.snapshot_limit)
+            if snapshot is None:
+                time_sleep(1)
+        if snapshot is None:
+            return
+        if self.observador:
+            self.observador("depth", snapshot)
+        self.carregar(snapshot)
+
+    def carregar(self, snapshot: dict) -> None:
+        """Substitui o livro local por um snapshot no formato do /depth."""
+        with self._lock:
+            self.book.load_snapshot(snapshot)
+            self._synced = False
+        self.resyncs += 1
+        self._ready.set()
+
+    def process_event(self, event: dict) -> bool:
+        """
+        Aplica um evento `depthUpdate` ao livro local.
+
+        Retorna:
+            bool: False se uma lacuna na sequência foi detectada (requer resync).
+        """
+        if event.get("e") != "depthUpdate":
+            return True
+
+        first_id, final_id = event["U"], event["u"]
+        with self._lock:
+            last_update_id = self.book.last_update_id
+            if final_id <= last_update_id:
+                return True  # evento anterior ao snapshot
+            if first_id > last_update_id + 1:
+                return False
+            if self._synced and first_id != last_update_id + 1:
+                return False
+
+            self.book.apply_levels("bids", event["b"])
+            self.book.apply_levels("asks", event["a"])
+            self.book.last_update_id = final_id
+            self._synced = True
+        return True
+
+    def snapshot(self, limit: int = 10) -> OrderBook:
+        """Retorna uma cópia com os `limit` melhores níveis de cada lado."""
+        with self._lock:
+            return self.book.copy(limit)
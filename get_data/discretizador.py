@@ -0,0 +1,130 @@
+import numpy as np
+
+METODOS_VOLUME = ("quantil", "log")
+
+# Faixas de [volume, preço, posição, saldo, imbalance]
+BINS_PADRAO = (10, 10, 2, 10, 5)
+
+
+class Discretizador:
+    """
+    Converte o estado [volume, preço, posição, saldo, imbalance] em um índice
+    inteiro de célula, mapeando cada variável para um número fixo de faixas
+    (bins).
+
+    O volume usa bordas por quantis ou espaçadas em escala log; o preço usa
+    quantis; a posição separa "sem posição" (0) de faixas log; o saldo separa
+    saldo zerado de faixas log em torno do saldo inicial; o imbalance do livro
+    usa faixas iguais em [-1, 1]. Antes de `ajustar`, usa bordas log amplas
+    que servem para qualquer ativo.
+    """
+
+    def __init__(self, bins=BINS_PADRAO, volume="quantil"):
+        if volume not in METODOS_VOLUME:
+            raise ValueError(f"Método de volume inválido: {volume}.")
+        self.bins = tuple(int(b) for b in bins)
+        self.volume = volume
+        self.ajustado = False
+        self.bordas = [
+            self._log(1e-4, 1e6, self.bins[0]),
+            self._log(1e-4, 1e6, self.bins[1]),
+            self._posicao(self.bins[2]),
+            self._saldo(1e4, self.bins[3]),
+            self._imbalance(self.bins[4]),
+        ]
+
+    @property
+    def n_estados(self) -> int:
+        return int(np.prod(self.bins))
+
+    @staticmethod
+    def _log(minimo, maximo, bins):
+        """`bins - 1` bordas espaçadas em escala log entre minimo e maximo."""
+        return np.geomspace(minimo, maximo, bins + 1)[1:-1]
+
+    @staticmethod
+    def _quantis(valores, bins):
+        return np.quantile(valores, np.linspace(0, 1, bins + 1)[1:-1])
+
+    @staticmethod
+    def _posicao(bins):
+        if bins < 2:
+            return np.empty(0)
+        return np.concatenate(([0.0], np.geomspace(1e-4, 1e4, bins - 2)))
+
+    @staticmethod
+    def _saldo(saldo_inicial, bins):
+        if bins < 2:
+            return np.empty(0)
+        return np.concatenate(
+            ([0.0], np.geomspace(saldo_inicial / 2, saldo_inicial * 2, bins - 2))
+        )
+
+    @staticmethod
+    def _imbalance(bins):
+        return np.linspace(-1.0, 1.0, bins + 1)[1:-1]
+
+    def ajustar(self, volumes, precos, saldo_inicial):
+        """Calcula as bordas a partir do histórico usado no treinamento."""
+        volumes = np.asarray(volumes, dtype=np.float64)
+        if self.volume == "log":
+            positivos = volumes[volumes > 0]
+            minimo = positivos.min() if len(positivos) else 1e-8
+            maximo = max(volumes.max(), minimo * 10)
+            self.bordas[0] = self._log(minimo, maximo, self.bins[0])
+        else:
+            self.bordas[0] = self._quantis(volumes, self.bins[0])
+        self.bordas[1] = self._quantis(precos, self.bins[1])
+        self.bordas[3] = self._saldo(saldo_inicial, self.bins[3])
+        self.ajustado = True
+        return self
+
+    def indices(self, states):
+        """
+        Índice da célula de cada estado. Aceita um estado (retorna int) ou um
+        lote com um estado por linha (retorna array de int). Estados com menos
+        variáveis (ex: Q-tables antigas, sem imbalance) usam só as primeiras
+        faixas.
+        """
+        states = np.asarray(states, dtype=np.float64)
+        lote = np.atleast_2d(states)
+        n = lote.shape[1]
+        colunas = [
+            np.searchsorted(bordas, lote[:, i])
+            for i, bordas in enumerate(self.bordas[:n])
+        ]
+        indices = np.ravel_multi_index(colunas, self.bins[:n])
+        return indices if states.ndim > 1 else int(indices[0])
+
+    @classmethod
+    def de_dict(cls, dados: dict):
+        bins = list(dados["bins"])
+        discretizador = cls(bins + list(BINS_PADRAO[len(bins) :]), dados["volume"])
+        for i, bordas in enumerate(dados["bordas"]):
+            discretizador.bordas[i] = np.asarray(bordas, dtype=np.float64)
+        discretizador.ajustado = dados["ajustado"]
+        return discretizador
+
+    def para_arrays(self) -> dict:
+        """Campos como arrays, para gravação em `.npz` sem pickle."""
+        arrays = {
+            "bins": np.array(self.bins),
+            "volume": np.array(self.volume),
+            "ajustado": np.array(self.ajustado),
+        }
+        for i, bordas in enumerate(self.bordas):
+            arrays[f"bordas_{i}"] = bordas
+        return arrays
+
+    @classmethod
+    def de_arrays(cls, dados):
+        """
+        Inverso de `para_arrays`. Variáveis que o arquivo não tem (ex: imbalance,
+        nas Q-tables da versão 1) ficam com as faixas padrão.
+        """
+        bins = dados["bins"].tolist()
+        discretizador = cls(bins + list(BINS_PADRAO[len(bins) :]), str(dados["volume"]))
+        for i in range(len(bins)):
+            discretizador.bordas[i] = dados[f"bordas_{i}"]
+        discretizador.ajustado = bool(dados["ajustado"])
+        return discretizador
@@ -0,0 +1,116 @@
+from atexit import register as atexit_register, unregister as atexit_unregister
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from time import monotonic
+
+_FIM = object()
+
+
+class EscritorFundo:
+    """
+    Fila limitada consumida por uma thread que grava os itens em lotes.
+
+    `enfileirar` nunca espera pelo disco: com a fila cheia (`max_fila` itens)
+    o item é descartado. A thread junta até `lote` itens e chama
+    `gravar(itens)` assim que a fila esvazia ou, com `intervalo`, quando
+    acumula `lote` itens ou a cada `intervalo` segundos. Uma exceção em
+    `gravar` (ex: disco cheio) descarta o lote sem encerrar a thread.
+
+    Os descartes são contados em `descartados`; `aviso` é impresso com o
+    motivo só no início de cada sequência de falhas. `fechar` grava o que
+    ainda está na fila, chama `ao_encerrar` na thread e também é chamado na
+    saída do interpretador.
+    """
+
+    def __init__(
+        self,
+        gravar,
+        aviso: str,
+        lote: int = 1000,
+        intervalo: float = None,
+        max_fila: int = 100_000,
+        ao_encerrar=None,
+    ):
+        self.gravar = gravar
+        self.aviso = aviso
+        self.lote = lote
+        self.intervalo = intervalo
+        self.ao_encerrar = ao_encerrar
+        self.descartados = 0
+        self._falhando = False
+        self._lock = Lock()
+
+        self.fila = Queue(maxsize=max_fila)
+        self._thread = Thread(target=self._executar, daemon=True)
+        self._thread.start()
+        atexit_register(self.fechar)
+
+    def enfileirar(self, item) -> None:
+        try:
+            self.fila.put_nowait(item)
+        except Full:
+            self.descartar(1, "fila cheia")
+
+    def fechar(self) -> None:
+        """Grava os itens pendentes e encerra a thread de escrita."""
+        while self._thread.is_alive():
+            try:
+                self.fila.put(_FIM, timeout=0.1)
+                break
+            except Full:
+                pass
+        self._thread.join()
+        atexit_unregister(self.fechar)
+
+    def descartar(self, quantidade: int, motivo) -> None:
+        """Conta itens descartados; o motivo é impresso no início de cada falha."""
+        with self._lock:
+            self.descartados += quantidade
+            avisar = not self._falhando
+            self._falhando = True
+        if avisar:
+            print(f"{self.aviso} ({motivo}).")
+
+    def _pronto(self, pendentes, ultimo) -> bool:
+        if self.intervalo is None:
+            return True
+        return len(pendentes) >= self.lote or monotonic() - ultimo >= self.intervalo
+
+    def _executar(self):
+        pendentes = []
+        ultimo = monotonic()
+        fim = False
+        try:
+            while not fim:
+                espera = None
+                if self.intervalo is not None:
+                    espera = max(self.intervalo - (monotonic() - ultimo), 0)
+                try:
+                    item = self.fila.get(timeout=espera)
+                    if item is _FIM:
+                        fim = True
+                    else:
+                        pendentes.append(item)
+                except Empty:
+                    pass
+
+                # Junta o que já está na fila no mesmo lote
+                while not fim and len(pendentes) < self.lote and not self.fila.empty():
+                    item = self.fila.get_nowait()
+                    if item is _FIM:
+                        fim = True
+                    else:
+                        pendentes.append(item)
+
+                if pendentes and (fim or self._pronto(pendentes, ultimo)):
+                    try:
+                        self.gravar(pendentes)
+                        self._falhando = False
+                    except Exception as e:
+                        self.descartar(len(pendentes), e)
+                    pendentes = []
+                if not pendentes:
+                    ultimo = monotonic()
+        finally:
+            if self.ao_encerrar:
+                self.ao_encerrar()
@@ -0,0 +1,229 @@
+from datetime import datetime
+from time import monotonic, sleep as time_sleep, time as time_time
+import numpy as np
+
+from get_data.depth_stream import DepthStreamBook, ReplayTransport
+from get_data.microestrutura import empilhar_livros
+from get_data.recorder import ler_gravacao
+from get_data.snapshot import MarketSnapshot
+from get_data.trade_stream import AggTradeStream, TradeAggregator
+
+
+class RelogioSistema:
+    """Relógio real: horário do sistema e time.sleep."""
+
+    def time(self) -> float:
+        return time_time()
+
+    def monotonic(self) -> float:
+        return monotonic()
+
+    def sleep(self, segundos: float) -> None:
+        time_sleep(segundos)
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+
+class RelogioVirtual:
+    """
+    Relógio de replay: `sleep` apenas avança o horário, sem esperar, e `now`
+    devolve o horário da gravação. O mesmo valor serve de epoch e de relógio
+    monotônico.
+    """
+
+    def __init__(self, inicio: float = 0.0):
+        self.agora = inicio
+
+    def time(self) -> float:
+        return self.agora
+
+    def monotonic(self) -> float:
+        return self.agora
+
+    def sleep(self, segundos: float) -> None:
+        if segundos > 0:
+            self.agora += segundos
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.agora)
+
+    def avancar_para(self, horario: float) -> None:
+        self.agora = max(self.agora, horario)
+
+
+class FonteAoVivo:
+    """
+    Dados de mercado da Binance para os laços de coleta.
+
+    Sem stream, cada `snapshot` busca depth e ticker em paralelo via REST; com
+    `stream`, o livro é mantido pelo DepthStreamBook e só o ticker é
+    consultado. Com `trades`, o volume negociado vem do stream aggTrade.
+    `observador` (ex: Recorder.gravar) recebe tudo o que é coletado.
+
+    Uma fonte tem `iniciar`, `parar`, `snapshot` (MarketSnapshot), `trades`
+    (TradeAggregator ou None) e `ativa` (False quando não há mais dados); a
+    FonteGravada segue a mesma interface.
+    """
+
+    ativa = True
+
+    def __init__(
+        self,
+        api,
+        symbol: str,
+        limit: int = 10,
+        stream: bool = False,
+        trades: bool = False,
+        observador=None,
+        snapshot_limit: int = None,
+    ):
+        self.api = api
+        self.symbol = symbol.upper()
+        self.limit = limit
+        self.observador = observador
+        self.stream_book = None
+        if stream:
+            self.stream_book = DepthStreamBook(
+                api,
+                self.symbol,
+                snapshot_limit=snapshot_limit or max(limit, 1000),
+                observador=observador,
+            )
+        self.trade_stream = (
+            AggTradeStream(self.symbol, observador=observador) if trades else None
+        )
+
+    @property
+    def trades(self):
+        return self.trade_stream.aggregator if self.trade_stream else None
+
+    def iniciar(self, timeout: float = 30) -> bool:
+        """Inicia os streams; False se o livro não sincronizou a tempo."""
+        pronto = True
+        if self.stream_book:
+            self.stream_book.start()
+            pronto = self.stream_book.wait_ready(timeout)
+        if self.trade_stream:
+            self.trade_stream.start()
+        return pronto
+
+    def parar(self) -> None:
+        if self.stream_book:
+            self.stream_book.stop()
+        if self.trade_stream:
+            self.trade_stream.stop()
+
+    def snapshot(self) -> MarketSnapshot:
+        if self.stream_book:
+            inicio = time_time()
+            order_book = (
+                self.stream_book.snapshot(self.limit)
+                if self.stream_book.ready
+                else None
+            )
+            ticker = self.api.get_ticker_24h(self.symbol) or {}
+            fim = time_time()
+            snapshot = MarketSnapshot(
+                self.symbol, fim, fim - inicio, order_book, ticker
+            )
+        else:
+            # Depth e ticker em paralelo, com um único horário de coleta
+            snapshot = self.api.get_market_snapshot(self.symbol, self.limit)
+            if self.observador and snapshot.order_book:
+                self.observador("depth", snapshot.order_book, snapshot.timestamp)
+        # No modo stream o livro já é gravado como snapshot + diffs
+        if self.observador and snapshot.ticker:
+            self.observador("ticker", snapshot.ticker, snapshot.timestamp)
+        return snapshot
+
+
+class FonteGravada:
+    """
+    Reproduz uma gravação do Recorder na interface da FonteAoVivo, sem rede.
+
+    O relógio virtual começa no horário do primeiro registro e cada `snapshot`
+    aplica os registros gravados até o horário atual do relógio: snapshots e
+    diffs de profundidade (com a mesma verificação de sequência do stream),
+    ticker e negócios. Como o tempo só avança pelo relógio, a mesma gravação
+    produz sempre o mesmo resultado, na velocidade máxima.
+    """
+
+    def __init__(
+        self, symbol: str, arquivos, relogio, limit: int = 10, trades: bool = False
+    ):
+        self.symbol = symbol.upper()
+        self.relogio = relogio
+        self.limit = limit
+        self.registros = ler_gravacao(arquivos)
+        # Só a lógica de sequência do stream é usada; nada é conectado
+        self.livro = DepthStreamBook(None, self.symbol, transport=ReplayTransport([]))
+        self.aggregator = (
+            TradeAggregator(relogio=lambda: int(relogio.time() * 1000))
+            if trades
+            else None
+        )
+        self.ticker = {}
+        self.aplicados = 0
+        self._proximo = next(self.registros, None)
+        if self._proximo is not None:
+            relogio.avancar_para(self._proximo[1])
+
+    @property
+    def trades(self):
+        return self.aggregator
+
+    @property
+    def ativa(self) -> bool:
+        return self._proximo is not None
+
+    def iniciar(self, timeout: float = None) -> bool:
+        return self.ativa
+
+    def parar(self) -> None:
+        self.registros.close()
+
+    def _avancar(self) -> None:
+        agora = self.relogio.time()
+        while self._proximo is not None and self._proximo[1] <= agora:
+            tipo, _, _, dados = self._proximo
+            if tipo == "depth":
+                self.livro.carregar(dados)
+            elif tipo == "depth_diff":
+                # Numa lacuna a gravação já traz o snapshot do resync seguinte
+                self.livro.process_event(dados)
+            elif tipo == "ticker":
+                self.ticker = dados
+            elif tipo == "trade" and self.aggregator:
+                self.aggregator.processar(dados)
+            self.aplicados += 1
+            self._proximo = next(self.registros, None)
+
+    def snapshot(self) -> MarketSnapshot:
+        self._avancar()
+        order_book = self.livro.snapshot(self.limit) if self.livro.ready else None
+        return MarketSnapshot(
+            self.symbol, self.relogio.time(), 0.0, order_book, self.ticker
+        )
+
+
+def livros_gravados(
+    symbol: str, arquivos, niveis: int = 20, intervalo: float = 1.0
+) -> tuple:
+    """
+    Amostra o livro de uma gravação do Recorder a cada `intervalo` segundos
+    (relógio virtual, sem esperar).
+
+    Retorna:
+        tuple: (horários em epoch, array (snapshots, níveis, 4)).
+    """
+    relogio = RelogioVirtual()
+    fonte = FonteGravada(symbol, arquivos, relogio, niveis)
+    horarios, livros = [], []
+    while fonte.ativa:
+        snapshot = fonte.snapshot()
+        if snapshot.order_book is not None:
+            horarios.append(snapshot.timestamp)
+            livros.append(snapshot.order_book)
+        relogio.sleep(intervalo)
+    return np.array(horarios), empilhar_livros(livros, niveis)
@@ -1,5 +1,8 @@
-from api import BinancePublicAPI
-from args_config import ArgumentBuilder
+if not __package__:
+    import _raiz  # noqa: F401  (executado como script: raiz no sys.path)
+
+from get_data.api import BinancePublicAPI
+from get_data.args_config import ArgumentBuilder
 
 
 def main():
@@ -18,8 +21,18 @@ def main():
         return
 
     fetcher = BinancePublicAPI()
-    print(">>> Chamando fetch_volume()")
-    fetcher.fetch_volume(args.symbol, start, end, args.accumulated)
+    if args.symbols or args.intervals:
+        print(">>> Chamando fetch_volumes()")
+        fetcher.fetch_volumes(
+            args.symbols or [args.symbol],
+            start,
+            end,
+            args.intervals or [args.accumulated],
+            args.workers,
+        )
+    else:
+        print(">>> Chamando fetch_volume()")
+        fetcher.fetch_volume(args.symbol, start, end, args.accumulated, args.workers)
 
 
 if __name__ == "__main__":
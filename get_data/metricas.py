@@ -0,0 +1,264 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import perf_counter
+
+# Limites superiores (segundos) dos buckets padrão dos histogramas
+BUCKETS_PADRAO = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Texto de ajuda (# HELP) de cada métrica exportada
+AJUDA = {
+    "binance_http_latencia_segundos": "Latência das requisições à API da Binance",
+    "binance_requisicoes_total": "Requisições à API da Binance",
+    "binance_erros_total": "Requisições com erro de rede ou status de nova tentativa",
+    "binance_retentativas_total": "Requisições que foram novas tentativas",
+    "binance_peso_consumido_total": "Peso de requisição consumido (contagem local)",
+    "binance_peso_usado_1m": "Peso usado no minuto, segundo X-MBX-USED-WEIGHT-1M",
+    "parse_segundos": "Tempo de conversão das respostas (JSON e order book)",
+    "analise_segundos": "Tempo de analisar_order_book",
+    "features_segundos": "Tempo de cálculo das features de microestrutura do livro",
+    "alertas_gerados_total": "Alertas de volume gerados pela análise",
+    "alertas_envio_segundos": "Tempo de envio de um alerta ao Telegram, com retentativas",
+    "alertas_total": "Alertas tratados pelo dispatcher, por resultado",
+    "ciclo_segundos": "Duração do trabalho de um ciclo do laço de coleta",
+    "ciclo_atraso_segundos": "Atraso do início do ciclo em relação ao horário agendado",
+    "agente_decisao_segundos": "Tempo de escolha da ação e aprendizado do agente",
+}
+
+
+class Contador:
+    """Valor que só cresce (ex: requisições, erros)."""
+
+    tipo = "counter"
+
+    def __init__(self):
+        self.valor = 0.0
+        self._lock = Lock()
+
+    def incrementar(self, valor: float = 1.0) -> None:
+        with self._lock:
+            self.valor += valor
+
+
+class Medidor:
+    """Valor instantâneo (ex: peso usado no minuto)."""
+
+    tipo = "gauge"
+
+    def __init__(self):
+        self.valor = 0.0
+
+    def definir(self, valor: float) -> None:
+        self.valor = valor
+
+
+class Histograma:
+    """
+    Distribuição de valores em buckets cumulativos, no modelo do Prometheus.
+    Os quantis do resumo são estimados por interpolação dentro do bucket.
+    """
+
+    tipo = "histogram"
+
+    def __init__(self, buckets=BUCKETS_PADRAO):
+        self.buckets = tuple(buckets)
+        self.contagens = [0] * (len(self.buckets) + 1)  # último: +Inf
+        self.contagem = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+        self._lock = Lock()
+
+    def observar(self, valor: float) -> None:
+        with self._lock:
+            self.contagens[bisect_left(self.buckets, valor)] += 1
+            self.contagem += 1
+            self.soma += valor
+            self.maximo = max(self.maximo, valor)
+
+    def quantil(self, q: float) -> float:
+        with self._lock:
+            if not self.contagem:
+                return 0.0
+            alvo = q * self.contagem
+            acumulado = 0
+            for i, n in enumerate(self.contagens):
+                if n and acumulado + n >= alvo:
+                    # Limitado ao máximo observado, que pode estar abaixo do bucket
+                    superior = min(
+                        self.buckets[i] if i < len(self.buckets) else self.maximo,
+                        self.maximo,
+                    )
+                    inferior = min(self.buckets[i - 1] if i else 0.0, superior)
+                    return inferior + (superior - inferior) * (alvo - acumulado) / n
+                acumulado += n
+            return self.maximo
+
+
+class RegistroMetricas:
+    """
+    Métricas do processo (contadores, medidores e histogramas), identificadas
+    por nome e rótulos.
+
+    Cada métrica é criada no primeiro uso; `exportar` gera o formato texto do
+    Prometheus, servido por `servir` em um endpoint HTTP local, e `resumo` é
+    impresso no encerramento.
+    """
+
+    def __init__(self):
+        self._metricas = {}  # (nome, rótulos) -> métrica
+        self._lock = Lock()
+        self.servidor = None
+
+    def _obter(self, classe, nome, rotulos, *args):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        metrica = self._metricas.get(chave)
+        if metrica is None:
+            with self._lock:
+                metrica = self._metricas.setdefault(chave, classe(*args))
+        return metrica
+
+    def contador(self, nome: str, **rotulos) -> Contador:
+        return self._obter(Contador, nome, rotulos)
+
+    def medidor(self, nome: str, **rotulos) -> Medidor:
+        return self._obter(Medidor, nome, rotulos)
+
+    def histograma(self, nome: str, buckets=BUCKETS_PADRAO, **rotulos) -> Histograma:
+        return self._obter(Histograma, nome, rotulos, buckets)
+
+    @contextmanager
+    def cronometrar(self, nome: str, **rotulos):
+        """Registra a duração do bloco (segundos) no histograma `nome`."""
+        histograma = self.histograma(nome, **rotulos)
+        inicio = perf_counter()
+        try:
+            yield
+        finally:
+            histograma.observar(perf_counter() - inicio)
+
+    def cronometrado(self, nome: str, **rotulos):
+        """Decorador: registra a duração de cada chamada no histograma `nome`."""
+
+        def decorador(funcao):
+            @wraps(funcao)
+            def envolvida(*args, **kwargs):
+                with self.cronometrar(nome, **rotulos):
+                    return funcao(*args, **kwargs)
+
+            return envolvida
+
+        return decorador
+
+    @staticmethod
+    def _rotulos(rotulos, extra=()) -> str:
+        pares = [*rotulos, *extra]
+        if not pares:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pares) + "}"
+
+    def exportar(self) -> str:
+        """Métricas no formato texto de exposição do Prometheus (0.0.4)."""
+        with self._lock:
+            itens = sorted(self._metricas.items(), key=lambda item: item[0])
+        linhas = []
+        anterior = None
+        for (nome, rotulos), metrica in itens:
+            if nome != anterior:
+                linhas.append(f"# HELP {nome} {AJUDA.get(nome, nome)}")
+                linhas.append(f"# TYPE {nome} {metrica.tipo}")
+                anterior = nome
+            if metrica.tipo != "histogram":
+                linhas.append(f"{nome}{self._rotulos(rotulos)} {metrica.valor}")
+                continue
+            with metrica._lock:
+                acumulado = 0
+                for limite, n in zip(metrica.buckets, metrica.contagens):
+                    acumulado += n
+                    rotulo = self._rotulos(rotulos, [("le", limite)])
+                    linhas.append(f"{nome}_bucket{rotulo} {acumulado}")
+                rotulo = self._rotulos(rotulos, [("le", "+Inf")])
+                linhas.append(f"{nome}_bucket{rotulo} {metrica.contagem}")
+                linhas.append(f"{nome}_sum{self._rotulos(rotulos)} {metrica.soma}")
+                linhas.append(
+                    f"{nome}_count{self._rotulos(rotulos)} {metrica.contagem}"
+                )
+        return "\n".join(linhas) + "\n"
+
+    def resumo(self) -> str:
+        """Uma linha por métrica; histogramas com média, p50, p99 e máximo em ms."""
+        with self._lock:
+            itens = sorted(self._metricas.items(), key=lambda item: item[0])
+        linhas = ["Métricas:"]
+        for (nome, rotulos), metrica in itens:
+            identificador = f"{nome}{self._rotulos(rotulos)}"
+            if metrica.tipo != "histogram":
+                linhas.append(f"  {identificador}: {metrica.valor:g}")
+            elif metrica.contagem:
+                linhas.append(
+                    f"  {identificador}: {metrica.contagem} obs, média "
+                    f"{metrica.soma / metrica.contagem * 1000:.2f} ms, p50 "
+                    f"{metrica.quantil(0.5) * 1000:.2f} ms, p99 "
+                    f"{metrica.quantil(0.99) * 1000:.2f} ms, máx "
+                    f"{metrica.maximo * 1000:.2f} ms"
+                )
+        return "\n".join(linhas)
+
+    def servir(self, porta: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Expõe `/metrics` em http://host:porta, em uma thread de fundo. Retorna
+        None, com um aviso, se a porta não puder ser usada.
+        """
+        registro = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                corpo = registro.exportar().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self.servidor = ThreadingHTTPServer((host, porta), Handler)
+        except OSError as e:
+            # Porta ocupada, por exemplo: o processo segue sem o endpoint
+            print(f"⚠️ Não foi possível expor as métricas em {host}:{porta}: {e}")
+            return None
+        self.servidor.daemon_threads = True
+        Thread(target=self.servidor.serve_forever, daemon=True).start()
+        print(f"Métricas em http://{host}:{self.servidor.server_port}/metrics")
+        return self.servidor
+
+    def parar(self) -> None:
+        if self.servidor is not None:
+            self.servidor.shutdown()
+            self.servidor.server_close()
+            self.servidor = None
+
+
+# Registro compartilhado pelo processo
+metricas = RegistroMetricas()
@@ -0,0 +1,158 @@
+import numpy as np
+
+# Colunas do último eixo do array de livros (snapshots, níveis, 4)
+BID_PRECO, BID_QTD, ASK_PRECO, ASK_QTD = range(4)
+
+
+def empilhar_livros(livros, niveis: int) -> np.ndarray:
+    """
+    Converte uma sequência de livros (OrderBook ou resposta de /depth) em um
+    array (snapshots, níveis, 4) com [preço bid, qtd bid, preço ask, qtd ask]
+    por nível. Níveis inexistentes ficam como NaN.
+    """
+    lote = np.full((len(livros), niveis, 4), np.nan)
+    for i, livro in enumerate(livros):
+        for coluna, lado in ((BID_PRECO, "bids"), (ASK_PRECO, "asks")):
+            if isinstance(livro, dict):
+                niveis_lado = np.array(livro[lado][:niveis], dtype=np.float64)
+                niveis_lado = niveis_lado.reshape(-1, 2)
+                precos, quantidades = niveis_lado[:, 0], niveis_lado[:, 1]
+            else:
+                precos, quantidades = livro.top(lado, niveis)
+            lote[i, : len(precos), coluna] = precos
+            lote[i, : len(precos), coluna + 1] = quantidades
+    return lote
+
+
+class MotorFeatures:
+    """
+    Features de microestrutura do livro de ordens, calculadas de forma
+    vetorizada sobre um lote de snapshots (snapshots, níveis, 4):
+
+    - imbalance_{k}: (qtd bid - qtd ask) / (qtd bid + qtd ask) nos k primeiros
+      níveis, em [-1, 1];
+    - mid, spread_bps, microprice (mid ponderado pelas quantidades do topo) e
+      weighted_mid (média dos VWAPs de bid e ask nos `niveis_mid` primeiros
+      níveis);
+    - profundidade_{compra|venda}_{b}bps: quantidade acumulada até b bps do mid;
+    - slope_{compra|venda}: inclinação (mínimos quadrados) da quantidade
+      acumulada em função da distância ao mid, em quantidade por bps;
+    - slippage_{compra|venda}_bps: custo de executar `notional` (na moeda de
+      cotação) a mercado em relação ao mid; NaN se o livro não tem
+      profundidade suficiente.
+
+    `calcular` processa um lote inteiro (ex: snapshots gravados para o
+    treinamento); `calcular_livro` processa o livro ao vivo, reaproveitando o
+    mesmo buffer a cada chamada.
+    """
+
+    def __init__(
+        self,
+        niveis: int = 20,
+        niveis_imbalance=(1, 5, 10),
+        niveis_mid: int = 5,
+        bandas_bps=(5, 10, 25, 50),
+        notional: float = 10_000.0,
+    ):
+        self.niveis = niveis
+        self.niveis_imbalance = tuple(niveis_imbalance)
+        self.niveis_mid = niveis_mid
+        self.bandas_bps = tuple(bandas_bps)
+        self.notional = notional
+        self._buffer = np.full((1, niveis, 4), np.nan)
+
+    @property
+    def nomes(self) -> list:
+        nomes = [f"imbalance_{k}" for k in self.niveis_imbalance]
+        nomes += ["mid", "spread_bps", "microprice", "weighted_mid"]
+        for lado in ("compra", "venda"):
+            nomes += [f"profundidade_{lado}_{b}bps" for b in self.bandas_bps]
+        nomes += ["slope_compra", "slope_venda"]
+        nomes += ["slippage_compra_bps", "slippage_venda_bps"]
+        return nomes
+
+    def calcular(self, livros: np.ndarray) -> np.ndarray:
+        """
+        Features de um lote de snapshots.
+
+        Parâmetros:
+            livros (np.ndarray): (snapshots, níveis, 4), ver empilhar_livros.
+
+        Retorna:
+            np.ndarray: (snapshots, len(nomes)), na ordem de `nomes`.
+        """
+        livros = np.asarray(livros, dtype=np.float64)
+        bp, ap = livros[:, :, BID_PRECO], livros[:, :, ASK_PRECO]
+        bq = np.nan_to_num(livros[:, :, BID_QTD])
+        aq = np.nan_to_num(livros[:, :, ASK_QTD])
+
+        colunas = []
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for k in self.niveis_imbalance:
+                compra = bq[:, :k].sum(axis=1)
+                venda = aq[:, :k].sum(axis=1)
+                colunas.append((compra - venda) / (compra + venda))
+
+            best_bid, best_ask = bp[:, 0], ap[:, 0]
+            mid = (best_bid + best_ask) / 2
+            colunas.append(mid)
+            colunas.append((best_ask - best_bid) / mid * 10_000)
+            colunas.append(
+                (best_bid * aq[:, 0] + best_ask * bq[:, 0]) / (bq[:, 0] + aq[:, 0])
+            )
+            k = self.niveis_mid
+            vwap_bid = np.nansum(bp[:, :k] * bq[:, :k], axis=1) / bq[:, :k].sum(1)
+            vwap_ask = np.nansum(ap[:, :k] * aq[:, :k], axis=1) / aq[:, :k].sum(1)
+            colunas.append((vwap_bid + vwap_ask) / 2)
+
+            # Distância de cada nível ao mid em bps (NaN nos níveis vazios)
+            dist_bid = (mid[:, None] - bp) / mid[:, None] * 10_000
+            dist_ask = (ap - mid[:, None]) / mid[:, None] * 10_000
+            for dist, q in ((dist_bid, bq), (dist_ask, aq)):
+                for banda in self.bandas_bps:
+                    colunas.append(np.where(dist <= banda, q, 0.0).sum(axis=1))
+
+            for dist, q in ((dist_bid, bq), (dist_ask, aq)):
+                colunas.append(self._slope(dist, np.cumsum(q, axis=1)))
+
+            colunas.append(self._slippage(ap, aq, mid, compra=True))
+            colunas.append(self._slippage(bp, bq, mid, compra=False))
+        return np.column_stack(colunas)
+
+    @staticmethod
+    def _slope(x, y):
+        """Inclinação de y em x por linha, ignorando os níveis vazios (NaN)."""
+        valido = ~np.isnan(x)
+        n = valido.sum(axis=1)
+        x = np.where(valido, x, 0.0)
+        y = np.where(valido, y, 0.0)
+        media_x = x.sum(axis=1) / n
+        media_y = y.sum(axis=1) / n
+        dx = np.where(valido, x - media_x[:, None], 0.0)
+        return (dx * (y - media_y[:, None])).sum(axis=1) / (dx * dx).sum(axis=1)
+
+    def _slippage(self, precos, quantidades, mid, compra):
+        """Distância (bps) do preço médio de execução de `notional` ao mid."""
+        notional = np.nan_to_num(precos) * quantidades
+        acumulado = np.cumsum(notional, axis=1)
+        anterior = acumulado - notional
+        # Parte do notional de cada nível consumida pela ordem
+        usado = np.clip(self.notional - anterior, 0.0, notional)
+        qtd = np.where(notional > 0, usado / np.where(precos > 0, precos, 1), 0.0)
+        preco_medio = self.notional / qtd.sum(axis=1)
+        preco_medio[acumulado[:, -1] < self.notional] = np.nan
+        sinal = 1 if compra else -1
+        return sinal * (preco_medio - mid) / mid * 10_000
+
+    def calcular_livro(self, order_book) -> np.ndarray:
+        """Features do livro atual (OrderBook), como vetor na ordem de `nomes`."""
+        buffer = self._buffer
+        buffer.fill(np.nan)
+        for coluna, lado in ((BID_PRECO, "bids"), (ASK_PRECO, "asks")):
+            precos, quantidades = order_book.top(lado, self.niveis)
+            buffer[0, : len(precos), coluna] = precos
+            buffer[0, : len(precos), coluna + 1] = quantidades
+        return self.calcular(buffer)[0]
+
+    def como_dict(self, vetor) -> dict:
+        return dict(zip(self.nomes, (float(v) for v in vetor)))
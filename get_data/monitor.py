@@ -0,0 +1,153 @@
+from asyncio import gather, get_running_loop, run as asyncio_run, sleep as asyncio_sleep
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from get_data.api import BinancePublicAPI
+from get_data.cross_data import analisar_order_book
+from get_data.dashboard import Dashboard
+from get_data.metricas import metricas
+from get_data.order_book import OrderBook
+from get_data.recorder import Recorder
+from get_data.trade_stream import AggTradeStream
+
+
+def carregar_simbolos(symbols=None, symbols_file=None):
+    """
+    Junta os símbolos informados na linha de comando e/ou em um arquivo
+    (um símbolo por linha, linhas iniciadas com # são ignoradas).
+    """
+    resultado = [s.upper() for s in symbols or []]
+    if symbols_file:
+        with open(symbols_file, "r") as f:
+            for linha in f:
+                linha = linha.strip()
+                if linha and not linha.startswith("#"):
+                    resultado.append(linha.upper())
+    return list(dict.fromkeys(resultado))
+
+
+async def monitorar_simbolo(
+    api, symbol, args, continuar, trades=None, dashboard=None, recorder=None
+):
+    """
+    Monitora um símbolo: busca depth e ticker ao mesmo tempo e analisa o livro.
+    Cada ciclo é agendado em um horário fixo (início + n * intervalo), sem
+    acumular o atraso das requisições. Com `dashboard`, o resultado é publicado
+    no painel em vez de impresso.
+    """
+    loop = get_running_loop()
+    proximo = loop.time()
+    duracao_ciclo = metricas.histograma("ciclo_segundos", laco=symbol)
+    atraso_ciclo = metricas.histograma("ciclo_atraso_segundos", laco=symbol)
+
+    while continuar():
+        inicio = loop.time()
+        data, ticker = await gather(
+            loop.run_in_executor(None, api.get_order_book, symbol, args.limit),
+            loop.run_in_executor(None, api.get_ticker_24h, symbol),
+        )
+        latencia = loop.time() - inicio
+        if recorder:
+            if data:
+                recorder.gravar("depth", data)
+            if ticker:
+                recorder.gravar("ticker", ticker)
+
+        order_book = None
+        if data:
+            with metricas.cronometrar("parse_segundos", etapa="order_book"):
+                order_book = OrderBook.from_snapshot(data, symbol)
+        analise = None
+        if order_book and not dashboard:
+            spread = order_book.spread
+            print(
+                f"[{datetime.now().strftime('%H:%M:%S')}] {symbol} | "
+                f"Bid: {order_book.best_bid or 0:.2f} | "
+                f"Ask: {order_book.best_ask or 0:.2f} | "
+                f"Spread: {spread or 0:.4f}"
+            )
+        if order_book:
+            analise = await loop.run_in_executor(
+                None,
+                analisar_order_book,
+                order_book,
+                ticker or {},
+                symbol,
+                args.limit,
+                args.coluna,
+                args.accumulated,
+                trades,
+                not dashboard,
+            )
+        if dashboard:
+            dashboard.publicar(symbol, order_book, latencia, analise)
+
+        duracao_ciclo.observar(loop.time() - inicio)
+        proximo += args.interval
+        atraso = proximo - loop.time()
+        if atraso < 0:
+            # Ciclo mais lento que o intervalo: reagenda a partir de agora
+            atraso_ciclo.observar(-atraso)
+            proximo = loop.time()
+            atraso = 0
+        await asyncio_sleep(atraso)
+        if atraso:
+            atraso_ciclo.observar(max(loop.time() - proximo, 0.0))
+
+
+async def monitorar_simbolos(symbols, args, continuar):
+    """
+    Executa o monitoramento de todos os símbolos em um único event loop,
+    compartilhando a sessão HTTP e o orçamento de peso da Binance.
+    """
+    workers = 2 * len(symbols)
+    api = BinancePublicAPI(pool_maxsize=workers)
+    get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=workers))
+
+    dashboard = None
+    if args.dashboard:
+        dashboard = Dashboard(refresh=args.refresh)
+        dashboard.start()
+
+    recorders = {}
+    if args.gravar:
+        recorders = {symbol: Recorder(symbol, args.gravar) for symbol in symbols}
+
+    streams = {}
+    if args.trades:
+        streams = {
+            symbol: AggTradeStream(
+                symbol,
+                observador=recorders[symbol].gravar if recorders else None,
+            )
+            for symbol in symbols
+        }
+        for stream in streams.values():
+            stream.start()
+
+    try:
+        await gather(
+            *(
+                monitorar_simbolo(
+                    api,
+                    symbol,
+                    args,
+                    continuar,
+                    streams[symbol].aggregator if streams else None,
+                    dashboard,
+                    recorders.get(symbol),
+                )
+                for symbol in symbols
+            )
+        )
+    finally:
+        if dashboard:
+            dashboard.stop()
+        for stream in streams.values():
+            stream.stop()
+        for recorder in recorders.values():
+            recorder.fechar()
+
+
+def executar_monitoramento(symbols, args, continuar):
+    print(f"Monitorando {len(symbols)} símbolos: {', '.join(symbols)}")
+    asyncio_run(monitorar_simbolos(symbols, args, continuar))
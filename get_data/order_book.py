@@ -0,0 +1,218 @@
+import numpy as np
+
+
+class BookSide:
+    """
+    Um lado do livro de ordens armazenado em arrays paralelos de float64.
+
+    Os níveis ficam ordenados do melhor para o pior preço. Para usar uma única
+    busca binária crescente nos dois lados, os bids são guardados com a chave
+    negativa (-preço). A posição 0 é sempre o melhor nível.
+    """
+
+    def __init__(self, descending: bool, capacity: int = 1024):
+        self.descending = descending
+        self._keys = np.empty(capacity, dtype=np.float64)
+        self._qtys = np.empty(capacity, dtype=np.float64)
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _key(self, price: float) -> float:
+        return -price if self.descending else price
+
+    def _grow(self, minimo: int) -> None:
+        capacity = max(minimo, 2 * len(self._keys))
+        keys = np.empty(capacity, dtype=np.float64)
+        qtys = np.empty(capacity, dtype=np.float64)
+        keys[: self._n] = self._keys[: self._n]
+        qtys[: self._n] = self._qtys[: self._n]
+        self._keys, self._qtys = keys, qtys
+
+    @property
+    def prices(self) -> np.ndarray:
+        keys = self._keys[: self._n]
+        return -keys if self.descending else keys
+
+    @property
+    def quantities(self) -> np.ndarray:
+        return self._qtys[: self._n]
+
+    def best(self):
+        """Retorna (preço, quantidade) do melhor nível ou None se vazio. O(1)."""
+        if self._n == 0:
+            return None
+        return float(self._key(self._keys[0])), float(self._qtys[0])
+
+    def load(self, prices, quantities) -> None:
+        """Substitui todos os níveis (ex: a partir de um snapshot REST)."""
+        prices = np.asarray(prices, dtype=np.float64)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        keys = -prices if self.descending else prices
+        order = np.argsort(keys, kind="stable")
+        keys, quantities = keys[order], quantities[order]
+        valid = quantities > 0
+
+        n = int(valid.sum())
+        if n > len(self._keys):
+            self._grow(n)
+        self._keys[:n] = keys[valid]
+        self._qtys[:n] = quantities[valid]
+        self._n = n
+
+    def set(self, price: float, quantity: float) -> None:
+        """
+        Insere, atualiza ou remove (quantidade 0) um nível de preço.
+
+        A localização é uma busca binária O(log n); a inserção/remoção desloca a
+        cauda contígua do array (memmove), o que é desprezível na escala do livro.
+        """
+        key = self._key(price)
+        n = self._n
+        i = int(np.searchsorted(self._keys[:n], key))
+        exists = i < n and self._keys[i] == key
+
+        if exists:
+            if quantity > 0:
+                self._qtys[i] = quantity
+            else:
+                self._keys[i : n - 1] = self._keys[i + 1 : n]
+                self._qtys[i : n - 1] = self._qtys[i + 1 : n]
+                self._n -= 1
+        elif quantity > 0:
+            if n == len(self._keys):
+                self._grow(n + 1)
+            self._keys[i + 1 : n + 1] = self._keys[i:n]
+            self._qtys[i + 1 : n + 1] = self._qtys[i:n]
+            self._keys[i] = key
+            self._qtys[i] = quantity
+            self._n += 1
+
+    def top(self, n: int = None):
+        """Retorna (preços, quantidades) dos `n` melhores níveis."""
+        n = self._n if n is None else min(n, self._n)
+        keys = self._keys[:n]
+        return (-keys if self.descending else keys.copy()), self._qtys[:n].copy()
+
+    def copy(self, limit: int = None) -> "BookSide":
+        prices, quantities = self.top(limit)
+        side = BookSide(self.descending, capacity=max(len(prices), 1))
+        side.load(prices, quantities)
+        return side
+
+
+class OrderBook:
+    """
+    Livro de ordens com armazenamento compacto em arrays ordenados por lado.
+
+    Oferece melhor bid/ask e spread em O(1), atualização de níveis com busca
+    binária e consultas vetorizadas (profundidade acumulada, VWAP e níveis
+    acima de um limite).
+    """
+
+    def __init__(self, symbol: str = None):
+        self.symbol = symbol
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.last_update_id = 0
+
+    @classmethod
+    def from_snapshot(cls, data: dict, symbol: str = None) -> "OrderBook":
+        """
+        Cria o livro a partir da resposta de get_order_book, convertendo cada
+        lado de strings para float uma única vez.
+        """
+        book = cls(symbol)
+        book.load_snapshot(data)
+        return book
+
+    def load_snapshot(self, data: dict) -> None:
+        for side, levels in ((self.bids, data["bids"]), (self.asks, data["asks"])):
+            levels = np.array(levels, dtype=np.float64).reshape(-1, 2)
+            side.load(levels[:, 0], levels[:, 1])
+        self.last_update_id = data.get("lastUpdateId", 0)
+
+    def side(self, name: str) -> BookSide:
+        if name == "bids":
+            return self.bids
+        if name == "asks":
+            return self.asks
+        raise ValueError(f"Lado inválido: {name}. Aceitos: 'bids', 'asks'.")
+
+    def update(self, side: str, price: float, quantity: float) -> None:
+        self.side(side).set(float(price), float(quantity))
+
+    def apply_levels(self, side: str, levels) -> None:
+        """Aplica uma lista de [preço, quantidade] (strings ou números)."""
+        book_side = self.side(side)
+        for price, quantity in levels:
+            book_side.set(float(price), float(quantity))
+
+    @property
+    def best_bid(self):
+        best = self.bids.best()
+        return best[0] if best else None
+
+    @property
+    def best_ask(self):
+        best = self.asks.best()
+        return best[0] if best else None
+
+    @property
+    def spread(self):
+        if not len(self.bids) or not len(self.asks):
+            return None
+        return self.best_ask - self.best_bid
+
+    @property
+    def mid_price(self):
+        if not len(self.bids) or not len(self.asks):
+            return None
+        return (self.best_ask + self.best_bid) / 2
+
+    def top(self, side: str, n: int = None):
+        return self.side(side).top(n)
+
+    def cumulative_depth(self, side: str, n: int = None) -> np.ndarray:
+        """Quantidade acumulada do melhor nível até cada um dos `n` níveis."""
+        return np.cumsum(self.side(side).top(n)[1])
+
+    def vwap(self, side: str, size: float):
+        """
+        Preço médio ponderado para executar `size` consumindo o lado informado
+        (asks para uma compra, bids para uma venda).
+
+        Retorna None se a profundidade disponível for menor que `size`.
+        """
+        prices, quantities = self.side(side).top()
+        if size <= 0 or not len(prices):
+            return None
+        depth = np.cumsum(quantities)
+        if depth[-1] < size:
+            return None
+        last = int(np.searchsorted(depth, size))
+        filled = quantities[: last + 1].copy()
+        filled[last] -= depth[last] - size
+        return float(np.dot(prices[: last + 1], filled) / size)
+
+    def levels_above(self, side: str, threshold: float, n: int = None):
+        """Retorna (preços, quantidades) dos níveis com quantidade > threshold."""
+        prices, quantities = self.side(side).top(n)
+        mask = quantities > threshold
+        return prices[mask], quantities[mask]
+
+    def copy(self, limit: int = None) -> "OrderBook":
+        book = OrderBook(self.symbol)
+        book.bids = self.bids.copy(limit)
+        book.asks = self.asks.copy(limit)
+        book.last_update_id = self.last_update_id
+        return book
+
+    def to_dict(self, limit: int = None) -> dict:
+        """Converte para o formato de resposta do endpoint /depth."""
+        return {
+            "lastUpdateId": self.last_update_id,
+            "bids": [[str(p), str(q)] for p, q in zip(*self.bids.top(limit))],
+            "asks": [[str(p), str(q)] for p, q in zip(*self.asks.top(limit))],
+        }
@@ -0,0 +1,144 @@
+from json import dump as json_dump, load as json_load
+from os import path as os_path, replace as os_replace
+import numpy as np
+
+# Percentis gravados no arquivo _stat.csv, na ordem das colunas
+COLUNAS_STAT = ["Q1", "Q2 (mediana)", "Q3", "Q4 (máximo)"] + [
+    f"D{i}" for i in range(1, 11)
+]
+PERCENTIS_STAT = np.array([0.25, 0.50, 0.75, 1.0] + [i / 10 for i in range(1, 11)])
+
+
+def quantis_ordenados(ordenados: np.ndarray, qs) -> np.ndarray:
+    """
+    Quantis com interpolação linear sobre um array já ordenado, em O(len(qs)).
+    Reproduz exatamente numpy.quantile / pandas.Series.quantile (método linear).
+    """
+    qs = np.asarray(qs, dtype=np.float64)
+    n = len(ordenados)
+    if not n:
+        return np.full(len(qs), np.nan)
+
+    virtual = (n - 1) * qs
+    abaixo = np.clip(np.floor(virtual).astype(np.int64), 0, n - 1)
+    acima = np.clip(abaixo + 1, 0, n - 1)
+    t = virtual - np.floor(virtual)
+
+    a = ordenados[abaixo]
+    b = ordenados[acima]
+    diff = b - a
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+
+def quantis_janela(tempos, volumes, dias: float, qs, fim_ms: int = None):
+    """
+    Quantis do volume apenas nos últimos `dias` (janela móvel) terminando em
+    `fim_ms` (padrão: último candle). Todos os percentis saem de uma única
+    ordenação da janela.
+    """
+    if not len(tempos):
+        return np.full(len(qs), np.nan)
+    fim_ms = int(tempos[-1]) if fim_ms is None else fim_ms
+    inicio = np.searchsorted(tempos, fim_ms - int(dias * 86_400_000), side="right")
+    fim = np.searchsorted(tempos, fim_ms, side="right")
+    return quantis_ordenados(np.sort(volumes[inicio:fim]), qs)
+
+
+class QuantisVolume:
+    """
+    Quantis exatos do volume mantidos de forma incremental.
+
+    O estado é o array ordenado de todos os volumes, persistido em
+    `{symbol}_{interval}_quantis.npy` ao lado dos dados, com a impressão do
+    histórico de onde veio (linhas, último open_time e soma dos volumes) em
+    `{symbol}_{interval}_quantis.json`. Novos candles são inseridos por busca
+    binária (sem reordenar o histórico) e qualquer conjunto de percentis é
+    obtido por indexação direta.
+    """
+
+    def __init__(self, path_file: str, symbol: str, interval: str):
+        self.arquivo = f"{path_file}/{symbol}_{interval}_quantis.npy"
+        self.arquivo_impressao = f"{path_file}/{symbol}_{interval}_quantis.json"
+        self.ordenados = np.empty(0, dtype=np.float64)
+        self.impressao = None
+        if os_path.exists(self.arquivo) and os_path.exists(self.arquivo_impressao):
+            self.ordenados = np.load(self.arquivo, mmap_mode="r")
+            with open(self.arquivo_impressao) as f:
+                self.impressao = json_load(f)
+
+    @property
+    def rows(self) -> int:
+        return len(self.ordenados)
+
+    @staticmethod
+    def _impressao(volumes, tempos) -> dict:
+        return {
+            "rows": len(volumes),
+            "last_ts": int(tempos[-1]) if len(tempos) else None,
+            "soma": float(np.sum(volumes, dtype=np.float64)),
+        }
+
+    def atualizado(self, volumes, tempos) -> bool:
+        """
+        O estado corresponde ao histórico (volumes e open_times)? Compara a
+        impressão salva: linhas, último open_time e soma dos volumes (com
+        tolerância relativa de 1e-9, pois a soma incremental arredonda de
+        outra forma). Pega históricos recriados ou candles regravados com a
+        mesma quantidade de linhas.
+        """
+        if self.impressao is None or len(volumes) != self.rows:
+            return False
+        atual = self._impressao(volumes, tempos)
+        return (
+            atual["rows"] == self.impressao["rows"]
+            and atual["last_ts"] == self.impressao["last_ts"]
+            and np.isclose(atual["soma"], self.impressao["soma"], rtol=1e-9, atol=0)
+        )
+
+    def sincronizar(self, volumes, tempos) -> bool:
+        """
+        Reconstrói o estado a partir do histórico completo se ele não confere
+        com a impressão salva (estado inexistente, desatualizado ou de outro
+        histórico).
+
+        Retorna:
+            bool: True se houve reconstrução.
+        """
+        if self.atualizado(volumes, tempos):
+            return False
+        self.ordenados = np.sort(np.asarray(volumes, dtype=np.float64))
+        self.impressao = self._impressao(volumes, tempos)
+        return True
+
+    def adicionar(self, volumes, tempos) -> None:
+        """
+        Insere novos volumes (com seus open_times) mantendo a ordenação,
+        O(k log n) de busca.
+        """
+        novos = np.sort(np.asarray(volumes, dtype=np.float64))
+        if not len(novos):
+            return
+        posicoes = np.searchsorted(self.ordenados, novos)
+        self.ordenados = np.insert(self.ordenados, posicoes, novos)
+        anterior = self.impressao or self._impressao([], [])
+        ultimos = [int(t) for t in tempos]
+        if anterior["last_ts"] is not None:
+            ultimos.append(anterior["last_ts"])
+        self.impressao = {
+            "rows": self.rows,
+            "last_ts": max(ultimos),
+            "soma": anterior["soma"] + float(novos.sum()),
+        }
+
+    def quantis(self, qs) -> np.ndarray:
+        return quantis_ordenados(self.ordenados, qs)
+
+    def salvar(self) -> None:
+        tmp = f"{self.arquivo}.tmp.npy"
+        np.save(tmp, np.asarray(self.ordenados))
+        os_replace(tmp, self.arquivo)
+        # Gravada por último: sem ela, o estado é reconstruído na próxima vez
+        tmp = f"{self.arquivo_impressao}.tmp"
+        with open(tmp, "w") as f:
+            json_dump(self.impressao, f)
+        os_replace(tmp, self.arquivo_impressao)
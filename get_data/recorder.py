@@ -0,0 +1,182 @@
+from datetime import datetime
+from glob import glob
+from gzip import open as gzip_open
+from itertools import count
+from json import dumps as json_dumps, loads as json_loads
+from os import makedirs
+from struct import Struct
+from threading import Lock
+from time import monotonic, sleep as time_sleep, time as time_time
+
+from get_data.escritor_fundo import EscritorFundo
+
+# Tipos de registro gravados
+TIPOS = {"depth": 1, "depth_diff": 2, "ticker": 3, "trade": 4}
+NOMES_TIPO = {codigo: nome for nome, codigo in TIPOS.items()}
+
+# Cabeçalho de cada registro: tamanho do payload, tipo, horário (epoch em µs)
+# e número de sequência; o payload é o JSON compacto do dado
+CABECALHO = Struct("<IBqQ")
+
+
+class Recorder:
+    """
+    Grava eventos de mercado de um símbolo em arquivos comprimidos (gzip),
+    somente com acréscimos.
+
+    Cada registro é [cabeçalho binário][payload JSON], com horário e número de
+    sequência atribuídos no momento da chamada a `gravar`, que apenas enfileira;
+    uma thread de fundo (EscritorFundo, com até `max_fila` eventos na fila)
+    comprime e grava. Um novo arquivo `{pasta}/{symbol}_{AAAAmmdd_HHMMSS}.rec.gz`
+    é aberto a cada `max_bytes` de dados ou `max_segundos` de gravação.
+
+    Depois de um lote que falha ao gravar, o arquivo é reaberto no lote
+    seguinte; eventos que não podem ser convertidos em JSON são descartados
+    individualmente. Os descartes são contados em `descartados`.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        pasta: str = "get_data/data/gravacoes",
+        max_bytes: int = 100_000_000,
+        max_segundos: float = 3600,
+        max_fila: int = 100_000,
+    ):
+        self.symbol = symbol.upper()
+        self.pasta = pasta
+        self.max_bytes = max_bytes
+        self.max_segundos = max_segundos
+        self.registros = 0
+        makedirs(pasta, exist_ok=True)
+
+        self._seq = count()
+        self._lock = Lock()
+        self._arquivo = None
+        self._escritor = EscritorFundo(
+            self._escrever,
+            f"Gravação de {self.symbol}: eventos descartados",
+            max_fila=max_fila,
+            ao_encerrar=self._fechar_arquivo,
+        )
+
+    @property
+    def descartados(self) -> int:
+        return self._escritor.descartados
+
+    def gravar(self, tipo: str, dados, timestamp: float = None) -> None:
+        """
+        Enfileira um evento ("depth", "depth_diff", "ticker" ou "trade"). Um
+        OrderBook pode ser passado diretamente; é gravado no formato do /depth.
+        """
+        with self._lock:
+            seq = next(self._seq)
+        self._escritor.enfileirar((TIPOS[tipo], timestamp or time_time(), seq, dados))
+
+    def fechar(self) -> None:
+        """Grava o que ainda está na fila e fecha o arquivo atual."""
+        self._escritor.fechar()
+
+    def _abrir(self):
+        nome = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.caminho = f"{self.pasta}/{self.symbol}_{nome}.rec.gz"
+        self._arquivo = gzip_open(self.caminho, "ab")
+        self._escritos = 0
+        self._aberto_em = monotonic()
+
+    def _fechar_arquivo(self):
+        if self._arquivo is not None:
+            try:
+                self._arquivo.close()
+            except OSError:
+                pass
+            self._arquivo = None
+
+    def _escrever(self, lote):
+        try:
+            self._escrever_lote(lote)
+        except Exception:
+            # Arquivo possivelmente com um registro parcial: o próximo lote vai
+            # para um arquivo novo (a leitura ignora o final truncado)
+            self._fechar_arquivo()
+            raise
+
+    def _escrever_lote(self, lote):
+        if self._arquivo is None or (
+            self._escritos >= self.max_bytes
+            or monotonic() - self._aberto_em >= self.max_segundos
+        ):
+            if self._arquivo is not None:
+                self._arquivo.close()
+            self._abrir()
+
+        partes = []
+        for tipo, timestamp, seq, dados in lote:
+            if hasattr(dados, "to_dict"):
+                dados = dados.to_dict()  # OrderBook: convertido fora do laço de coleta
+            try:
+                payload = json_dumps(dados, separators=(",", ":")).encode()
+            except (TypeError, ValueError) as e:
+                self._escritor.descartar(1, e)
+                continue
+            partes.append(CABECALHO.pack(len(payload), tipo, int(timestamp * 1e6), seq))
+            partes.append(payload)
+        bloco = b"".join(partes)
+        self._arquivo.write(bloco)
+        self._escritos += len(bloco)
+        self.registros += len(partes) // 2
+
+
+def arquivos_gravados(pasta: str, symbol: str) -> list:
+    """Arquivos de gravação de um símbolo, em ordem cronológica."""
+    return sorted(glob(f"{pasta}/{symbol.upper()}_*.rec.gz"))
+
+
+def ler_arquivo(caminho: str):
+    """
+    Lê os registros de um arquivo. Um final truncado (ex: processo encerrado
+    durante a gravação) é ignorado.
+
+    Gera:
+        tuple: (tipo, timestamp em segundos, seq, dados).
+    """
+    with gzip_open(caminho, "rb") as f:
+        while True:
+            try:
+                cabecalho = f.read(CABECALHO.size)
+                if len(cabecalho) < CABECALHO.size:
+                    return
+                tamanho, tipo, timestamp_us, seq = CABECALHO.unpack(cabecalho)
+                payload = f.read(tamanho)
+            except EOFError:
+                return
+            if len(payload) < tamanho:
+                return
+            yield NOMES_TIPO[tipo], timestamp_us / 1e6, seq, json_loads(payload)
+
+
+def ler_gravacao(arquivos, velocidade: float = None, dormir=time_sleep):
+    """
+    Reproduz os registros de uma lista de arquivos.
+
+    Parâmetros:
+        arquivos (list): Caminhos, em ordem (ver arquivos_gravados).
+        velocidade (float): None para ler o mais rápido possível; 1.0 para o
+            ritmo original, 2.0 para o dobro etc.
+        dormir (callable): Função de espera (substituível por um relógio virtual).
+
+    Gera:
+        tuple: (tipo, timestamp em segundos, seq, dados).
+    """
+    inicio_gravacao = inicio_real = None
+    for caminho in arquivos:
+        for registro in ler_arquivo(caminho):
+            if velocidade:
+                timestamp = registro[1]
+                if inicio_gravacao is None:
+                    inicio_gravacao, inicio_real = timestamp, monotonic()
+                alvo = inicio_real + (timestamp - inicio_gravacao) / velocidade
+                espera = alvo - monotonic()
+                if espera > 0:
+                    dormir(espera)
+            yield registro
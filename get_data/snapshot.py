@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import time as time_time
+
+from get_data.metricas import metricas
+from get_data.order_book import OrderBook
+
+
+class MarketSnapshot:
+    """
+    Livro de ordens e ticker de um símbolo buscados ao mesmo tempo, com um
+    único horário de referência.
+
+    Atributos:
+        symbol (str): Par de ativos.
+        timestamp (float): Horário (epoch, segundos) do meio da coleta.
+        latencia (float): Duração total da coleta em segundos.
+        order_book (OrderBook | None): Livro de ordens.
+        ticker (dict): Ticker 24h bruto (vazio se a consulta falhou).
+        last_price, last_qty (float): Último negócio, segundo o ticker.
+    """
+
+    __slots__ = ("symbol", "timestamp", "latencia", "order_book", "ticker")
+
+    def __init__(self, symbol, timestamp, latencia, order_book, ticker):
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.latencia = latencia
+        self.order_book = order_book
+        self.ticker = ticker or {}
+
+    @property
+    def last_price(self) -> float:
+        return float(self.ticker.get("lastPrice", 0))
+
+    @property
+    def last_qty(self) -> float:
+        return float(self.ticker.get("lastQty", 0))
+
+    @property
+    def best_bid(self):
+        return self.order_book.best_bid if self.order_book else None
+
+    @property
+    def best_ask(self):
+        return self.order_book.best_ask if self.order_book else None
+
+    @property
+    def spread(self):
+        return self.order_book.spread if self.order_book else None
+
+    @property
+    def completo(self) -> bool:
+        return self.order_book is not None and bool(self.ticker)
+
+
+class SnapshotFetcher:
+    """
+    Busca depth e ticker/24hr em paralelo, pagando a latência de uma única ida
+    e volta por ciclo. O ticker/24hr é mantido (em vez de trades) porque é o
+    endpoint mais leve que traz lastPrice e lastQty.
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self._pool = ThreadPoolExecutor(max_workers=2)
+
+    def buscar(self, symbol: str, limit: int) -> MarketSnapshot:
+        inicio = time_time()
+        depth = self._pool.submit(self.api.get_order_book, symbol, limit)
+        ticker = self._pool.submit(self.api.get_ticker_24h, symbol)
+        data, ticker = depth.result(), ticker.result()
+        fim = time_time()
+
+        order_book = None
+        if data:
+            with metricas.cronometrar("parse_segundos", etapa="order_book"):
+                order_book = OrderBook.from_snapshot(data, symbol)
+        return MarketSnapshot(
+            symbol, (inicio + fim) / 2, fim - inicio, order_book, ticker
+        )
+
+    def fechar(self) -> None:
+        self._pool.shutdown(wait=False)
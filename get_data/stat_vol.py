@@ -1,40 +1,53 @@
-from pandas import read_csv as pd_read_csv, DataFrame
-from os import path as os_path
-from args_config import ArgumentBuilder
+from csv import writer as csv_writer
+from os import path as os_path, replace as os_replace
 
+if not __package__:
+    import _raiz  # noqa: F401  (executado como script: raiz no sys.path)
 
-def gerar_estatisticas(symbol, accumulated):
-    path_file = f"get_data/data/{symbol}_{accumulated}.csv"
+from get_data.args_config import ArgumentBuilder
+from get_data.candle_store import caminho_candles, ler_candles
+from get_data.quantis import COLUNAS_STAT, PERCENTIS_STAT, QuantisVolume, quantis_janela
+
+
+def gerar_estatisticas(symbol, accumulated, janela_dias=None):
+    """
+    Gera `{symbol}_{accumulated}_stat.csv` com quartis e decis do volume.
+
+    Sem janela, usa o estado incremental de QuantisVolume: só é reconstruído a
+    partir do histórico quando está desatualizado, e todos os percentis saem de
+    uma indexação direta no array ordenado. Com `janela_dias`, considera apenas
+    os últimos dias armazenados.
+    """
+    path_file = caminho_candles("get_data/data", symbol, accumulated)
     if not os_path.exists(path_file):
         print(f"Arquivo não encontrado: {path_file}")
         return
 
-    df = pd_read_csv(path_file)
-    df["Volume"] = df["Volume"].astype(float)
-
-    # Quartis
-    q1 = df["Volume"].quantile(0.25)
-    q2 = df["Volume"].quantile(0.50)
-    q3 = df["Volume"].quantile(0.75)
-    q4 = df["Volume"].max()
-
-    # Decis (divisão em 10 partes)
-    decimos = {}
-    for i in range(1, 11):
-        decimos[f"d{i}"] = df["Volume"].quantile(i / 10)
+    # No formato colunar as colunas são lidas via memmap, sem parse de CSV
+    candles = ler_candles(path_file)
 
-    # Criação do novo DataFrame
-    estat = {"Q1": [q1], "Q2 (mediana)": [q2], "Q3": [q3], "Q4 (máximo)": [q4]}
-    estat.update({k.upper(): [v] for k, v in decimos.items()})
-    df_stat = DataFrame(estat)
+    if janela_dias:
+        valores = quantis_janela(
+            candles["open_time"], candles["volume"], janela_dias, PERCENTIS_STAT
+        )
+    else:
+        quantis = QuantisVolume("get_data/data", symbol, accumulated)
+        if quantis.sincronizar(candles["volume"], candles["open_time"]):
+            quantis.salvar()
+        valores = quantis.quantis(PERCENTIS_STAT)
 
     output_path = f"get_data/data/{symbol}_{accumulated}_stat.csv"
-    df_stat.to_csv(output_path, index=False)
+    tmp = f"{output_path}.tmp"
+    with open(tmp, "w", newline="") as f:
+        writer = csv_writer(f, lineterminator="\n")
+        writer.writerow(COLUNAS_STAT)
+        writer.writerow([float(v) for v in valores])
+    os_replace(tmp, output_path)
     print(f"Estatísticas salvas em: {output_path}")
 
 
 if __name__ == "__main__":
-    parser = ArgumentBuilder.base_parser()
+    parser = ArgumentBuilder.with_window()
     args = parser.parse_args()
 
-    gerar_estatisticas(args.symbol, args.accumulated)
+    gerar_estatisticas(args.symbol, args.accumulated, args.janela_dias)
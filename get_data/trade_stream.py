@@ -0,0 +1,212 @@
+from json import loads as json_loads
+from threading import Event, Lock, Thread
+from time import sleep as time_sleep, time as time_time
+
+from get_data.depth_stream import WebSocketTransport
+
+# Janelas disponíveis: nome -> (duração, resolução dos buckets) em ms
+JANELAS = {
+    "1s": (1_000, 100),
+    "1m": (60_000, 1_000),
+    "5m": (300_000, 1_000),
+}
+
+
+class JanelaVolume:
+    """
+    Volume de compra e venda em uma janela móvel, em um buffer circular de
+    buckets de tempo.
+
+    Os totais da janela são mantidos a cada inserção e a cada avanço do tempo
+    os buckets que saem da janela são descontados, então inserção e consulta
+    custam O(1) amortizado.
+    """
+
+    def __init__(self, duracao_ms: int, resolucao_ms: int):
+        self.resolucao_ms = resolucao_ms
+        self.n = duracao_ms // resolucao_ms
+        self.compra = [0.0] * self.n
+        self.venda = [0.0] * self.n
+        self.total_compra = 0.0
+        self.total_venda = 0.0
+        self.ultimo = None  # último bucket dentro da janela
+
+    def _avancar(self, bucket: int) -> None:
+        if self.ultimo is None:
+            self.ultimo = bucket
+            return
+        passos = bucket - self.ultimo
+        if passos <= 0:
+            return
+        if passos >= self.n:
+            self.compra = [0.0] * self.n
+            self.venda = [0.0] * self.n
+            self.total_compra = self.total_venda = 0.0
+        else:
+            for b in range(self.ultimo + 1, bucket + 1):
+                i = b % self.n
+                self.total_compra -= self.compra[i]
+                self.total_venda -= self.venda[i]
+                self.compra[i] = self.venda[i] = 0.0
+        self.ultimo = bucket
+
+    def adicionar(self, ts_ms: int, quantidade: float, venda: bool) -> None:
+        bucket = ts_ms // self.resolucao_ms
+        self._avancar(bucket)
+        if bucket <= self.ultimo - self.n:
+            return  # fora da janela
+        i = bucket % self.n
+        if venda:
+            self.venda[i] += quantidade
+            self.total_venda += quantidade
+        else:
+            self.compra[i] += quantidade
+            self.total_compra += quantidade
+
+    def consultar(self, agora_ms: int):
+        """Retorna (volume de compra, volume de venda) da janela até agora_ms."""
+        self._avancar(agora_ms // self.resolucao_ms)
+        return max(self.total_compra, 0.0), max(self.total_venda, 0.0)
+
+
+class TradeAggregator:
+    """
+    Agrega eventos aggTrade em janelas móveis (1s, 1m, 5m) de volume de
+    compra e venda.
+
+    O lado vem do campo `m` (comprador é o maker): nesse caso o agressor é o
+    vendedor e a quantidade conta como venda. As consultas usam `relogio`
+    (epoch em ms; por padrão o relógio do sistema) para descartar o que saiu
+    da janela mesmo sem novos negócios.
+    """
+
+    def __init__(self, janelas: dict = None, relogio=None):
+        self.janelas = {
+            nome: JanelaVolume(duracao, resolucao)
+            for nome, (duracao, resolucao) in (janelas or JANELAS).items()
+        }
+        self.relogio = relogio or (lambda: int(time_time() * 1000))
+        self.ultimo_id = None
+        self.ultimo_preco = None
+        self.ultimo_ts = None
+        self.eventos = 0
+        self._lock = Lock()
+
+    def processar(self, evento: dict) -> bool:
+        """
+        Aplica um aggTrade (do stream ou do REST /aggTrades). Eventos com id já
+        processado são ignorados.
+        """
+        with self._lock:
+            agg_id = int(evento["a"])
+            if self.ultimo_id is not None and agg_id <= self.ultimo_id:
+                return False
+            ts = int(evento["T"])
+            quantidade = float(evento["q"])
+            venda = bool(evento["m"])
+            for janela in self.janelas.values():
+                janela.adicionar(ts, quantidade, venda)
+            self.ultimo_id = agg_id
+            self.ultimo_preco = float(evento["p"])
+            self.ultimo_ts = ts
+            self.eventos += 1
+            return True
+
+    def consultar(self, janela: str, agora_ms: int = None):
+        """Retorna (compra, venda) da janela ("1s", "1m" ou "5m")."""
+        with self._lock:
+            agora = self.relogio() if agora_ms is None else agora_ms
+            return self.janelas[janela].consultar(agora)
+
+    def volume(self, janela: str, agora_ms: int = None) -> float:
+        compra, venda = self.consultar(janela, agora_ms)
+        return compra + venda
+
+
+class AggTradeStream:
+    """
+    Alimenta um TradeAggregator com o stream `aggTrade` da Binance em uma
+    thread de fundo. Aceita o mesmo transporte plugável do DepthStreamBook
+    (ex: ReplayTransport com frames gravados).
+    """
+
+    stream_url = "wss://stream.binance.com:9443/ws"
+
+    def __init__(
+        self,
+        symbol: str,
+        aggregator=None,
+        transport=None,
+        stream_url: str = None,
+        observador=None,
+    ):
+        self.symbol = symbol.upper()
+        self.aggregator = aggregator or TradeAggregator()
+        # Chamado com ("trade", evento) para cada aggTrade, ex: Recorder.gravar
+        self.observador = observador
+        self.transport = transport or WebSocketTransport()
+        self.url = f"{stream_url or self.stream_url}/{self.symbol.lower()}@aggTrade"
+        self._stop = Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.transport.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.transport.connect(self.url)
+                while not self._stop.is_set():
+                    frame = self.transport.recv()
+                    if frame is None:
+                        return
+                    evento = (
+                        json_loads(frame) if isinstance(frame, (str, bytes)) else frame
+                    )
+                    if evento.get("e", "aggTrade") == "aggTrade":
+                        if self.observador:
+                            self.observador("trade", evento)
+                        self.aggregator.processar(evento)
+            except Exception as e:
+                if self._stop.is_set():
+                    return
+                print(f"Erro no stream de negócios: {e}. Reconectando...")
+                time_sleep(1)
+            finally:
+                self.transport.close()
+
+
+class AggTradePoller:
+    """
+    Alternativa ao stream: consulta /aggTrades a partir do último id recebido
+    (fromId), sem perder os negócios ocorridos entre duas consultas.
+    """
+
+    def __init__(self, api, symbol: str, aggregator=None, limit: int = 1000):
+        self.api = api
+        self.symbol = symbol.upper()
+        self.aggregator = aggregator or TradeAggregator()
+        self.limit = limit
+
+    def poll(self) -> int:
+        """Busca os negócios novos; retorna quantos foram aplicados."""
+        ultimo = self.aggregator.ultimo_id
+        aplicados = 0
+        while True:
+            from_id = None if ultimo is None else ultimo + 1
+            eventos = self.api.get_agg_trades(self.symbol, from_id, self.limit)
+            if not eventos:
+                return aplicados
+            aplicados += sum(self.aggregator.processar(e) for e in eventos)
+            ultimo = self.aggregator.ultimo_id
+            if from_id is None or len(eventos) < self.limit:
+                return aplicados
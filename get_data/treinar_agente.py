@@ -1,31 +1,206 @@
+from concurrent.futures import ProcessPoolExecutor
 from os import path as os_path
-from volume_env import BinanceVolumeEnv
-from volume_agent import VolumeAgent
-from args_config import ArgumentBuilder
+import numpy as np
 
+if not __package__:
+    import _raiz  # noqa: F401  (executado como script: raiz no sys.path)
 
-def treinar_agente(csv_path, symbol, episodes=50):
-    env = BinanceVolumeEnv(csv_path=csv_path, symbol=symbol)
-    agent = VolumeAgent(state_size=4, action_size=3, symbol=symbol)
+from get_data.volume_env import BinanceVolumeEnv
+from get_data.vec_env import VecVolumeEnv
+from get_data.volume_agent import VolumeAgent
+from get_data.args_config import ArgumentBuilder
+from get_data.candle_store import caminho_candles
+from get_data.fonte_mercado import livros_gravados
+from get_data.recorder import arquivos_gravados
 
-    for ep in range(episodes):
-        print(f"\nIniciando Episódio {ep + 1}/{episodes} para {symbol}")
-        state = env.reset()
-        done = False
-        total_reward = 0
+# Ambientes já carregados em cada processo worker, reaproveitados entre rodadas,
+# e os livros gravados recebidos do processo principal
+_ENVS = {}
+_LIVROS = None
 
-        while not done:
-            action = agent.choose_action(state)
-            next_state, reward, done, _ = env.step(action)
-            agent.learn(state, action, reward, next_state, done)
-            state = next_state
-            total_reward += reward
 
-        env.render()
-        print(f"Recompensa Total: {total_reward:.2f}")
+def carregar_livros(symbol, pasta):
+    """
+    Livros amostrados de uma gravação (pasta de --gravar), ou None sem pasta.
+    Chamado uma única vez no processo principal; os workers recebem o resultado.
+    """
+    if not pasta:
+        return None
+    return livros_gravados(symbol, arquivos_gravados(pasta, symbol))
+
+
+def criar_env(csv_path, symbol, livros=None):
+    """
+    Ambiente do histórico de candles; com `livros` (ver carregar_livros), o
+    microprice e o imbalance dos livros gravados entram no estado.
+    """
+    return BinanceVolumeEnv(csv_path=csv_path, symbol=symbol, livros=livros)
+
+
+def treinar_agente(
+    csv_path,
+    symbol,
+    episodes=50,
+    envs=1,
+    workers=1,
+    sincronizar_cada=5,
+    livros=None,
+):
+    livros = carregar_livros(symbol, livros)
+    if workers > 1:
+        return treinar_paralelo(
+            csv_path, symbol, episodes, workers, envs, sincronizar_cada, livros
+        )
+
+    env = criar_env(csv_path, symbol, livros)
+    agent = criar_agente(env, symbol)
+
+    if envs > 1:
+        vec_env = VecVolumeEnv.de_fatias(env, envs)
+        for ep in range(episodes):
+            print(
+                f"\nIniciando Episódio {ep + 1}/{episodes} para {symbol} ({envs} envs)"
+            )
+            totais = treinar_vetorizado(vec_env, agent, 1)
+            print(f"Recompensa Total: {totais.sum():.2f}")
+    else:
+        for ep in range(episodes):
+            print(f"\nIniciando Episódio {ep + 1}/{episodes} para {symbol}")
+            state = env.reset()
+            done = False
+            total_reward = 0
+
+            while not done:
+                action = agent.choose_action(state)
+                next_state, reward, done, _ = env.step(action)
+                agent.learn(state, action, reward, next_state, done)
+                state = next_state
+                total_reward += reward
+
+            env.render()
+            print(f"Recompensa Total: {total_reward:.2f}")
+
+    agent.save_q_table()
+    print(f"\nAgente treinado e Q-table salva em logs/{symbol}_q_table.npz")
+
+
+def criar_agente(env, symbol):
+    """
+    Cria o agente carregando a Q-table salva; sem tabela treinada, ajusta as
+    faixas do discretizador ao histórico do ambiente (também usado para
+    converter uma Q-table JSON antiga).
+    """
+    agent = VolumeAgent(state_size=5, action_size=3, symbol=symbol, env=env)
+    if not agent.discretizador.ajustado and not agent.estados_visitados:
+        agent.discretizador.ajustar(env.volumes, env.precos_estado, env.initial_balance)
+    return agent
+
+
+def treinar_vetorizado(vec_env, agent, episodes):
+    """
+    Treina o agente com os N ambientes de `vec_env` em lockstep: uma chamada
+    em lote de choose_actions/learn_batch por passo, apenas para os ambientes
+    que ainda não terminaram.
+
+    Retorna:
+        np.ndarray: Recompensa total de cada ambiente somada nos episódios.
+    """
+    totais = np.zeros(vec_env.n)
+    for _ in range(episodes):
+        states = vec_env.reset()
+        ativos = np.ones(vec_env.n, dtype=bool)
+
+        while ativos.any():
+            actions = np.zeros(vec_env.n, dtype=np.int64)
+            actions[ativos] = agent.choose_actions(states[ativos])
+            next_states, rewards, dones, _ = vec_env.step(actions)
+            agent.learn_batch(
+                states[ativos],
+                actions[ativos],
+                rewards[ativos],
+                next_states[ativos],
+                dones[ativos],
+            )
+            totais += rewards
+            states = next_states
+            ativos = ~dones
+    return totais
+
+
+def _iniciar_worker(livros):
+    """Inicializador do pool: guarda os livros enviados uma vez por processo."""
+    global _LIVROS
+    _LIVROS = livros
+
+
+def _treinar_worker(tarefa):
+    """Executa `episodes` episódios em um processo a partir da Q-table recebida."""
+    fatias, discretizador, q_table, epsilon, episodes = tarefa
+    envs = []
+    for csv_path, symbol, inicio, fim in fatias:
+        if (csv_path, symbol) not in _ENVS:
+            _ENVS[(csv_path, symbol)] = criar_env(csv_path, symbol, _LIVROS)
+        envs.append(_ENVS[(csv_path, symbol)].fatiar(inicio, fim))
+
+    agent = VolumeAgent(
+        state_size=5,
+        action_size=3,
+        symbol=fatias[0][1],
+        carregar=False,
+        discretizador=discretizador,
+    )
+    agent.q_table = q_table
+    agent.epsilon = epsilon
+    totais = treinar_vetorizado(VecVolumeEnv(envs), agent, episodes)
+    return agent.q_table, agent.epsilon, float(totais.sum())
+
+
+def treinar_paralelo(
+    csv_path, symbol, episodes, workers, envs, sincronizar_cada, livros=None
+):
+    """
+    Treina em um pool de processos: o histórico é dividido em `workers * envs`
+    fatias contíguas e cada worker executa as suas em lockstep. A cada
+    `sincronizar_cada` episódios as atualizações de todos os workers são
+    mescladas na Q-table compartilhada, que volta para a próxima rodada.
+    `livros` (ver carregar_livros) é enviado a cada worker uma única vez.
+    """
+    env = criar_env(csv_path, symbol, livros)
+    agent = criar_agente(env, symbol)
+    total = len(env.precos)
+    limites = np.linspace(0, total, workers * envs + 1).astype(int)
+    fatias = [
+        (csv_path, symbol, int(a), int(b)) for a, b in zip(limites[:-1], limites[1:])
+    ]
+    grupos = [fatias[i * envs : (i + 1) * envs] for i in range(workers)]
+
+    print(f"Treinando {symbol} com {workers} workers x {envs} envs")
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_iniciar_worker, initargs=(livros,)
+    ) as pool:
+        feitos = 0
+        while feitos < episodes:
+            rodada = min(sincronizar_cada, episodes - feitos)
+            resultados = list(
+                pool.map(
+                    _treinar_worker,
+                    [
+                        (g, agent.discretizador, agent.q_table, agent.epsilon, rodada)
+                        for g in grupos
+                    ],
+                )
+            )
+            agent.mesclar([q_table for q_table, _, _ in resultados])
+            agent.epsilon = min(epsilon for _, epsilon, _ in resultados)
+            feitos += rodada
+            print(
+                f"\nEpisódios {feitos}/{episodes} | "
+                f"Recompensa Total: {sum(r for _, _, r in resultados):.2f} | "
+                f"Estados: {agent.estados_visitados}"
+            )
 
     agent.save_q_table()
-    print(f"\nAgente treinado e Q-table salva em logs/{symbol}_q_table.json")
+    print(f"\nAgente treinado e Q-table salva em logs/{symbol}_q_table.npz")
 
 
 if __name__ == "__main__":
@@ -33,9 +208,17 @@ if __name__ == "__main__":
     parser = ArgumentBuilder.with_episodes()
     args = parser.parse_args()
 
-    csv_path = f"get_data/data/{args.symbol}_{args.accumulated}.csv"
+    csv_path = caminho_candles("get_data/data", args.symbol, args.accumulated)
 
     if not os_path.exists(csv_path):
         print(f"Arquivo CSV não encontrado: {csv_path}")
     else:
-        treinar_agente(csv_path, args.symbol, args.episodes)
+        treinar_agente(
+            csv_path,
+            args.symbol,
+            args.episodes,
+            args.envs,
+            args.workers,
+            args.sincronizar_cada,
+            args.livros,
+        )
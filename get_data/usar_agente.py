@@ -1,16 +1,64 @@
-from volume_agent import VolumeAgent
-from api import BinancePublicAPI, TelegramAlerta
-from numpy import array as np_array, float32 as np_float32
-from time import sleep as time_sleep
-from os import path as os_path, makedirs as os_makedirs
-from csv import writer as csv_writer
+if not __package__:
+    import _raiz  # noqa: F401  (executado como script: raiz no sys.path)
+
+from get_data.volume_agent import VolumeAgent
+from get_data.agendador import AgendadorFixo
+from get_data.api import BinancePublicAPI, TelegramAlerta
+from get_data.args_config import ArgumentBuilder
+from get_data.fonte_mercado import (
+    FonteAoVivo,
+    FonteGravada,
+    RelogioSistema,
+    RelogioVirtual,
+)
+from get_data.metricas import metricas
+from get_data.microestrutura import MotorFeatures
+from get_data.recorder import arquivos_gravados
+from get_data.decision_log import DecisionLogWriter
+from numpy import array as np_array, float32 as np_float32, isfinite as np_isfinite
+from os import makedirs as os_makedirs
+from random import seed as random_seed
+from signal import signal, SIGTERM
+from sys import exit as sys_exit
+from time import perf_counter
 from datetime import datetime
 
 
-def usar_agente_ao_vivo(symbol="BTCUSDT", accumulated="5m", intervalo=5):
+def usar_agente_ao_vivo(
+    symbol="BTCUSDT",
+    accumulated="5m",
+    intervalo=5,
+    replay=None,
+    semente=0,
+    porta_metricas=None,
+):
+    """
+    Executa o agente com dados da Binance ou, com `replay` (pasta de uma
+    gravação), com os dados gravados e um relógio virtual: sem rede, na
+    velocidade máxima e com a exploração do agente iniciada por `semente`, de
+    modo que a mesma gravação gera sempre as mesmas decisões. Com
+    `porta_metricas`, as métricas ficam expostas no formato Prometheus.
+    """
+    if porta_metricas:
+        metricas.servir(porta_metricas)
     api = BinancePublicAPI()
-    agent = VolumeAgent(state_size=4, action_size=3, symbol=symbol)
-    telegram = TelegramAlerta()
+    agent = VolumeAgent(state_size=5, action_size=3, symbol=symbol)
+    relogio = RelogioSistema()
+    pasta_logs = "logs"
+    if replay:
+        relogio = RelogioVirtual()
+        fonte = FonteGravada(
+            symbol, arquivos_gravados(replay, symbol), relogio, 20, trades=True
+        )
+        pasta_logs = "logs/replay"
+        random_seed(semente)
+        telegram = None
+    else:
+        fonte = FonteAoVivo(
+            api, symbol, 20, stream=True, trades=True, snapshot_limit=100
+        )
+        telegram = TelegramAlerta()
+    motor = MotorFeatures()
     saldo = 1000.0
     posicao = 0.0
     preco_medio = 0.0
@@ -19,47 +67,70 @@ def usar_agente_ao_vivo(symbol="BTCUSDT", accumulated="5m", intervalo=5):
         accumulated, 1
     )
 
-    os_makedirs("logs", exist_ok=True)
-    log_file = f"logs/{symbol}_decisions_log.csv"
-    if not os_path.exists(log_file):
-        with open(log_file, "w", newline="") as f:
-            writer = csv_writer(f)
-            writer.writerow(
-                [
-                    "Timestamp",
-                    "Symbol",
-                    "Action",
-                    "Price",
-                    "Volume",
-                    "BestBid",
-                    "BestAsk",
-                    "Spread",
-                    "Position",
-                    "Balance",
-                    "Reward",
-                ]
-            )
-
-    print("\n🚀 Executando agente com dados reais da Binance...\n")
-
+    os_makedirs(pasta_logs, exist_ok=True)
+    decisoes = DecisionLogWriter(symbol, pasta_logs)
+
+    # SIGTERM encerra pelo mesmo caminho do Ctrl+C, gravando o log pendente
+    signal(SIGTERM, lambda *_: sys_exit(0))
+
+    if replay:
+        print(f"\n🚀 Executando agente com a gravação de {replay}...\n")
+    else:
+        print("\n🚀 Executando agente com dados reais da Binance...\n")
+
+    # Volume do estado (stream aggTrade) na mesma escala dos candles usados no
+    # treinamento
+    trades = fonte.trades
+    if not fonte.iniciar(timeout=30):
+        print("❌ Não foi possível obter o snapshot inicial do order book.")
+        fonte.parar()
+        decisoes.fechar()
+        metricas.parar()
+        return
+
+    agendador = AgendadorFixo(intervalo, relogio.monotonic, relogio.sleep)
+    duracao_ciclo = metricas.histograma("ciclo_segundos", laco="agente")
+    atraso_ciclo = metricas.histograma("ciclo_atraso_segundos", laco="agente")
+    decisao = metricas.histograma("agente_decisao_segundos")
     try:
-        while True:
-            order_book = api.get_order_book(symbol, limit=5)
-            ticker = api.get_ticker_24h(symbol)
+        while fonte.ativa:
+            inicio = perf_counter()
+            snapshot = fonte.snapshot()
+            order_book, ticker = snapshot.order_book, snapshot.ticker
 
-            if not order_book or not ticker:
+            if not order_book or order_book.spread is None or not ticker:
                 print("❌ Erro ao obter dados da Binance. Retentando...")
-                time_sleep(intervalo)
+                agendador.aguardar()
                 continue
 
             preco = float(ticker.get("lastPrice", 0))
-            volume = float(ticker.get("lastQty", 0))  # / ajuste
-            bid_price = float(ticker.get("bidPrice", 0))
-            ask_price = float(ticker.get("askPrice", 0))
-            spread = ask_price - bid_price
-
-            state = np_array([volume, preco, posicao, saldo], dtype=np_float32)
+            volume = float(ticker.get("lastQty", 0))  # tamanho das operações
+            volume_estado = (
+                trades.volume(accumulated)
+                if accumulated in trades.janelas
+                else trades.volume("1s") * ajuste
+            )
+            bid_price = order_book.best_bid
+            ask_price = order_book.best_ask
+            spread = order_book.spread
+
+            # Preço e imbalance do estado vêm do livro, como no treinamento com
+            # livros gravados (BinanceVolumeEnv com `livros`)
+            with metricas.cronometrar("features_segundos"):
+                features = motor.como_dict(motor.calcular_livro(order_book))
+            preco_estado = features["microprice"]
+            if not np_isfinite(preco_estado):
+                preco_estado = preco
+            imbalance = features["imbalance_5"]
+            if not np_isfinite(imbalance):
+                imbalance = 0.0
+
+            state = np_array(
+                [volume_estado, preco_estado, posicao, saldo, imbalance],
+                dtype=np_float32,
+            )
 
+            inicio_decisao = perf_counter()
             action = agent.choose_action(state)
 
             controle_envio = 0.0
@@ -84,26 +155,25 @@ def usar_agente_ao_vivo(symbol="BTCUSDT", accumulated="5m", intervalo=5):
                 if posicao == 0:
                     preco_medio = 0.0
 
-            next_state = np_array([volume, preco, posicao, saldo], dtype=np_float32)
+            next_state = np_array(
+                [volume_estado, preco_estado, posicao, saldo, imbalance],
+                dtype=np_float32,
+            )
             agent.learn(state, action, reward, next_state, False)
-
-            with open(log_file, "a", newline="") as f:
-                writer = csv_writer(f)
-                writer.writerow(
-                    [
-                        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        symbol,
-                        ["HOLD", "BUY", "SELL"][action],
-                        f"{preco:.2f}",
-                        f"{volume:.5f}",
-                        f"{bid_price:.2f}",
-                        f"{ask_price:.2f}",
-                        f"{spread:.2f}",
-                        f"{posicao:.5f}",
-                        f"{saldo:.2f}",
-                        f"{reward:.2f}",
-                    ]
-                )
+            decisao.observar(perf_counter() - inicio_decisao)
+
+            decisoes.registrar(
+                action,
+                preco,
+                volume,
+                bid_price,
+                ask_price,
+                spread,
+                posicao,
+                saldo,
+                reward,
+                timestamp=relogio.time(),
+            )
 
             if action in [1, 2] and controle_envio != saldo:
                 controle_envio = saldo
@@ -117,22 +187,59 @@ def usar_agente_ao_vivo(symbol="BTCUSDT", accumulated="5m", intervalo=5):
                     f"Saldo + Carteira: {posicao*preco+saldo:.2f}\n"
                     f"Lucro: {reward:.2f}"
                 )
-                telegram.enviar(mensagem)
+                if telegram:
+                    telegram.enviar(mensagem, chave=(symbol, action, f"{preco:.2f}"))
 
             print(
-                f"[{datetime.now().strftime('%H:%M:%S')}] Ação: {['HOLD','BUY','SELL'][action]} | "
-                f"Preço: {preco:.2f} | Pos: {posicao:.5f} | Saldo: {saldo:.2f} | Cart: {posicao*preco:.2f} | Saldo + Cart: {posicao*preco+saldo:.2f} | Reward: {reward:.2f}"
+                f"[{relogio.now().strftime('%H:%M:%S')}] Ação: {['HOLD','BUY','SELL'][action]} | "
+                f"Preço: {preco:.2f} | Pos: {posicao:.5f} | Saldo: {saldo:.2f} | Cart: {posicao*preco:.2f} | Saldo + Cart: {posicao*preco+saldo:.2f} | Reward: {reward:.2f} | "
+                f"Imbalance: {imbalance:+.2f}"
             )
 
-            time_sleep(intervalo)
+            duracao_ciclo.observar(perf_counter() - inicio)
+            agendador.aguardar()
+            atraso_ciclo.observar(agendador.atraso)
 
-    except KeyboardInterrupt:
-        print("\n🛑 Execução interrompida pelo usuário. Salvando Q-table...")
+    except (KeyboardInterrupt, SystemExit):
+        # SIGTERM chega aqui como SystemExit (ver signal acima)
+        print("\n🛑 Execução interrompida. Salvando Q-table...")
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"logs/{symbol}_q_table_{timestamp}.json"
+        filename = f"logs/{symbol}_q_table_{timestamp}.npz"
         agent.save_q_table(filename=filename)
         print(f"✅ Q-table salva como: {filename}")
+    finally:
+        fonte.parar()
+        decisoes.fechar()
+        if telegram:
+            telegram.dispatcher.fechar(timeout=10)
+        print(metricas.resumo())
+        metricas.parar()
 
 
 if __name__ == "__main__":
-    usar_agente_ao_vivo()
+    parser = ArgumentBuilder.base_parser()
+    parser.add_argument(
+        "--replay",
+        type=str,
+        help="Pasta de uma gravação (--gravar) reproduzida com relógio virtual",
+    )
+    parser.add_argument(
+        "--semente",
+        type=int,
+        default=0,
+        help="Padrão: 0. Semente da exploração do agente no replay",
+    )
+    parser.add_argument(
+        "--metricas",
+        type=int,
+        metavar="PORTA",
+        help="Expõe as métricas em http://127.0.0.1:PORTA/metrics (formato Prometheus)",
+    )
+    args = parser.parse_args()
+    usar_agente_ao_vivo(
+        args.symbol,
+        args.accumulated,
+        replay=args.replay,
+        semente=args.semente,
+        porta_metricas=args.metricas,
+    )
@@ -0,0 +1,67 @@
+import numpy as np
+
+from get_data.volume_env import BinanceVolumeEnv
+
+
+class VecVolumeEnv:
+    """
+    Executa N BinanceVolumeEnv independentes em lockstep.
+
+    Os ambientes podem ser símbolos diferentes, fatias de datas de um mesmo
+    histórico ou trechos com início aleatório. Estados, recompensas e dones são
+    retornados como arrays com uma linha por ambiente; um ambiente que terminou
+    continua devolvendo seu estado final com recompensa 0 até o próximo reset.
+    """
+
+    def __init__(self, envs):
+        self.envs = list(envs)
+        self.n = len(self.envs)
+        self.dones = np.zeros(self.n, dtype=bool)
+
+    @classmethod
+    def de_arquivos(cls, csv_paths, symbols, **kwargs):
+        """Um ambiente por arquivo/símbolo."""
+        return cls(
+            BinanceVolumeEnv(csv_path, symbol=symbol, **kwargs)
+            for csv_path, symbol in zip(csv_paths, symbols)
+        )
+
+    @classmethod
+    def de_fatias(cls, env, n):
+        """Divide o histórico de `env` em `n` fatias contíguas de datas."""
+        limites = np.linspace(0, len(env.precos), n + 1).astype(int)
+        return cls(env.fatiar(a, b) for a, b in zip(limites[:-1], limites[1:]))
+
+    @classmethod
+    def de_inicios_aleatorios(cls, env, n, tamanho, seed=None):
+        """`n` trechos de `tamanho` candles começando em posições aleatórias."""
+        rng = np.random.default_rng(seed)
+        inicios = rng.integers(0, max(len(env.precos) - tamanho, 0) + 1, n)
+        return cls(env.fatiar(int(i), int(i) + tamanho) for i in inicios)
+
+    @property
+    def terminado(self):
+        return bool(self.dones.all())
+
+    def reset(self):
+        self.dones[:] = False
+        return np.stack([env.reset() for env in self.envs])
+
+    def step(self, actions):
+        """
+        Aplica uma ação em cada ambiente.
+
+        Retorna:
+            tuple: (estados (N, 5) float32, recompensas (N,) float64,
+            dones (N,) bool, infos).
+        """
+        estados = []
+        recompensas = np.zeros(self.n)
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            state, reward, done, info = env.step(int(action))
+            estados.append(state)
+            recompensas[i] = reward
+            self.dones[i] = done
+            infos.append(info)
+        return np.stack(estados), recompensas, self.dones.copy(), infos
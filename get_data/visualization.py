@@ -2,15 +2,20 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 
-def plot_order_book(order_book: dict, symbol: str):
-    """Gera um gráfico visual do order book"""
+def plot_order_book(order_book, symbol: str):
+    """Gera um gráfico visual do order book (OrderBook ou dict da API)"""
     try:
-        # Converte para arrays numpy para manipulação
-        bids = np.array(order_book["bids"], dtype=float)
-        asks = np.array(order_book["asks"], dtype=float)
+        if isinstance(order_book, dict):
+            # Converte para arrays numpy para manipulação
+            bids = np.array(order_book["bids"], dtype=float)
+            asks = np.array(order_book["asks"], dtype=float)
 
-        # Ordena asks em ordem crescente para plotagem
-        asks = asks[asks[:, 0].argsort()]
+            # Ordena asks em ordem crescente para plotagem
+            asks = asks[asks[:, 0].argsort()]
+        else:
+            # OrderBook já mantém os níveis ordenados e em float
+            bids = np.column_stack(order_book.top("bids"))
+            asks = np.column_stack(order_book.top("asks"))
 
         # Configuração do gráfico
         plt.figure(figsize=(12, 6))
@@ -1,14 +1,23 @@
-from numpy import round as np_round, argmax as np_argmax, float32 as np_float32
 from random import random as random_random, randint as random_randint
-from os import path as os_path, makedirs as os_makedirs
-from json import dump as json_dump, load as json_load
+from os import path as os_path, makedirs as os_makedirs, replace as os_replace
+from json import load as json_load
 from re import sub as re_sub
+from numpy import load as np_load
 import numpy as np
 
+from get_data.discretizador import Discretizador
+
+# Versão do formato binário da Q-table (.npz); a versão 1 não tem o imbalance
+VERSAO_Q_TABLE = 2
+
 
 class VolumeAgent:
     """
     Agente de Q-learning tabular para decisões baseadas em volume e preço.
+
+    O estado é discretizado em faixas (Discretizador) e a Q-table é um array
+    denso (células x ações): tamanho fixo, consulta por índice inteiro e
+    argmax/atualizações vetorizadas.
     """
 
     def __init__(
@@ -21,6 +30,9 @@ class VolumeAgent:
         epsilon_decay=0.995,
         alpha=0.1,
         gamma=0.95,
+        carregar=True,
+        discretizador=None,
+        env=None,
     ):
         self.state_size = state_size
         self.action_size = action_size  # [0: HOLD, 1: BUY, 2: SELL]
@@ -29,91 +41,194 @@ class VolumeAgent:
         self.epsilon_decay = epsilon_decay
         self.alpha = alpha  # taxa de aprendizado
         self.gamma = gamma  # fator de desconto
-        self.q_table = {}  # {(state): [q0, q1, q2]}
+        self.discretizador = discretizador or Discretizador()
+        self.q_table = self._q_table_vazia()  # [célula, ação]
         self.symbol = symbol
-        self.q_table_file = f"logs/{symbol}_q_table.json"
+        self.q_table_file = f"logs/{symbol}_q_table.npz"
         os_makedirs("logs", exist_ok=True)
-        self._load_q_table()
-
-    def _state_to_key(self, state):
-        return tuple(np_round(state, 2))
+        if carregar:
+            self._load_q_table(env)
+
+    def _q_table_vazia(self):
+        return np.zeros((self.discretizador.n_estados, self.action_size))
+
+    def _state_to_index(self, state):
+        return self.discretizador.indices(state)
+
+    def _completar(self, q_table, variaveis):
+        """
+        Expande uma Q-table indexada só pelas `variaveis` primeiras variáveis
+        do estado (ex: sem imbalance): cada célula vale para todas as faixas
+        das variáveis novas.
+        """
+        for bins in self.discretizador.bins[variaveis:]:
+            q_table = np.repeat(q_table, bins, axis=0)
+        return q_table
+
+    @property
+    def estados_visitados(self) -> int:
+        return int(np.count_nonzero(self.q_table.any(axis=1)))
+
+    def _decair_epsilon(self, passos=1):
+        """Equivale a `passos` chamadas de learn: decai até atingir epsilon_min."""
+        if self.epsilon <= self.epsilon_min:
+            return
+        necessarios = int(
+            np.ceil(
+                np.log(self.epsilon_min / self.epsilon) / np.log(self.epsilon_decay)
+            )
+        )
+        self.epsilon *= self.epsilon_decay ** max(min(passos, necessarios), 0)
 
     def choose_action(self, state):
-        state_key = self._state_to_key(state)
         if random_random() < self.epsilon:
             return random_randint(0, self.action_size - 1)
-
-        self.q_table.setdefault(state_key, [0.0] * self.action_size)
-        return int(np_argmax(self.q_table[state_key]))
+        return int(self.q_table[self._state_to_index(state)].argmax())
 
     def learn(self, state, action, reward, next_state, done):
-        state_key = self._state_to_key(state)
-        next_key = self._state_to_key(next_state)
-
-        self.q_table.setdefault(state_key, [0.0] * self.action_size)
-        self.q_table.setdefault(next_key, [0.0] * self.action_size)
+        estado = self._state_to_index(state)
 
         target = reward
         if not done:
-            target += self.gamma * max(self.q_table[next_key])
+            target += self.gamma * self.q_table[self._state_to_index(next_state)].max()
 
-        self.q_table[state_key][action] += self.alpha * (
-            target - self.q_table[state_key][action]
+        self.q_table[estado, action] += self.alpha * (
+            target - self.q_table[estado, action]
         )
+        self._decair_epsilon()
+
+    def choose_actions(self, states):
+        """Versão em lote de choose_action: uma ação por linha de `states`."""
+        n = len(states)
+        acoes = self.q_table[self._state_to_index(states)].argmax(axis=1)
+        explorar = np.random.random(n) < self.epsilon
+        acoes[explorar] = np.random.randint(0, self.action_size, explorar.sum())
+        return acoes
+
+    def learn_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Versão em lote de learn. Os alvos usam a Q-table do início do lote e
+        transições que caem na mesma célula/ação têm suas correções somadas.
+        """
+        estados = self._state_to_index(states)
+        proximos = self._state_to_index(next_states)
+        actions = np.asarray(actions, dtype=np.int64)
+
+        targets = np.asarray(rewards, dtype=np.float64) + self.gamma * self.q_table[
+            proximos
+        ].max(axis=1) * ~np.asarray(dones, dtype=bool)
+        np.add.at(
+            self.q_table,
+            (estados, actions),
+            self.alpha * (targets - self.q_table[estados, actions]),
+        )
+        self._decair_epsilon(len(estados))
 
-        if self.epsilon > self.epsilon_min:
-            self.epsilon *= self.epsilon_decay
+    def mesclar(self, tabelas):
+        """
+        Aplica sobre a Q-table atual as atualizações de vários workers que
+        partiram desta mesma tabela (soma das diferenças de cada um).
+        """
+        base = self.q_table
+        self.q_table = base + sum(tabela - base for tabela in tabelas)
 
     def save_q_table(self, filename=None):
-        filename = filename or f"logs/{self.symbol}_q_table.json"
-        serializable_q_table = {str(tuple(k)): v for k, v in self.q_table.items()}
-        with open(filename, "w") as f:
-            json_dump(serializable_q_table, f)
-
-    """def _load_q_table(self):
+        """
+        Salva a Q-table em `.npz` (versão, faixas do discretizador e a matriz
+        de valores). Grava em um arquivo temporário e renomeia, então uma falha
+        durante o salvamento não corrompe a tabela existente.
+        """
+        filename = filename or self.q_table_file
+        tmp = f"{filename}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                versao=np.array(VERSAO_Q_TABLE),
+                q_table=self.q_table,
+                **self.discretizador.para_arrays(),
+            )
+        os_replace(tmp, filename)
+
+    def _converter_legado(self, raw):
+        """
+        Converte uma Q-table antiga ({str(estado bruto): [q0, q1, q2]}) para o
+        array denso, usando a média dos valores que caem em cada célula.
+        """
+
+        def parse_key(k):
+            # Remove 'np.float32(...)' se presente
+            limpa = re_sub(r"np\.float32\(([^)]+)\)", r"\1", k)
+            return tuple(map(float, limpa.strip("() ").split(",")))
+
+        itens = [
+            (parse_key(k), [float(x) for x in v])
+            for k, v in raw.items()
+            if isinstance(v, list) and len(v) == self.action_size
+        ]
+        if not itens:
+            return self._q_table_vazia()
+        estados = np.array([k for k, _ in itens])
+        variaveis = estados.shape[1]
+        q_table = np.zeros(
+            (int(np.prod(self.discretizador.bins[:variaveis])), self.action_size)
+        )
+        indices = self._state_to_index(estados)
+        contagem = np.bincount(indices, minlength=len(q_table))
+        np.add.at(q_table, indices, np.array([v for _, v in itens]))
+        visitados = contagem > 0
+        q_table[visitados] /= contagem[visitados, None]
+        return self._completar(q_table, variaveis)
+
+    def converter_json(self, json_path, filename=None, env=None):
+        """
+        Conversão única de uma Q-table JSON (formato com faixas ou o antigo,
+        com chaves de estado em texto) para o formato binário.
+
+        O formato antigo não guarda faixas: elas são ajustadas ao histórico
+        de candles de `env` antes de agrupar os estados.
+        """
+        with open(json_path, "r") as f:
+            raw = json_load(f)
+
+        if "q_table" in raw and "discretizador" in raw:
+            self.discretizador = Discretizador.de_dict(raw["discretizador"])
+            self.q_table = self._completar(
+                np.asarray(raw["q_table"], dtype=np.float64),
+                len(raw["discretizador"]["bins"]),
+            )
+        else:
+            if env is not None:
+                self.discretizador.ajustar(
+                    env.volumes, env.precos_estado, env.initial_balance
+                )
+            if not self.discretizador.ajustado:
+                raise ValueError(
+                    f"Q-table antiga sem faixas ajustadas: {json_path}. "
+                    "Converta com converter_q_table.py (usa o histórico de candles)."
+                )
+            self.q_table = self._converter_legado(raw)
+        self.save_q_table(filename)
+        print(f"Q-table convertida: {json_path} -> {filename or self.q_table_file}")
+
+    def _load_q_table(self, env=None):
         try:
-            filename = f"logs/{self.symbol}_q_table.json"
-            if os_path.exists(filename):
-                with open(filename, "r") as f:
-                    raw = json_load(f)
-                self.q_table = {
-                    tuple(map(float, k.strip("() ").split(","))): v
-                    for k, v in raw.items()
-                }
-                print(f"Q-table carregada: {filename}")
-            else:
-                self.q_table = {}
-        except Exception as e:
-            print(f"Erro ao carregar Q-table: {e}")
-            self.q_table = {}"""
+            filename = self.q_table_file
+            json_path = f"logs/{self.symbol}_q_table.json"
+            if not os_path.exists(filename) and os_path.exists(json_path):
+                self.converter_json(json_path, env=env)
 
-    def _load_q_table(self):
-        try:
-            filename = f"logs/{self.symbol}_q_table.json"
             if os_path.exists(filename):
-                with open(filename, "r") as f:
-                    raw = json_load(f)
-
-                def parse_key(k):
-                    # Remove 'np.float32(...)' se presente
-                    limpa = re_sub(r"np\.float32\(([^)]+)\)", r"\1", k)
-                    return tuple(map(float, limpa.strip("() ").split(",")))
-
-                def parse_value(v):
-                    # Lista de floats
-                    if isinstance(v, list):
-                        return [float(x) for x in v]
-                    try:
-                        return float(v)
-                    except Exception:
-                        return 0.0
-
-                self.q_table = {parse_key(k): parse_value(v) for k, v in raw.items()}
+                with np_load(filename, allow_pickle=False) as dados:
+                    versao = int(dados["versao"])
+                    if versao not in (1, VERSAO_Q_TABLE):
+                        raise ValueError(f"Versão de Q-table não suportada: {versao}")
+                    self.discretizador = Discretizador.de_arrays(dados)
+                    self.q_table = self._completar(dados["q_table"], len(dados["bins"]))
                 print(f"✅ Q-table carregada com sucesso: {filename}")
             else:
                 print(f"⚠️ Arquivo não encontrado. Iniciando Q-table vazia: {filename}")
-                self.q_table = {}
+                self.q_table = self._q_table_vazia()
         except Exception as e:
             print(f"❌ Erro ao carregar Q-table: {e}")
             print(f"Tipo do erro: {type(e).__name__}")
-            self.q_table = {}
+            self.q_table = self._q_table_vazia()
@@ -1,19 +1,56 @@
+from copy import copy
 from numpy import array as np_array, float32 as np_float32
+import numpy as np
 from pandas import read_csv as pd_read_csv
 from json import dump as json_dump
 from os import path as os_path, makedirs as os_makedirs
 from datetime import datetime
 
+from get_data.candle_store import datas_para_ms, ler_candles
+from get_data.microestrutura import MotorFeatures
+
 
 class BinanceVolumeEnv:
     """
     Ambiente de aprendizado por reforço baseado em volume e preço da Binance.
     A ação do agente é decidir se deve comprar, vender ou ficar parado
     com base no volume recente de negociação e outros sinais.
+
+    O estado é [volume, preço, posição, saldo, imbalance]. Com `livros`
+    (horários e array de livros gravados, ver fonte_mercado.livros_gravados),
+    o preço do estado passa a ser o microprice e o imbalance o dos 5 primeiros
+    níveis do último livro gravado dentro de cada candle; sem livro, o
+    imbalance é 0. As operações continuam executadas no preço de fechamento.
     """
 
-    def __init__(self, csv_path, symbol="BTCUSDT", initial_balance=10000.0, fee=0.001):
-        self.df = pd_read_csv(csv_path)
+    def __init__(
+        self,
+        csv_path,
+        symbol="BTCUSDT",
+        initial_balance=10000.0,
+        fee=0.001,
+        livros=None,
+    ):
+        if csv_path.rstrip("/").endswith(".cols"):
+            # Formato colunar: as colunas memmap são usadas diretamente, sem
+            # DataFrame nem cópia para a memória
+            candles = ler_candles(csv_path)
+            self.precos = candles["close"]
+            self.volumes = candles["volume"]
+            self._open_times = candles["open_time"]
+        else:
+            self.df = pd_read_csv(csv_path)
+            # Colunas extraídas uma única vez em arrays contíguos, indexados por passo
+            self.precos = np.ascontiguousarray(self.df["Preço"], dtype=np.float64)
+            self.volumes = np.ascontiguousarray(self.df["Volume"], dtype=np.float64)
+            if "Data" in self.df:
+                self._datas = self.df["Data"].tolist()
+            elif "open_time" in self.df:
+                self._open_times = self.df["open_time"].to_numpy()
+        self.precos_estado = self.precos
+        self.imbalances = np.zeros(len(self.precos))
+        if livros is not None:
+            self.precos_estado, self.imbalances = self._features_livros(*livros)
         self.symbol = symbol
         self.initial_balance = initial_balance
         self.balance = initial_balance
@@ -35,26 +72,91 @@ class BinanceVolumeEnv:
         self.trades.clear()
         return self._get_state()
 
+    @property
+    def n_steps(self):
+        """Quantidade de passos de um episódio completo."""
+        return len(self.precos) - 1
+
+    def fatiar(self, inicio, fim=None):
+        """
+        Novo ambiente restrito aos candles [inicio, fim), compartilhando os
+        arrays de preço e volume (sem recarregar o arquivo).
+        """
+        env = copy(self)
+        if hasattr(self, "df"):
+            env.df = self.df.iloc[inicio:fim].reset_index(drop=True)
+        env.precos = self.precos[inicio:fim]
+        env.volumes = self.volumes[inicio:fim]
+        env.precos_estado = self.precos_estado[inicio:fim]
+        env.imbalances = self.imbalances[inicio:fim]
+        if hasattr(self, "_datas"):
+            env._datas = self._datas[inicio:fim]
+        elif hasattr(self, "_open_times"):
+            env._open_times = self._open_times[inicio:fim]
+        env.trades = []
+        env.log_path = f"logs/{self.symbol}_{inicio}_trades.json"
+        env.reset()
+        return env
+
+    def _features_livros(self, horarios, livros):
+        """
+        Microprice e imbalance_5 do último livro gravado dentro de cada candle
+        (da abertura até a abertura do candle seguinte); candles sem livro
+        nesse intervalo ficam com o preço de fechamento e imbalance 0.
+        """
+        if not len(horarios):
+            return self.precos, self.imbalances
+        if hasattr(self, "_datas"):
+            aberturas = datas_para_ms(self._datas)
+        else:
+            aberturas = self._open_times
+        aberturas = np.asarray(aberturas, dtype=np.float64)
+        # O último candle dura o mesmo que o anterior
+        duracao = aberturas[-1] - aberturas[-2] if len(aberturas) > 1 else np.inf
+        fechamentos = np.append(aberturas[1:], aberturas[-1] + duracao)
+
+        motor = MotorFeatures(niveis=livros.shape[1])
+        features = motor.calcular(livros)
+        horarios_ms = np.asarray(horarios, dtype=np.float64) * 1000
+        indices = np.searchsorted(horarios_ms, fechamentos, "left") - 1
+        seguros = np.maximum(indices, 0)
+        no_candle = (indices >= 0) & (horarios_ms[seguros] >= aberturas)
+
+        microprices = features[seguros, motor.nomes.index("microprice")]
+        imbalances = features[seguros, motor.nomes.index("imbalance_5")]
+        return (
+            np.where(no_candle & np.isfinite(microprices), microprices, self.precos),
+            np.where(no_candle & np.isfinite(imbalances), imbalances, 0.0),
+        )
+
     def _get_state(self):
-        row = self.df.iloc[self.current_step]
         return np_array(
             [
-                float(row["Volume"]),
-                float(row["Preço"]),
+                self.volumes[self.current_step],
+                self.precos_estado[self.current_step],
                 float(self.position),
                 float(self.balance),
+                self.imbalances[self.current_step],
             ],
             dtype=np_float32,
         )
 
+    def _data(self, step):
+        """Data do candle, formatada apenas quando um trade é registrado."""
+        data = None
+        if hasattr(self, "_datas"):
+            data = self._datas[step]
+        elif hasattr(self, "_open_times"):
+            data = datetime.fromtimestamp(self._open_times[step] / 1000).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+        return data or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
     def step(self, action):
         if self.done:
             return self._get_state(), 0, self.done, {}
 
-        row = self.df.iloc[self.current_step]
-        preco = float(row["Preço"])
-        data = row.get("Data") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
+        preco = float(self.precos[self.current_step])
         reward = 0
 
         if action == 1:  # BUY
@@ -66,7 +168,7 @@ class BinanceVolumeEnv:
                 self.trades.append(
                     {
                         "step": self.current_step,
-                        "timestamp": data,
+                        "timestamp": self._data(self.current_step),
                         "tipo": "BUY",
                         "preco": preco,
                         "volume": self.position,
@@ -81,7 +183,7 @@ class BinanceVolumeEnv:
                 self.trades.append(
                     {
                         "step": self.current_step,
-                        "timestamp": data,
+                        "timestamp": self._data(self.current_step),
                         "tipo": "SELL",
                         "preco": preco,
                         "volume": self.position,
@@ -95,12 +197,104 @@ class BinanceVolumeEnv:
         # HOLD = 0: sem ação
 
         self.current_step += 1
-        if self.current_step >= len(self.df) - 1:
+        if self.current_step >= len(self.precos) - 1:
             self.done = True
             self._save_trades()
 
         return self._get_state(), reward, self.done, {}
 
+    def simular(self, acoes):
+        """
+        Executa um episódio inteiro a partir de uma sequência de ações, sem
+        alterar o estado do ambiente.
+
+        Ações sem efeito (BUY já posicionado, SELL sem posição) são descartadas
+        de forma vetorizada; só os trades efetivos são percorridos, na mesma
+        ordem de operações de `step`, então os valores coincidem exatamente com
+        os de um episódio executado passo a passo.
+
+        Retorna:
+            dict: Arrays por passo `recompensas`, `posicoes`, `saldos`, `taxas`
+            e `pnl` (patrimônio a mercado menos o saldo inicial), além da lista
+            `trades` no mesmo formato de `self.trades`.
+        """
+        acoes = np.asarray(acoes, dtype=np.int64)[: self.n_steps]
+        n = len(acoes)
+        precos = self.precos[:n]
+
+        # Estado posicionado <=> a última ação não-HOLD foi BUY; portanto uma
+        # ação só tem efeito se difere da ação não-HOLD anterior (o início
+        # equivale a ter vendido)
+        indices = np.flatnonzero(acoes)
+        tipos = acoes[indices]
+        anteriores = np.concatenate(([2], tipos[:-1]))
+        efetivas = indices[tipos != anteriores]
+
+        recompensas = np.zeros(n)
+        taxas = np.zeros(n)
+        posicoes_trade = np.empty(len(efetivas))
+        saldos_trade = np.empty(len(efetivas))
+        trades = []
+
+        balance = self.initial_balance
+        position = 0.0
+        for k, passo in enumerate(efetivas.tolist()):
+            preco = float(precos[passo])
+            if k % 2 == 0:  # BUY
+                quantidade = balance / preco
+                position = quantidade * (1 - self.fee)
+                taxas[passo] = balance * self.fee
+                balance = 0
+                trades.append(
+                    {
+                        "step": passo,
+                        "timestamp": self._data(passo),
+                        "tipo": "BUY",
+                        "preco": preco,
+                        "volume": position,
+                        "saldo": balance,
+                    }
+                )
+            else:  # SELL
+                balance = position * preco * (1 - self.fee)
+                reward = balance - self.initial_balance
+                recompensas[passo] = reward
+                taxas[passo] = position * preco * self.fee
+                trades.append(
+                    {
+                        "step": passo,
+                        "timestamp": self._data(passo),
+                        "tipo": "SELL",
+                        "preco": preco,
+                        "volume": position,
+                        "saldo": balance,
+                        "lucro": reward,
+                    }
+                )
+                position = 0
+            posicoes_trade[k] = position
+            saldos_trade[k] = balance
+
+        # Propaga o estado de cada trade até o próximo (forward fill)
+        ultimo = np.searchsorted(efetivas, np.arange(n), side="right") - 1
+        sem_trade = ultimo < 0
+        ultimo[sem_trade] = 0
+        if len(efetivas):
+            posicoes = np.where(sem_trade, 0.0, posicoes_trade[ultimo])
+            saldos = np.where(sem_trade, self.initial_balance, saldos_trade[ultimo])
+        else:
+            posicoes = np.zeros(n)
+            saldos = np.full(n, self.initial_balance)
+
+        return {
+            "recompensas": recompensas,
+            "posicoes": posicoes,
+            "saldos": saldos,
+            "taxas": taxas,
+            "pnl": saldos + posicoes * precos - self.initial_balance,
+            "trades": trades,
+        }
+
     def _save_trades(self):
         with open(self.log_path, "w") as f:
             json_dump(self.trades, f, indent=2)
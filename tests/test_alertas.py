@@ -0,0 +1,130 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps as json_dumps
+from threading import Thread
+from time import monotonic, sleep as time_sleep
+from urllib.parse import parse_qs
+
+import pytest
+
+from get_data.alertas import AlertDispatcher
+
+
+class FakeTelegram:
+    """Endpoint sendMessage local: registra as mensagens e responde `respostas`."""
+
+    def __init__(self):
+        self.mensagens = []  # (horário, texto)
+        self.respostas = []  # (status, corpo) usados antes de responder 200
+        self.atrasos = {}  # primeira linha do texto -> segundos até responder
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                corpo = self.rfile.read(int(self.headers["Content-Length"]))
+                status, resposta = (
+                    fake.respostas.pop(0) if fake.respostas else (200, {"ok": True})
+                )
+                texto = parse_qs(corpo.decode())["text"][0]
+                time_sleep(fake.atrasos.get(texto.split("\n")[0], 0))
+                if status == 200:
+                    fake.mensagens.append((monotonic(), texto))
+                dados = json_dumps(resposta).encode()
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.servidor.server_port}"
+
+    @property
+    def textos(self):
+        return [texto for _, texto in self.mensagens]
+
+
+@pytest.fixture
+def telegram():
+    fake = FakeTelegram()
+    yield fake
+    fake.servidor.shutdown()
+    fake.servidor.server_close()
+
+
+def dispatcher(telegram, **kwargs):
+    kwargs.setdefault("intervalo_chat", 0.0)
+    kwargs.setdefault("backoff", 0.01)
+    return AlertDispatcher("token", "chat", base_url=telegram.url, **kwargs)
+
+
+def test_repetidos_agrupados_ao_fim_da_janela(telegram):
+    alertas = dispatcher(telegram, janela=0.3)
+    for i in range(4):
+        alertas.enviar(f"alerta {i}", chave=("BTCUSDT", "100.00"))
+    alertas.enviar("outro nível", chave=("BTCUSDT", "101.00"))
+    time_sleep(0.6)
+
+    assert telegram.textos[:2] == ["alerta 0", "outro nível"]
+    assert telegram.textos[2].startswith("alerta 3\n\n_(+3 alertas repetidos")
+    assert alertas.agrupados == 3
+    alertas.fechar(timeout=5)
+
+
+def test_janela_vencida_e_encerrada_antes_do_novo_alerta(telegram):
+    # O resumo lento de "k1" mantém a thread ocupada até depois do fim da
+    # janela de "k"; "c" já está na fila quando ela volta
+    telegram.atrasos["a2"] = 0.4
+    alertas = dispatcher(telegram, janela=0.2)
+    alertas.enviar("a1", chave="k1")
+    alertas.enviar("a2", chave="k1")
+    time_sleep(0.1)
+    alertas.enviar("a", chave="k")
+    alertas.enviar("b", chave="k")
+    time_sleep(0.25)
+    alertas.enviar("c", chave="k")
+    alertas.fechar(timeout=5)
+
+    assert [texto.split("\n")[0] for texto in telegram.textos] == [
+        "a1",
+        "a",
+        "a2",
+        "b",
+        "c",
+    ]
+    assert telegram.textos[3].startswith("b\n\n_(+1 alertas repetidos")
+
+
+def test_limite_do_chat(telegram):
+    alertas = dispatcher(telegram, intervalo_chat=0.1, max_por_minuto=100)
+    for i in range(4):
+        alertas.enviar(f"alerta {i}")
+    alertas.fechar(timeout=5)
+
+    horarios = [horario for horario, _ in telegram.mensagens]
+    assert len(horarios) == 4
+    assert min(b - a for a, b in zip(horarios, horarios[1:])) >= 0.09
+
+
+def test_retry_after_do_429(telegram):
+    telegram.respostas.append((429, {"ok": False, "parameters": {"retry_after": 0.2}}))
+    alertas = dispatcher(telegram)
+    inicio = monotonic()
+    alertas.enviar("alerta")
+    alertas.fechar(timeout=5)
+
+    assert telegram.textos == ["alerta"]
+    assert telegram.mensagens[0][0] - inicio >= 0.2
+    assert alertas.enviados == 1 and alertas.falhas == 0
+
+
+def test_erro_4xx_nao_repete(telegram):
+    telegram.respostas.append((400, {"ok": False}))
+    alertas = dispatcher(telegram)
+    alertas.enviar("alerta")
+    alertas.fechar(timeout=5)
+
+    assert telegram.textos == []
+    assert alertas.falhas == 1
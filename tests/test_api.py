@@ -0,0 +1,143 @@
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps as json_dumps
+from threading import Thread
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pytest
+
+from get_data import backfill as modulo_backfill
+from get_data.api import BinancePublicAPI
+from get_data.backfill import KlineBackfill
+from get_data.candle_store import ColumnarCandleStore
+
+MINUTO_MS = 60_000
+INICIO_MS = 28_333_333 * MINUTO_MS  # múltiplo de um minuto
+
+
+def candle(i):
+    t = INICIO_MS + i * MINUTO_MS
+    v = str(float(i))
+    return [t, v, v, v, v, v, t + MINUTO_MS - 1, "0", i, "0", "0", "0"]
+
+
+class FakeKlines:
+    """
+    Servidor /klines local com os candles de `indices`; `falhas` é o número de
+    respostas 500 dadas a cada startTime antes de responder normalmente.
+    """
+
+    def __init__(self, indices):
+        self.candles = [candle(i) for i in sorted(indices)]
+        self.pedidos = []  # (startTime, endTime)
+        self.falhas = {}
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {
+                    k: int(v[0])
+                    for k, v in parse_qs(url.query).items()
+                    if k in ("startTime", "endTime", "limit")
+                }
+                inicio, fim = params["startTime"], params["endTime"]
+                fake.pedidos.append((inicio, fim))
+                if fake.falhas.get(inicio):
+                    fake.falhas[inicio] -= 1
+                    self.send_response(500)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                dados = [c for c in fake.candles if inicio <= c[0] <= fim]
+                corpo = json_dumps(dados[: params["limit"]]).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.servidor.server_port}"
+
+    def api(self):
+        return BinancePublicAPI(base_url=self.url, tentativas=0)
+
+
+@pytest.fixture
+def klines(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # os dados vão para get_data/data
+    monkeypatch.setattr(modulo_backfill, "time_sleep", lambda segundos: None)
+    servidores = []
+
+    def criar(indices):
+        fake = FakeKlines(indices)
+        servidores.append(fake)
+        return fake
+
+    yield criar
+    for fake in servidores:
+        fake.servidor.shutdown()
+        fake.servidor.server_close()
+
+
+def data(i):
+    return datetime.fromtimestamp((INICIO_MS + i * MINUTO_MS) / 1000)
+
+
+def test_backfill_retoma_do_checkpoint(klines, tmp_path):
+    fake = klines(range(50))
+    backfill = KlineBackfill(
+        fake.api(), str(tmp_path / "ckpt"), workers=2, limit=10, tentativas=1
+    )
+    fim_ms = INICIO_MS + 50 * MINUTO_MS
+    fake.falhas[INICIO_MS + 20 * MINUTO_MS] = 1
+
+    assert backfill.executar("BTCUSDT", "1m", INICIO_MS, fim_ms) is None
+    assert len(fake.pedidos) == 5
+
+    fake.pedidos.clear()
+    candles = backfill.executar("BTCUSDT", "1m", INICIO_MS, fim_ms)
+    # Só a janela que falhou é buscada de novo
+    assert fake.pedidos == [
+        (INICIO_MS + 20 * MINUTO_MS, INICIO_MS + 30 * MINUTO_MS - 1)
+    ]
+    assert [c[0] for c in candles] == [candle(i)[0] for i in range(50)]
+
+
+def test_fetch_volume_so_busca_o_que_falta(klines):
+    fake = klines(range(30))
+    api = fake.api()
+    api.fetch_volume("BTCUSDT", data(0), data(20), "1m")
+    fake.pedidos.clear()
+
+    api.fetch_volume("BTCUSDT", data(0), data(30), "1m")
+    # A partir do último candle armazenado (19) + 1 ms
+    assert fake.pedidos == [
+        (INICIO_MS + 19 * MINUTO_MS + 1, INICIO_MS + 30 * MINUTO_MS - 1)
+    ]
+    colunar = ColumnarCandleStore("get_data/data", "BTCUSDT", "1m")
+    np.testing.assert_array_equal(colunar.coluna("volume"), np.arange(30))
+
+
+def test_lacuna_preenchida_em_parte_nao_e_consultada_de_novo(klines):
+    # Candles 10-19 faltam localmente; na "Binance" só existem 12 e 13
+    inicial = klines([*range(10), *range(20, 30)])
+    inicial.api().fetch_volume("BTCUSDT", data(0), data(30), "1m")
+
+    fake = klines([*range(10), 12, 13, *range(20, 30)])
+    api = fake.api()
+    api.fetch_volume("BTCUSDT", data(0), data(29), "1m")
+    assert fake.pedidos == [
+        (INICIO_MS + 10 * MINUTO_MS, INICIO_MS + 20 * MINUTO_MS - 1)
+    ]
+    colunar = ColumnarCandleStore("get_data/data", "BTCUSDT", "1m")
+    assert colunar.rows == 22
+
+    fake.pedidos.clear()
+    api.fetch_volume("BTCUSDT", data(0), data(29), "1m")
+    assert fake.pedidos == []
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from get_data import candle_store
+from get_data.candle_store import CandleStore, ColumnarCandleStore, ler_candles
+
+MINUTO_MS = 60_000
+
+
+def candle(i):
+    """Candle bruto da API com close = volume = i."""
+    t = i * MINUTO_MS
+    return [t, i, i, i, i, i, t + MINUTO_MS - 1, 0, i, 0, 0, 0]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ColumnarCandleStore(str(tmp_path), "BTCUSDT", "1m")
+    store.append([candle(i) for i in range(0, 10, 2)])
+    return store
+
+
+def assert_alinhado(colunar, indices):
+    arrays = colunar.ler()
+    np.testing.assert_array_equal(arrays["open_time"], np.array(indices) * MINUTO_MS)
+    for nome in ("close", "volume", "trades"):
+        np.testing.assert_array_equal(arrays[nome], indices)
+
+
+def test_merge_intercala_lacunas(store, tmp_path):
+    inseridos, _ = store.merge([candle(3), candle(1), candle(4)])
+    assert [c[0] for c in inseridos] == [MINUTO_MS, 3 * MINUTO_MS]
+    assert_alinhado(store, [0, 1, 2, 3, 4, 6, 8])
+    assert not list(tmp_path.glob("**/*.tmp"))
+
+
+def falhar_no_replace(monkeypatch, chamada):
+    original = candle_store.os_replace
+    chamadas = []
+
+    def os_replace(origem, destino):
+        chamadas.append(destino)
+        if len(chamadas) == chamada:
+            raise OSError("falha simulada")
+        original(origem, destino)
+
+    monkeypatch.setattr(candle_store, "os_replace", os_replace)
+
+
+def test_intercalacao_interrompida_e_concluida(store, tmp_path, monkeypatch):
+    # 1: intercalacao.json; 2 e 3: primeiras colunas; falha na terceira
+    falhar_no_replace(monkeypatch, 3)
+    with pytest.raises(OSError):
+        store.merge([candle(1), candle(3)])
+    monkeypatch.undo()
+
+    arquivos = {p: p.read_bytes() for p in tmp_path.glob("**/*") if p.is_file()}
+    leitor = ColumnarCandleStore(str(tmp_path), "BTCUSDT", "1m", somente_leitura=True)
+    assert_alinhado(leitor, [0, 1, 2, 3, 4, 6, 8])
+    # Leitores não alteram os arquivos
+    assert {p: p.read_bytes() for p in tmp_path.glob("**/*") if p.is_file()} == (
+        arquivos
+    )
+
+    escritor = ColumnarCandleStore(str(tmp_path), "BTCUSDT", "1m")
+    assert_alinhado(escritor, [0, 1, 2, 3, 4, 6, 8])
+    assert not list(tmp_path.glob("**/*.tmp"))
+    assert not list(tmp_path.glob("**/intercalacao.json"))
+
+
+def test_intercalacao_sem_meta_e_descartada(store, tmp_path, monkeypatch):
+    # Falha ao publicar o intercalacao.json: nenhuma coluna foi substituída
+    falhar_no_replace(monkeypatch, 1)
+    with pytest.raises(OSError):
+        store.merge([candle(1), candle(3)])
+    monkeypatch.undo()
+
+    leitor = ColumnarCandleStore(str(tmp_path), "BTCUSDT", "1m", somente_leitura=True)
+    assert_alinhado(leitor, [0, 2, 4, 6, 8])
+
+    escritor = ColumnarCandleStore(str(tmp_path), "BTCUSDT", "1m")
+    assert_alinhado(escritor, [0, 2, 4, 6, 8])
+    assert not list(tmp_path.glob("**/*.tmp"))
+
+
+def test_append_interrompido(store, tmp_path):
+    # Bytes gravados em uma coluna sem atualizar o meta
+    with open(store._arquivo("close"), "ab") as f:
+        f.write(np.zeros(3).tobytes())
+
+    dados = ler_candles(store.pasta)
+    np.testing.assert_array_equal(dados["close"], [0, 2, 4, 6, 8])
+    assert (tmp_path / "BTCUSDT_1m.cols" / "close.bin").stat().st_size == 8 * 8
+
+    ColumnarCandleStore(str(tmp_path), "BTCUSDT", "1m")
+    assert (tmp_path / "BTCUSDT_1m.cols" / "close.bin").stat().st_size == 5 * 8
+
+
+def test_somente_leitura_nao_grava(store, tmp_path):
+    leitor = ColumnarCandleStore(str(tmp_path), "BTCUSDT", "1m", somente_leitura=True)
+    with pytest.raises(PermissionError):
+        leitor.append([candle(10)])
+
+
+def test_csv_com_fim_de_linha_unix(tmp_path):
+    csv = CandleStore(str(tmp_path), "BTCUSDT", "1m")
+    csv.append([candle(i) for i in range(0, 6, 2)])
+    csv.inserir([candle(1), candle(3)], [1, 2])
+
+    conteudo = (tmp_path / "BTCUSDT_1m.csv").read_bytes()
+    assert b"\r\n" not in conteudo
+    assert len(conteudo.splitlines()) == 6
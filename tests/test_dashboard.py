@@ -0,0 +1,52 @@
+from io import StringIO
+
+from get_data.dashboard import Dashboard, LARGURA_PAINEL, ajustar, largura_exibida
+from get_data.order_book import OrderBook
+
+SNAPSHOT = {
+    "lastUpdateId": 1,
+    "bids": [["100.0", "1.0"], ["99.9", "2.0"]],
+    "asks": [["100.1", "1.5"], ["100.2", "3.0"]],
+}
+
+
+def test_prints_viram_mensagens_do_painel(capsys):
+    saida = StringIO()
+    painel = Dashboard(niveis=2, refresh=0.01, saida=saida)
+    painel.start()
+    painel.publicar("BTCUSDT", OrderBook.from_snapshot(SNAPSHOT, "BTCUSDT"))
+    print("✅ Alerta enviado via Telegram.")
+    print("\nErro no stream", end="")
+    print(". Reconectando...")
+    painel.stop()
+    print("depois do painel")
+
+    assert capsys.readouterr().out == "depois do painel\n"
+    assert [m.split(" ", 1)[1] for m in painel.mensagens] == [
+        "✅ Alerta enviado via Telegram.",
+        "Erro no stream. Reconectando...",
+    ]
+    assert "Alerta enviado via Telegram." in saida.getvalue()
+
+
+def test_mensagens_antigas_saem_do_painel():
+    painel = Dashboard(saida=StringIO(), mensagens=2)
+    for i in range(4):
+        painel.mensagem(f"mensagem {i}")
+    textos = [texto.strip() for texto in painel._celulas().values()]
+    assert not any(t.endswith("mensagem 1") for t in textos)
+    assert any(t.endswith("mensagem 3") for t in textos)
+
+
+def test_celulas_com_emoji_ocupam_a_largura_do_painel():
+    assert largura_exibida("🚨 2 grandes ordens") == 19
+    assert largura_exibida("⚠️ aviso") == 8
+    assert ajustar("🚨🚨🚨", 5) == "🚨🚨 "
+
+    painel = Dashboard(saida=StringIO())
+    painel.mensagem("🚨 " + "x" * 80)
+    painel.mensagem("⚠️ Não foi possível expor as métricas")
+    for texto in painel._celulas().values():
+        assert largura_exibida(texto) <= LARGURA_PAINEL
+    for texto in list(painel._celulas().values())[-2:]:
+        assert largura_exibida(texto) == LARGURA_PAINEL
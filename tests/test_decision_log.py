@@ -0,0 +1,15 @@
+from get_data.decision_log import DecisionLogWriter, ler_decisoes
+
+
+def registrar(log, n, inicio=0):
+    for i in range(inicio, inicio + n):
+        log.registrar(1, 100.0 + i, 1.0, 99.0, 101.0, 2.0, 0.0, 1000.0, 0.0, i + 1)
+
+
+def test_formato_binario(tmp_path):
+    log = DecisionLogWriter("BTCUSDT", str(tmp_path), formato="bin")
+    registrar(log, 3)
+    log.fechar()
+
+    decisoes = ler_decisoes(log.arquivo)
+    assert decisoes["price"].tolist() == [100.0, 101.0, 102.0]
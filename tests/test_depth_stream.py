@@ -0,0 +1,125 @@
+import json
+
+from get_data.depth_stream import DepthStreamBook, ReplayTransport
+
+
+def snapshot(last_update_id, bid, ask):
+    return {
+        "lastUpdateId": last_update_id,
+        "bids": [[str(bid), "1.0"]],
+        "asks": [[str(ask), "1.0"]],
+    }
+
+
+def evento(first_id, final_id, bids=(), asks=()):
+    """Frame depthUpdate como chega do WebSocket (texto JSON)."""
+    return json.dumps(
+        {
+            "e": "depthUpdate",
+            "U": first_id,
+            "u": final_id,
+            "b": [[str(p), str(q)] for p, q in bids],
+            "a": [[str(p), str(q)] for p, q in asks],
+        }
+    )
+
+
+class FakeAPI:
+    """REST local: devolve os snapshots na ordem dada, um por chamada."""
+
+    def __init__(self, *snapshots):
+        self.snapshots = list(snapshots)
+        self.chamadas = 0
+
+    def get_order_book(self, symbol, limit):
+        self.chamadas += 1
+        return self.snapshots.pop(0)
+
+
+def niveis(livro, lado):
+    precos, quantidades = livro.top(lado)
+    return [[p, q] for p, q in zip(precos.tolist(), quantidades.tolist())]
+
+
+def reproduzir(api, frames, **kwargs):
+    """Roda o laço do stream até o fim dos frames gravados."""
+    stream = DepthStreamBook(api, transport=ReplayTransport(frames), **kwargs)
+    stream.run()
+    return stream
+
+
+def test_eventos_anteriores_ao_snapshot_sao_ignorados():
+    api = FakeAPI(snapshot(10, 100.0, 101.0))
+    stream = reproduzir(
+        api,
+        [
+            evento(5, 8, bids=[(99.0, 5.0)]),  # já contido no snapshot
+            evento(9, 12, bids=[(100.5, 2.0)]),  # primeiro: U <= 11 <= u
+            evento(13, 13, asks=[(101.0, 0.0), (100.8, 3.0)]),
+        ],
+    )
+
+    assert api.chamadas == 1 and stream.resyncs == 1
+    livro = stream.snapshot()
+    assert livro.last_update_id == 13
+    assert niveis(livro, "bids") == [[100.5, 2.0], [100.0, 1.0]]
+    assert niveis(livro, "asks") == [[100.8, 3.0]]
+
+
+def test_lacuna_na_sequencia_ressincroniza():
+    api = FakeAPI(snapshot(10, 100.0, 101.0), snapshot(20, 200.0, 201.0))
+    stream = reproduzir(
+        api,
+        [
+            evento(9, 12, bids=[(100.5, 2.0)]),
+            evento(15, 16, bids=[(150.0, 1.0)]),  # faltam 13 e 14
+            evento(19, 21, bids=[(200.5, 1.0)]),
+            evento(22, 22, asks=[(200.9, 1.0)]),
+        ],
+    )
+
+    assert api.chamadas == 2 and stream.resyncs == 2
+    livro = stream.snapshot()
+    assert livro.last_update_id == 22
+    # Nada do evento com lacuna nem do livro anterior sobrevive ao novo snapshot
+    assert niveis(livro, "bids") == [[200.5, 1.0], [200.0, 1.0]]
+    assert niveis(livro, "asks") == [[200.9, 1.0], [201.0, 1.0]]
+
+
+def test_primeiro_evento_alem_do_snapshot_ressincroniza():
+    api = FakeAPI(snapshot(10, 100.0, 101.0), snapshot(12, 100.0, 101.0))
+    stream = reproduzir(
+        api,
+        [
+            evento(12, 12, bids=[(100.5, 2.0)]),  # U > lastUpdateId + 1
+            evento(13, 13, bids=[(100.7, 1.0)]),
+        ],
+    )
+
+    assert api.chamadas == 2
+    livro = stream.snapshot()
+    assert livro.last_update_id == 13
+    assert niveis(livro, "bids") == [[100.7, 1.0], [100.0, 1.0]]
+
+
+def test_evento_sobreposto_apos_sincronizar_e_lacuna():
+    stream = DepthStreamBook(FakeAPI(), transport=ReplayTransport([]))
+    stream.carregar(snapshot(10, 100.0, 101.0))
+
+    assert stream.process_event(json.loads(evento(9, 12)))
+    # Sincronizado, o próximo evento tem de começar exatamente em u + 1
+    assert not stream.process_event(json.loads(evento(12, 14)))
+    assert stream.process_event(json.loads(evento(13, 14)))
+
+
+def test_observador_recebe_snapshots_e_diferencas():
+    recebidos = []
+    reproduzir(
+        FakeAPI(snapshot(10, 100.0, 101.0)),
+        [evento(9, 12), evento(13, 13)],
+        observador=lambda tipo, dados: recebidos.append(
+            (tipo, dados["lastUpdateId"] if tipo == "depth" else dados["u"])
+        ),
+    )
+
+    assert recebidos == [("depth", 10), ("depth_diff", 12), ("depth_diff", 13)]
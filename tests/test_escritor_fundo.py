@@ -0,0 +1,69 @@
+from threading import Event
+
+from get_data.escritor_fundo import EscritorFundo
+
+
+class Gravador:
+    """Registra os lotes recebidos; falha nas primeiras `falhas` chamadas."""
+
+    def __init__(self, falhas=0, liberar=None):
+        self.lotes = []
+        self.falhas = falhas
+        self.liberar = liberar
+        self.chamou = Event()
+
+    def __call__(self, itens):
+        self.chamou.set()
+        if self.liberar:
+            self.liberar.wait()
+        if self.falhas:
+            self.falhas -= 1
+            raise OSError("disco cheio")
+        self.lotes.append(list(itens))
+
+    @property
+    def itens(self):
+        return [item for lote in self.lotes for item in lote]
+
+
+def test_falha_descarta_o_lote_sem_encerrar_a_thread(capsys):
+    gravar = Gravador(falhas=2)
+    escritor = EscritorFundo(gravar, "Teste: itens descartados")
+    escritor.enfileirar(1)
+    assert gravar.chamou.wait(1)
+    gravar.chamou.clear()
+    escritor.enfileirar(2)
+    assert gravar.chamou.wait(1)
+    escritor.enfileirar(3)
+    escritor.fechar()
+
+    assert gravar.itens == [3]
+    assert escritor.descartados == 2
+    # Um aviso por sequência de falhas
+    assert capsys.readouterr().out == "Teste: itens descartados (disco cheio).\n"
+
+
+def test_fila_limitada_descarta_sem_bloquear():
+    liberar = Event()
+    gravar = Gravador(liberar=liberar)
+    escritor = EscritorFundo(gravar, "Teste", max_fila=5)
+    escritor.enfileirar(0)
+    assert gravar.chamou.wait(1)  # thread presa gravando o primeiro lote
+    for i in range(1, 21):
+        escritor.enfileirar(i)
+    liberar.set()
+    escritor.fechar()
+
+    assert escritor.descartados == 15
+    assert gravar.itens == list(range(6))
+
+
+def test_intervalo_agrupa_ate_o_tamanho_do_lote():
+    gravar = Gravador()
+    escritor = EscritorFundo(gravar, "Teste", lote=3, intervalo=60)
+    for i in range(7):
+        escritor.enfileirar(i)
+    escritor.fechar()
+
+    assert gravar.itens == list(range(7))
+    assert all(len(lote) <= 3 for lote in gravar.lotes)
@@ -0,0 +1,35 @@
+from get_data.cross_data import analisar_order_book, limite_cache
+from get_data.fonte_mercado import FonteAoVivo
+
+SNAPSHOT = {
+    "lastUpdateId": 10,
+    "bids": [["100.0", "1.0"], ["99.9", "2.0"]],
+    "asks": [["100.1", "1.5"], ["100.2", "3.0"]],
+}
+
+
+class FakeAPI:
+    """API REST local: snapshot fixo e ticker indisponível."""
+
+    def get_order_book(self, symbol, limit):
+        return SNAPSHOT
+
+    def get_ticker_24h(self, symbol):
+        return None
+
+
+def test_stream_sem_ticker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fonte = FonteAoVivo(FakeAPI(), "BTCUSDT", 5, stream=True)
+    fonte.stream_book.carregar(SNAPSHOT)
+
+    snapshot = fonte.snapshot()
+    assert snapshot.ticker == {}
+    assert snapshot.order_book.best_bid == 100.0
+    # Ticker vazio: a análise usa preço e quantidade zero em vez de falhar
+    monkeypatch.setattr(limite_cache, "base_path", str(tmp_path))
+    (tmp_path / "SEMTICKER_5m_stat.csv").write_text("D10\n300\n")
+    resultado = analisar_order_book(
+        snapshot.order_book, None, "SEMTICKER", 5, "D10", "5m", verbose=False
+    )
+    assert resultado["volume"] == 0.0
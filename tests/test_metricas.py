@@ -0,0 +1,33 @@
+import socket
+from urllib.request import urlopen
+
+from get_data.metricas import RegistroMetricas
+
+
+def test_servir_exporta_as_metricas():
+    registro = RegistroMetricas()
+    registro.contador("binance_requisicoes_total", endpoint="depth").incrementar()
+    servidor = registro.servir(0)
+    try:
+        porta = servidor.server_port
+        with urlopen(f"http://127.0.0.1:{porta}/metrics", timeout=5) as resposta:
+            texto = resposta.read().decode()
+    finally:
+        registro.parar()
+
+    assert 'binance_requisicoes_total{endpoint="depth"} 1.0' in texto
+
+
+def test_porta_ocupada_segue_sem_o_endpoint(capsys):
+    ocupada = socket.socket()
+    ocupada.bind(("127.0.0.1", 0))
+    ocupada.listen()
+    try:
+        registro = RegistroMetricas()
+        assert registro.servir(ocupada.getsockname()[1]) is None
+    finally:
+        ocupada.close()
+
+    assert registro.servidor is None
+    assert "Não foi possível expor as métricas" in capsys.readouterr().out
+    registro.parar()  # sem servidor: nada a fazer
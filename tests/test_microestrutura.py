@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from get_data.microestrutura import MotorFeatures, empilhar_livros
+from get_data.order_book import OrderBook
+
+# Três níveis por lado; os níveis 4 e 5 ficam vazios (NaN) no array
+LIVRO = {
+    "bids": [["100.0", "2"], ["99.9", "3"], ["99.5", "5"]],
+    "asks": [["100.2", "1"], ["100.3", "4"], ["101.0", "10"]],
+}
+MID = 100.1
+
+
+def features(livro=LIVRO, **kwargs):
+    motor = MotorFeatures(niveis=5, **kwargs)
+    return motor.como_dict(motor.calcular(empilhar_livros([livro], 5))[0])
+
+
+def bps(preco):
+    return abs(preco - MID) / MID * 10_000
+
+
+def test_topo_do_livro():
+    f = features()
+    assert f["mid"] == pytest.approx(MID)
+    assert f["spread_bps"] == pytest.approx(bps(100.2) + bps(100.0))
+    assert f["microprice"] == pytest.approx((100.0 * 1 + 100.2 * 2) / 3)
+    assert f["weighted_mid"] == pytest.approx(
+        ((100.0 * 2 + 99.9 * 3 + 99.5 * 5) / 10 + (100.2 + 100.3 * 4 + 101.0 * 10) / 15)
+        / 2
+    )
+
+
+def test_imbalance_com_niveis_faltando():
+    f = features()
+    assert f["imbalance_1"] == pytest.approx((2 - 1) / 3)
+    # Só há 3 níveis: os de 5 e 10 usam o que existe
+    assert f["imbalance_5"] == pytest.approx((10 - 15) / 25)
+    assert f["imbalance_10"] == pytest.approx(f["imbalance_5"])
+
+
+def test_profundidade_por_banda():
+    f = features()
+    compra = [f[f"profundidade_compra_{b}bps"] for b in (5, 10, 25, 50)]
+    venda = [f[f"profundidade_venda_{b}bps"] for b in (5, 10, 25, 50)]
+    # Bids a ~10, ~20 e ~60 bps do mid; asks a ~10, ~20 e ~90 bps
+    assert compra == [0.0, 2.0, 5.0, 5.0]
+    assert venda == [0.0, 1.0, 5.0, 5.0]
+
+
+def test_slope_ignora_niveis_vazios():
+    f = features()
+    distancias = [bps(100.0), bps(99.9), bps(99.5)]
+    assert f["slope_compra"] == pytest.approx(np.polyfit(distancias, [2, 5, 10], 1)[0])
+    distancias = [bps(100.2), bps(100.3), bps(101.0)]
+    assert f["slope_venda"] == pytest.approx(np.polyfit(distancias, [1, 5, 15], 1)[0])
+
+
+def test_slippage():
+    f = features(notional=300.6)
+    # Compra: 1 a 100.2 (100.2) + o resto (200.4) a 100.3
+    quantidade = 1 + 200.4 / 100.3
+    assert f["slippage_compra_bps"] == pytest.approx(bps(300.6 / quantidade))
+    # Venda: 2 a 100.0 (200.0) + o resto (100.6) a 99.9
+    quantidade = 2 + 100.6 / 99.9
+    assert f["slippage_venda_bps"] == pytest.approx(bps(300.6 / quantidade))
+
+
+def test_slippage_sem_profundidade_suficiente():
+    f = features(notional=1_000_000.0)
+    assert np.isnan(f["slippage_compra_bps"])
+    assert np.isnan(f["slippage_venda_bps"])
+
+
+def test_livro_ao_vivo_igual_ao_lote():
+    motor = MotorFeatures(niveis=5, notional=300.6)
+    ao_vivo = motor.calcular_livro(OrderBook.from_snapshot(LIVRO))
+    lote = motor.calcular(empilhar_livros([LIVRO], 5))[0]
+    np.testing.assert_allclose(ao_vivo, lote)
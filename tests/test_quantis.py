@@ -0,0 +1,38 @@
+import numpy as np
+
+from get_data.quantis import QuantisVolume
+
+
+def test_estado_salvo_e_reaproveitado(tmp_path):
+    volumes = np.array([3.0, 1.0, 2.0])
+    tempos = np.array([0, 60_000, 120_000])
+    q = QuantisVolume(str(tmp_path), "BTCUSDT", "1m")
+    assert q.sincronizar(volumes, tempos)
+    q.salvar()
+
+    q = QuantisVolume(str(tmp_path), "BTCUSDT", "1m")
+    assert not q.sincronizar(volumes, tempos)
+    assert list(q.ordenados) == [1.0, 2.0, 3.0]
+
+
+def test_historico_regravado_com_mesmas_linhas_reconstroi(tmp_path):
+    tempos = np.array([0, 60_000, 120_000])
+    q = QuantisVolume(str(tmp_path), "BTCUSDT", "1m")
+    q.sincronizar(np.array([3.0, 1.0, 2.0]), tempos)
+    q.salvar()
+
+    q = QuantisVolume(str(tmp_path), "BTCUSDT", "1m")
+    assert q.sincronizar(np.array([3.0, 1.0, 5.0]), tempos)
+    assert list(q.ordenados) == [1.0, 3.0, 5.0]
+    assert q.sincronizar(np.array([3.0, 1.0, 5.0]), tempos + 60_000)
+
+
+def test_adicionar_mantem_impressao(tmp_path):
+    q = QuantisVolume(str(tmp_path), "BTCUSDT", "1m")
+    q.sincronizar(np.array([3.0, 1.0]), np.array([0, 60_000]))
+    q.adicionar([2.0], [120_000])
+    q.salvar()
+
+    q = QuantisVolume(str(tmp_path), "BTCUSDT", "1m")
+    assert not q.sincronizar(np.array([3.0, 1.0, 2.0]), np.array([0, 60_000, 120_000]))
+    assert list(q.ordenados) == [1.0, 2.0, 3.0]
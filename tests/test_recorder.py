@@ -0,0 +1,57 @@
+import pytest
+
+from get_data import recorder as modulo
+from get_data.recorder import Recorder, arquivos_gravados, ler_gravacao
+
+
+def gravados(pasta):
+    return [
+        (tipo, dados)
+        for tipo, _, _, dados in ler_gravacao(arquivos_gravados(pasta, "BTCUSDT"))
+    ]
+
+
+def test_ida_e_volta(tmp_path):
+    rec = Recorder("BTCUSDT", str(tmp_path))
+    rec.gravar("ticker", {"lastPrice": "100"}, 1.0)
+    rec.gravar("trade", {"a": 1}, 2.0)
+    rec.fechar()
+
+    assert gravados(tmp_path) == [("ticker", {"lastPrice": "100"}), ("trade", {"a": 1})]
+    assert rec.registros == 2 and rec.descartados == 0
+
+
+def test_evento_nao_serializavel_e_descartado(tmp_path):
+    rec = Recorder("BTCUSDT", str(tmp_path))
+    rec.gravar("ticker", {"lastPrice": object()})
+    rec.gravar("ticker", {"lastPrice": "101"})
+    rec.fechar()
+
+    assert gravados(tmp_path) == [("ticker", {"lastPrice": "101"})]
+    assert rec.descartados == 1
+
+
+def test_falha_de_escrita_reabre_o_arquivo(tmp_path, monkeypatch):
+    abrir = modulo.gzip_open
+
+    class ArquivoFalho:
+        def __init__(self, *args):
+            self.arquivo = abrir(*args)
+
+        def write(self, dados):
+            raise OSError("disco cheio")
+
+        def close(self):
+            self.arquivo.close()
+
+    rec = Recorder("BTCUSDT", str(tmp_path))
+    lote = [(modulo.TIPOS["trade"], 1.0, 0, {"a": 1})]
+    monkeypatch.setattr(modulo, "gzip_open", ArquivoFalho)
+    with pytest.raises(OSError):
+        rec._escrever(lote)
+    assert rec._arquivo is None  # o próximo lote abre outro arquivo
+
+    monkeypatch.undo()
+    rec._escrever([(modulo.TIPOS["trade"], 2.0, 1, {"a": 2})])
+    rec.fechar()
+    assert gravados(tmp_path) == [("trade", {"a": 2})]
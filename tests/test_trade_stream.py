@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from get_data.depth_stream import ReplayTransport
+from get_data.fonte_mercado import FonteGravada, RelogioVirtual
+from get_data.recorder import Recorder, arquivos_gravados
+from get_data.trade_stream import AggTradeStream, TradeAggregator
+
+INICIO = 1_700_000_000.0  # segundos, alinhado aos buckets de 1s
+
+
+def negocio(agg_id, segundos, quantidade, venda):
+    """aggTrade em INICIO + segundos; `m` verdadeiro conta como venda."""
+    return {
+        "e": "aggTrade",
+        "a": agg_id,
+        "p": "100.0",
+        "q": str(quantidade),
+        "T": int((INICIO + segundos) * 1000),
+        "m": venda,
+    }
+
+
+@pytest.fixture
+def fonte(tmp_path):
+    """Replay de uma gravação só com negócios, sem rede."""
+    rec = Recorder("BTCUSDT", str(tmp_path))
+    for evento in (
+        negocio(1, 0.0, 1.0, False),
+        negocio(2, 0.5, 2.0, True),
+        negocio(2, 0.6, 9.0, True),  # id repetido (ex: reconexão): ignorado
+        negocio(3, 30.0, 3.0, False),
+        negocio(4, 90.0, 4.0, True),
+    ):
+        rec.gravar("trade", evento, evento["T"] / 1000)
+    rec.fechar()
+    relogio = RelogioVirtual()
+    fonte = FonteGravada(
+        "BTCUSDT", arquivos_gravados(str(tmp_path), "BTCUSDT"), relogio, trades=True
+    )
+    yield fonte, relogio
+    fonte.parar()
+
+
+def em(fonte, relogio, segundos):
+    """Avança o replay até INICIO + segundos e devolve as janelas."""
+    relogio.avancar_para(INICIO + segundos)
+    fonte.snapshot()
+    return {nome: fonte.trades.consultar(nome) for nome in ("1s", "1m", "5m")}
+
+
+def test_replay_alimenta_as_janelas(fonte):
+    fonte, relogio = fonte
+
+    janelas = em(fonte, relogio, 0.5)
+    assert janelas == {"1s": (1.0, 2.0), "1m": (1.0, 2.0), "5m": (1.0, 2.0)}
+
+    janelas = em(fonte, relogio, 30.0)
+    assert janelas["1s"] == (3.0, 0.0)
+    assert janelas["1m"] == (4.0, 2.0)
+    assert fonte.trades.eventos == 3  # o id repetido não conta
+
+
+def test_janelas_expiram_sem_novos_negocios(fonte):
+    fonte, relogio = fonte
+
+    assert em(fonte, relogio, 2.0)["1s"] == (0.0, 0.0)
+    # Aos 60s o bucket do primeiro segundo sai da janela de 1m
+    janelas = em(fonte, relogio, 60.0)
+    assert janelas["1m"] == (3.0, 0.0)
+    assert janelas["5m"] == (4.0, 2.0)
+
+    assert em(fonte, relogio, 89.0)["1m"] == (3.0, 0.0)
+    janelas = em(fonte, relogio, 90.0)
+    assert janelas["1m"] == (0.0, 4.0)  # a compra dos 30s acabou de expirar
+    assert janelas["5m"] == (4.0, 6.0)
+
+    # Depois de 5 minutos sem negócios todas as janelas ficam vazias
+    assert set(em(fonte, relogio, 400.0).values()) == {(0.0, 0.0)}
+
+
+def test_stream_reproduzido_alimenta_o_agregador():
+    agora = [int((INICIO + 1.0) * 1000)]
+    recebidos = []
+    stream = AggTradeStream(
+        "BTCUSDT",
+        TradeAggregator(relogio=lambda: agora[0]),
+        transport=ReplayTransport(
+            [
+                json.dumps(negocio(1, 0.2, 1.0, False)),
+                json.dumps({"e": "kline"}),  # outros eventos são ignorados
+                json.dumps(negocio(2, 0.7, 0.5, True)),
+            ]
+        ),
+        observador=lambda tipo, evento: recebidos.append((tipo, evento["a"])),
+    )
+    stream.run()
+
+    assert recebidos == [("trade", 1), ("trade", 2)]
+    assert stream.aggregator.consultar("1m") == (1.0, 0.5)
+    assert stream.aggregator.ultimo_preco == 100.0
+    agora[0] += 60_000
+    assert stream.aggregator.volume("1m") == 0.0
@@ -0,0 +1,79 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from get_data.volume_agent import VolumeAgent
+from get_data.volume_env import BinanceVolumeEnv
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # agente e ambiente usam logs/ no diretório atual
+    caminho = tmp_path / "candles.csv"
+    pd.DataFrame(
+        {"Preço": np.linspace(100.0, 200.0, 50), "Volume": np.linspace(1.0, 50.0, 50)}
+    ).to_csv(caminho, index=False)
+    return BinanceVolumeEnv(csv_path=str(caminho))
+
+
+def gravar_legado(estados):
+    """Q-table no formato JSON antigo: {str(estado bruto): [q0, q1, q2]}."""
+    with open("logs/BTCUSDT_q_table.json", "w") as f:
+        json.dump({str(tuple(e)): q for e, q in estados}, f)
+
+
+def test_legado_usa_faixas_do_historico(env):
+    barato, caro = (2.0, 110.0, 0.0, 10000.0), (45.0, 190.0, 0.0, 10000.0)
+    gravar_legado([(barato, [1.0, 0.0, 0.0]), (caro, [0.0, 0.0, 1.0])])
+
+    agent = VolumeAgent(state_size=5, action_size=3, env=env)
+
+    assert agent.discretizador.ajustado
+    # Com as faixas padrão os dois estados cairiam na mesma célula de preço
+    assert agent._state_to_index(barato) != agent._state_to_index(caro)
+    # O formato antigo não tem imbalance: o valor vale para qualquer faixa dele
+    for imbalance in (-0.9, 0.0, 0.9):
+        linha = agent.q_table[agent._state_to_index(barato + (imbalance,))]
+        assert linha.tolist() == [1.0, 0.0, 0.0]
+        linha = agent.q_table[agent._state_to_index(caro + (imbalance,))]
+        assert linha.tolist() == [0.0, 0.0, 1.0]
+
+    # A conversão salvou as faixas ajustadas junto com a Q-table
+    recarregado = VolumeAgent(state_size=5, action_size=3)
+    assert recarregado.discretizador.ajustado
+    np.testing.assert_array_equal(recarregado.q_table, agent.q_table)
+
+
+def test_legado_sem_historico_nao_converte(env):
+    gravar_legado([((2.0, 110.0, 0.0, 10000.0), [1.0, 0.0, 0.0])])
+
+    agent = VolumeAgent(state_size=5, action_size=3)
+
+    assert not agent.discretizador.ajustado
+    assert not agent.estados_visitados
+    assert not os.path.exists("logs/BTCUSDT_q_table.npz")
+    with pytest.raises(ValueError):
+        agent.converter_json("logs/BTCUSDT_q_table.json")
+
+
+def test_q_table_versao_1_ganha_faixas_de_imbalance(env):
+    antigo = VolumeAgent(state_size=5, action_size=3, carregar=False)
+    antigo.discretizador.ajustar(env.volumes, env.precos, env.initial_balance)
+    bins = antigo.discretizador.bins[:4]
+    q_table = np.arange(np.prod(bins) * 3, dtype=np.float64).reshape(-1, 3)
+    arrays = antigo.discretizador.para_arrays()
+    arrays["bins"] = np.array(bins)
+    del arrays["bordas_4"]
+    np.savez("logs/BTCUSDT_q_table.npz", versao=np.array(1), q_table=q_table, **arrays)
+
+    agent = VolumeAgent(state_size=5, action_size=3)
+
+    assert agent.q_table.shape == (agent.discretizador.n_estados, 3)
+    estado = (30.0, 150.0, 0.0, 10000.0)
+    celula = antigo.discretizador.indices(estado)  # índice só com 4 variáveis
+    for imbalance in (-1.0, -0.3, 0.5, 1.0):
+        linha = agent.q_table[agent._state_to_index(estado + (imbalance,))]
+        assert linha.tolist() == q_table[celula].tolist()
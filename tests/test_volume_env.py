@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from get_data.candle_store import ColumnarCandleStore
+from get_data.volume_env import BinanceVolumeEnv
+
+INICIO_MS = 1_700_000_000_000
+MINUTO_MS = 60_000
+
+
+@pytest.fixture
+def candles_csv(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # o ambiente cria logs/ no diretório atual
+    caminho = tmp_path / "candles.csv"
+    pd.DataFrame(
+        {
+            "open_time": INICIO_MS + np.arange(10) * MINUTO_MS,
+            "Preço": 100.0 + np.arange(10),
+            "Volume": 1.0,
+        }
+    ).to_csv(caminho, index=False)
+    return str(caminho)
+
+
+def livro(bid, ask, qtd_bid=1.0, qtd_ask=1.0):
+    """Array (1 nível, 4); com quantidades iguais, microprice = mid."""
+    return [[bid, qtd_bid, ask, qtd_ask]]
+
+
+def test_sem_livros_usa_fechamento(candles_csv):
+    env = BinanceVolumeEnv(candles_csv)
+    assert env.precos_estado is env.precos
+    assert env.reset()[4] == 0.0  # imbalance
+
+
+def test_imbalance_do_livro_entra_no_estado(candles_csv):
+    horarios = np.array([INICIO_MS / 1000 + 65])
+    livros = np.array([livro(50, 52, qtd_bid=3.0, qtd_ask=1.0)])
+    env = BinanceVolumeEnv(candles_csv, livros=(horarios, livros))
+
+    esperado = np.zeros(10)
+    esperado[1] = 0.5  # (3 - 1) / (3 + 1)
+    np.testing.assert_array_equal(env.imbalances, esperado)
+    env.reset()
+    state, _, _, _ = env.step(0)
+    # microprice: (50 * 1 + 52 * 3) / 4
+    assert state.tolist() == [1.0, 51.5, 0.0, 10000.0, 0.5]
+    np.testing.assert_array_equal(env.fatiar(1, 3).imbalances, [0.5, 0.0])
+
+
+def test_livro_so_vale_para_o_proprio_candle(candles_csv):
+    horarios = np.array([INICIO_MS / 1000 + 10])
+    env = BinanceVolumeEnv(candles_csv, livros=(horarios, np.array([livro(50, 52)])))
+
+    esperado = 100.0 + np.arange(10)
+    esperado[0] = 51.0
+    np.testing.assert_array_equal(env.precos_estado, esperado)
+
+
+def test_ultimo_livro_dentro_do_candle(candles_csv):
+    segundos = INICIO_MS / 1000
+    horarios = np.array([segundos + 65, segundos + 90, segundos + 9 * 60 + 5])
+    livros = np.array([livro(50, 52), livro(60, 62), livro(70, 72)])
+    env = BinanceVolumeEnv(candles_csv, livros=(horarios, livros))
+
+    esperado = 100.0 + np.arange(10)
+    esperado[1] = 61.0
+    esperado[9] = 71.0
+    np.testing.assert_array_equal(env.precos_estado, esperado)
+    np.testing.assert_array_equal(env.fatiar(1, 3).precos_estado, [61.0, 102.0])
+
+
+def test_livro_apos_o_ultimo_candle_e_ignorado(candles_csv):
+    horarios = np.array([INICIO_MS / 1000 + 10 * 60 + 1])
+    env = BinanceVolumeEnv(candles_csv, livros=(horarios, np.array([livro(50, 52)])))
+    np.testing.assert_array_equal(env.precos_estado, env.precos)
+
+
+def test_formato_colunar_usa_memmap(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ColumnarCandleStore(str(tmp_path), "BTCUSDT", "1m")
+    store.append_arrays(
+        {
+            "open_time": INICIO_MS + np.arange(10) * MINUTO_MS,
+            "open": np.full(10, np.nan),
+            "high": np.full(10, np.nan),
+            "low": np.full(10, np.nan),
+            "close": 100.0 + np.arange(10),
+            "volume": np.ones(10),
+            "trades": np.full(10, -1),
+        }
+    )
+
+    env = BinanceVolumeEnv(store.pasta)
+    assert isinstance(env.precos, np.memmap)
+    assert isinstance(env.volumes, np.memmap)
+    assert not hasattr(env, "df")
+    np.testing.assert_array_equal(env.fatiar(2, 4).precos, [102.0, 103.0])
+    assert env.reset()[1] == 100.0